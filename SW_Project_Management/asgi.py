@@ -10,15 +10,18 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
-import manager.routing
-from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SW_Project_Management.settings')
 
+# Sets Django up, so it has to run before the routing imports models.
+django_asgi_app = get_asgi_application()
+
+import manager.routing  # noqa: E402
+from accounts.authentication import JWTAuthMiddleware  # noqa: E402
+
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
-    "websocket": AuthMiddlewareStack(
+    "http": django_asgi_app,
+    "websocket": JWTAuthMiddleware(
         URLRouter(
             manager.routing.websocket_urlpatterns
         )
@@ -0,0 +1,17 @@
+"""
+Celery application for background jobs.
+
+Only needed with REQUIREMENTS_JOBS['BACKEND'] = 'manager.jobs.CeleryJobBackend':
+
+    celery -A SW_Project_Management worker
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SW_Project_Management.settings')
+
+app = Celery('SW_Project_Management')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,157 @@
+"""
+Read-replica routing.
+
+Reads made while handling a GET, HEAD or OPTIONS request go to one of the
+DATABASE_REPLICAS['ALIASES'] databases; everything else, including reads in
+management commands, background threads and transactions, uses ``default``.
+
+A client that wrote recently is pinned to ``default`` for STICKY_SECONDS so
+it reads its own writes while replicas catch up. Clients are told apart by
+their Authorization header, session cookie or address, because JWT users
+are only authenticated inside the view, after routing is decided. Pins must
+be visible to every worker, so a local-memory pin cache is refused.
+"""
+
+import contextvars
+import hashlib
+import random
+import sqlite3
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULTS = {
+    'ALIASES': [],  # entries of settings.DATABASES that replicate ``default``
+    'STICKY_SECONDS': 10,  # must exceed the replicas' worst-case lag
+    'CACHE_ALIAS': 'default',  # where pins are kept; must be shared between workers
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def replica_setting(name):
+    return getattr(settings, 'DATABASE_REPLICAS', {}).get(name, DEFAULTS[name])
+
+
+@dataclass
+class RoutingState:
+    use_replica: bool
+    wrote: bool = False
+
+
+_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+def replica_read_active():
+    """
+    Whether reads in the current context may be served by a replica.
+    """
+    state = _state.get()
+    return bool(state and state.use_replica and replica_setting('ALIASES'))
+
+
+def pin_key(client):
+    return f'db-pin:{client}'
+
+
+def client_key(request):
+    identity = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    return hashlib.sha256(identity.encode()).hexdigest()[:32]
+
+
+def pin_cache():
+    cache = caches[replica_setting('CACHE_ALIAS')]
+    if isinstance(cache, LocMemCache):
+        # Another worker would never see the pin and could serve a stale read.
+        raise ImproperlyConfigured(
+            "DATABASE_REPLICAS['CACHE_ALIAS'] must name a cache shared between workers, not a local-memory one."
+        )
+    return cache
+
+
+def is_pinned(client):
+    return pin_cache().get(pin_key(client), 0) > time.time()
+
+
+def pin(client):
+    sticky = replica_setting('STICKY_SECONDS')
+    pin_cache().set(pin_key(client), time.time() + sticky, timeout=sticky + 1)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not replica_read_active() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replica_setting('ALIASES'))
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # Later reads in this request must see the write.
+            state.use_replica = False
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *replica_setting('ALIASES')}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get their schema by copying ``default``.
+        if db in replica_setting('ALIASES'):
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Marks safe-method requests from unpinned clients as replica readers, and
+    pins clients that sent an unsafe request or wrote while handling one.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_setting('ALIASES'):
+            return self.get_response(request)
+
+        client = client_key(request)
+        state = RoutingState(use_replica=request.method in SAFE_METHODS and not is_pinned(client))
+        token = _state.set(state)
+        try:
+            return self.get_response(request)
+        finally:
+            _state.reset(token)
+            if state.wrote or request.method not in SAFE_METHODS:
+                pin(client)
+
+
+def replicate_sqlite(aliases=None):
+    """
+    Copy ``default`` over each SQLite replica with SQLite's online backup,
+    which readers of the replica see as a single write. A stand-in for real
+    replication when trying the router out locally.
+    """
+    source = connections[DEFAULT_DB_ALIAS]
+    source.ensure_connection()
+    copied = []
+    for alias in aliases or replica_setting('ALIASES'):
+        target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+        try:
+            source.connection.backup(target)
+        finally:
+            target.close()
+        copied.append(alias)
+    return copied
@@ -0,0 +1,211 @@
+"""
+Per-request timing, SQL and response size metrics.
+
+RequestMetricsMiddleware times every request and counts its responses by
+route. For a SAMPLE_RATE share of requests it also wraps the database
+connections to count queries and time them, which splits the request into
+SQL and Python time, which sampled requests can also carry in a
+Server-Timing header (on with DEBUG, since it tells any client how much SQL
+a request ran). Everything is aggregated into per-process histograms served
+in the Prometheus text format by ``metrics_view`` to scrapers holding TOKEN
+and to staff.
+"""
+
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+DEFAULTS = {
+    'SAMPLE_RATE': 1.0,  # share of requests whose SQL is counted and timed
+    'SERVER_TIMING': None,  # None sends the header only when DEBUG is on
+    'TOKEN': None,  # bearer token for scrapers; without it only staff may read /metrics
+}
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def metrics_setting(name):
+    return getattr(settings, 'REQUEST_METRICS', {}).get(name, DEFAULTS[name])
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        with self._lock:
+            values = dict(self._values)
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(values.items()):
+            lines.append(f'{self.name}{format_labels(self.label_names, labels)} {value}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # labels: [per-bucket counts, sum, count]
+        self._values = {}
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        with self._lock:
+            values = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._values.items()}
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{format_labels(self.label_names, labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{self.name}_bucket{format_labels(self.label_names, labels, [("le", "+Inf")])} {count}')
+            lines.append(f'{self.name}_sum{format_labels(self.label_names, labels)} {total}')
+            lines.append(f'{self.name}_count{format_labels(self.label_names, labels)} {count}')
+        return lines
+
+
+LABELS = ('view', 'method')
+
+responses = Counter('http_responses_total', 'Responses by route, method and status code.', (*LABELS, 'status'))
+request_seconds = Histogram('http_request_duration_seconds', 'Time to build the response.', LABELS, SECONDS_BUCKETS)
+sql_seconds = Histogram('http_request_sql_duration_seconds', 'Time spent in SQL, sampled requests only.', LABELS, SECONDS_BUCKETS)
+python_seconds = Histogram('http_request_python_duration_seconds', 'Time outside SQL, sampled requests only.', LABELS, SECONDS_BUCKETS)
+query_count = Histogram('http_request_queries', 'SQL queries per request, sampled requests only.', LABELS, QUERY_BUCKETS)
+response_bytes = Histogram('http_response_size_bytes', 'Body size of non-streaming responses.', LABELS, SIZE_BUCKETS)
+
+METRICS = [responses, request_seconds, sql_seconds, python_seconds, query_count, response_bytes]
+
+
+def render_metrics():
+    return '\n'.join(line for metric in METRICS for line in metric.render()) + '\n'
+
+
+def clear_metrics():
+    for metric in METRICS:
+        metric.clear()
+
+
+def route_label(request):
+    """
+    A bounded label for the route that handled ``request``: "<app>:<url name>"
+    for the project's apps, the namespaced name for namespaced routes (such
+    as the admin), and "unmatched" for 404s that matched no route.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    if match.namespace:
+        return match.view_name
+    app = match.func.__module__.split('.')[0]
+    return f'{app}:{match.url_name or match.route}'
+
+
+class QueryTimer:
+    """
+    Execute wrapper that counts queries and adds up their time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def server_timing_enabled():
+    enabled = metrics_setting('SERVER_TIMING')
+    return settings.DEBUG if enabled is None else enabled
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer() if random.random() < metrics_setting('SAMPLE_RATE') else None
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            if timer is not None:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        labels = (route_label(request), request.method)
+        responses.inc((*labels, response.status_code))
+        request_seconds.observe(labels, elapsed)
+        if not response.streaming:
+            response_bytes.observe(labels, len(response.content))
+        timings = [f'total;dur={elapsed * 1000:.1f}']
+        if timer is not None:
+            sql_seconds.observe(labels, timer.seconds)
+            python_seconds.observe(labels, elapsed - timer.seconds)
+            query_count.observe(labels, timer.count)
+            timings += [
+                f'sql;dur={timer.seconds * 1000:.1f};desc="{timer.count} queries"',
+                f'app;dur={(elapsed - timer.seconds) * 1000:.1f}',
+            ]
+        if server_timing_enabled():
+            response['Server-Timing'] = ', '.join(timings)
+        return response
+
+
+def metrics_view(request):
+    token = metrics_setting('TOKEN')
+    scraper = bool(token) and request.META.get('HTTP_AUTHORIZATION') == f'Bearer {token}'
+    user = getattr(request, 'user', None)
+    if not scraper and not (user is not None and user.is_staff):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 from pathlib import Path
 import os 
+import sys
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -24,6 +25,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key_if_not_found')
 DEBUG = os.getenv('DEBUG', 'False') == 'True'  # Converts the string 'True' to a boolean True
+TESTING = sys.argv[1:2] == ['test']
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 
@@ -32,10 +34,69 @@ ALLOWED_HOSTS = []
 
 ASGI_APPLICATION = 'sw_project_management.asgi.application'
 
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer"
+# InMemoryChannelLayer only delivers within one process. Use "redis" in
+# production with more than one worker, or "sqlite" to share a local file
+# between workers when Redis is not available (development and tests).
+CHANNEL_LAYER_BACKEND = os.getenv('CHANNEL_LAYER_BACKEND', 'memory')
+
+if CHANNEL_LAYER_BACKEND == 'redis':
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": [os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0')],
+            },
+        }
     }
+elif CHANNEL_LAYER_BACKEND == 'sqlite':
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "manager.channel_layers.SQLiteChannelLayer",
+            "CONFIG": {
+                "path": os.getenv('CHANNEL_LAYER_PATH', str(BASE_DIR / 'channels.sqlite3')),
+            },
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer"
+        }
+    }
+
+# Notifications are written to manager.NotificationOutbox inside the request
+# transaction and pushed to the channel layer after commit by a background
+# dispatcher. Set AUTOSTART to False to run `manage.py dispatch_notifications`
+# as a separate process instead. Tests drain the outbox themselves.
+NOTIFICATION_OUTBOX = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 2,
+    'AUTOSTART': not TESTING,
+}
+
+# Requirements generation for new projects runs as a background job.
+# ThreadPoolJobBackend runs it inside the web process, DatabaseQueueJobBackend
+# leaves it for `manage.py run_requirements_jobs`, and CeleryJobBackend sends
+# it to `celery -A SW_Project_Management worker`. Jobs still running after
+# CLAIM_TIMEOUT seconds are presumed abandoned and run again; with the thread
+# pool, each web process reruns leftover jobs on its first request.
+REQUIREMENTS_JOBS = {
+    'BACKEND': os.getenv('REQUIREMENTS_JOBS_BACKEND', 'manager.jobs.ThreadPoolJobBackend'),
+    'WORKERS': 2,
+    'CLAIM_TIMEOUT': 600,
+    'RECOVER': not TESTING,
+}
+
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://127.0.0.1:6379/1')
+
+# Stored notifications are replayed to consumers that reconnect with
+# ?last_seen_id=<id>; `manage.py purge_notifications` removes old ones.
+NOTIFICATIONS = {
+    'REPLAY_LIMIT': 500,
+    'ACK_FLUSH_INTERVAL': 1.0,
+    'ACK_BATCH_SIZE': 100,
+    'RETENTION_DAYS': 30,
 }
 
 
@@ -65,15 +126,43 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_USE_SSL=False
 
+# Outgoing mail is queued in QueuedEmail and sent by a background sender (accounts/mail.py).
+# Sent and undeliverable rows are deleted after RETENTION_DAYS.
+EMAIL_QUEUE = {
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 5,
+    'AUTOSTART': not TESTING,
+    'RETENTION_DAYS': 7,
+}
+
 
 
 
 
 AUTH_USER_MODEL = 'accounts.CustomUser'
+# NUM_PROXIES is the number of reverse proxies in front of the app. DRF only
+# trusts that many X-Forwarded-For entries when identifying a client for
+# throttling; with 0 it uses REMOTE_ADDR, so a client cannot pick its own IP.
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
+}
+
+# Verified access tokens kept per process by CachedJWTAuthentication.
+AUTH_TOKEN_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'TIMEOUT': 30,
+}
+
+# In-memory bloom filter in front of the refresh token blacklist (accounts/blacklist.py).
+TOKEN_BLACKLIST_FILTER = {
+    'REFRESH_INTERVAL': 5,
+    'REBUILD_INTERVAL': 300,
+    'FALSE_POSITIVE_RATE': 0.001,
+    'MIN_CAPACITY': 10000,
 }
 from datetime import timedelta
 
@@ -109,7 +198,9 @@ SIMPLE_JWT = {
 
 
 MIDDLEWARE = [
+    'SW_Project_Management.request_metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'SW_Project_Management.db_routing.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -120,6 +211,17 @@ MIDDLEWARE = [
 ]
 CORS_ORIGIN_ALLOW_ALL = True
 
+# Request metrics served at /metrics (see SW_Project_Management/request_metrics.py)
+# to scrapers sending "Authorization: Bearer $METRICS_TOKEN" and to staff.
+# Lower REQUEST_METRICS_SAMPLE_RATE to time SQL on fewer requests. Server-Timing
+# headers follow DEBUG unless SERVER_TIMING is set.
+
+REQUEST_METRICS = {
+    'SAMPLE_RATE': float(os.getenv('REQUEST_METRICS_SAMPLE_RATE', '1.0')),
+    'SERVER_TIMING': None,
+    'TOKEN': os.getenv('METRICS_TOKEN'),
+}
+
 ROOT_URLCONF = 'SW_Project_Management.urls'
 
 TEMPLATES = [
@@ -151,6 +253,116 @@ DATABASES = {
     }
 }
 
+# Read replicas (see SW_Project_Management/db_routing.py). DB_REPLICA_PATHS is
+# a comma-separated list of SQLite files; for a local setup keep them current
+# with `python manage.py replicate_sqlite`. Tests read them through default.
+
+DB_REPLICA_PATHS = [path for path in os.getenv('DB_REPLICA_PATHS', '').split(',') if path]
+
+for index, path in enumerate(DB_REPLICA_PATHS, start=1):
+    DATABASES[f'replica_{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Pragmas and transaction mode applied to every SQLite connection (see
+# SW_Project_Management/sqlite_profile.py). SQLITE_WRITE_QUEUE=1 also queues
+# this process's write transactions on a lock.
+
+SQLITE_PROFILE = {
+    'JOURNAL_MODE': 'WAL',
+    'SYNCHRONOUS': 'NORMAL',
+    'BUSY_TIMEOUT': 5000,
+    'CACHE_SIZE': -65536,  # 64 MiB
+    'MMAP_SIZE': 268435456,  # 256 MiB
+    'TRANSACTION_MODE': 'IMMEDIATE',
+    'WRITE_QUEUE': os.getenv('SQLITE_WRITE_QUEUE') == '1',
+}
+
+DATABASE_ROUTERS = ['SW_Project_Management.db_routing.ReplicaRouter']
+
+# Read-your-writes pins live in the "replica_pins" cache, which every worker
+# must share: a file cache by default, since the replicas are local files.
+DATABASE_REPLICAS = {
+    'ALIASES': [f'replica_{index}' for index in range(1, len(DB_REPLICA_PATHS) + 1)],
+    'STICKY_SECONDS': 10,
+    'CACHE_ALIAS': 'replica_pins',
+}
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+#
+# "responses" holds the per-user versioned payloads of the polled list
+# endpoints (see manager/response_cache.py). The file backend shares it between
+# workers on a host; RESPONSE_CACHE_BACKEND=locmem keeps it per process, where
+# entries only live for a few seconds because other workers' bumps are unseen.
+
+RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'locmem' if TESTING else 'file')
+
+# Login/password-reset throttling state (accounts/throttling.py): the file
+# store shares it between workers on a host, THROTTLE_STORE=redis between
+# hosts. THROTTLE_STORE=locmem keeps it per process, which multiplies every
+# limit by the number of workers.
+
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', 'locmem' if TESTING else 'file')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', str(BASE_DIR / '.response_cache')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    } if RESPONSE_CACHE_BACKEND == 'file' else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('THROTTLE_CACHE_LOCATION', str(BASE_DIR / '.throttle_cache')),
+    } if THROTTLE_STORE == 'file' else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'throttle',
+    },
+    'replica_pins': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('REPLICA_PIN_CACHE_LOCATION', str(BASE_DIR / '.replica_pin_cache')),
+    },
+}
+
+RESPONSE_CACHE = {
+    'ALIAS': 'responses',
+    'TIMEOUT': 3600,
+    'LOCAL_TIMEOUT': 5,
+}
+
+LOGIN_THROTTLE = {
+    'STORE': 'accounts.throttling.RedisTokenBucketStore' if THROTTLE_STORE == 'redis' else 'accounts.throttling.CacheTokenBucketStore',
+    'STORE_OPTIONS': {'url': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0')} if THROTTLE_STORE == 'redis' else {'alias': 'throttle'},
+    'RATES': {
+        'login': {'email': (5, 300), 'ip': (30, 60)},
+        'password_reset': {'email': (3, 900), 'ip': (10, 300)},
+        'resend_verification': {'email': (3, 900), 'ip': (10, 300)},
+    },
+}
+
+RISK_CACHE = {
+    'MAX_ENTRIES': 1024,
+    'TIMEOUT': 600,
+}
+
+# Published AI models, laid out as <ROOT>/<name>/<version>/*.npy with a
+# <ROOT>/<name>/CURRENT file naming the active version (see manager/model_registry.py).
+
+AI_MODELS = {
+    'ROOT': os.getenv('AI_MODELS_ROOT', str(BASE_DIR / 'ai_models')),
+    'RELOAD_INTERVAL': 5,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
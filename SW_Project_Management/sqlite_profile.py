@@ -0,0 +1,118 @@
+"""
+Per-connection SQLite tuning for running on db.sqlite3 under concurrent load.
+
+Every new SQLite connection gets the SQLITE_PROFILE pragmas: WAL so readers
+and the writer do not block each other, a busy timeout, relaxed fsyncs, and
+a larger page cache and memory map. The cache and map pay off most with
+persistent connections (CONN_MAX_AGE).
+
+Transactions start with BEGIN IMMEDIATE instead of Django's deferred BEGIN.
+A deferred transaction that reads and then writes, as CompleteTaskView
+does, has to upgrade its lock. When another connection wrote in between,
+SQLite fails that upgrade with "database is locked" straight away instead
+of waiting out busy_timeout. Django 5.1 offers the same switch as
+OPTIONS['transaction_mode'].
+
+With WRITE_QUEUE on, write transactions in one process also queue on a
+lock, so waiting writers are handed the database as soon as it is free
+instead of polling in SQLite's busy handler. Readers never take the lock.
+"""
+
+import threading
+
+from django.conf import settings
+from django.db import OperationalError
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+DEFAULTS = {
+    'JOURNAL_MODE': None,  # e.g. 'WAL'
+    'SYNCHRONOUS': None,  # e.g. 'NORMAL', safe with WAL
+    'BUSY_TIMEOUT': None,  # milliseconds
+    'CACHE_SIZE': None,  # pages, or KiB when negative
+    'MMAP_SIZE': None,  # bytes
+    'TRANSACTION_MODE': None,  # 'IMMEDIATE' or 'EXCLUSIVE'; None keeps the deferred BEGIN
+    'WRITE_QUEUE': False,
+}
+
+
+def sqlite_setting(name):
+    return getattr(settings, 'SQLITE_PROFILE', {}).get(name, DEFAULTS[name])
+
+
+class WriteQueue:
+    """
+    Process-wide lock held from BEGIN until COMMIT or ROLLBACK, so write
+    transactions in this process run one after another.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._holder = threading.local()
+
+    def acquire(self, timeout):
+        if not self._lock.acquire(timeout=timeout):
+            raise OperationalError('database is locked (timed out in the write queue)')
+        self._holder.held = True
+
+    def release(self):
+        if getattr(self._holder, 'held', False):
+            self._holder.held = False
+            self._lock.release()
+
+
+write_queue = WriteQueue()
+
+
+def begin_transaction(connection, mode):
+    def start_transaction_under_autocommit():
+        if sqlite_setting('WRITE_QUEUE'):
+            write_queue.acquire(timeout=(sqlite_setting('BUSY_TIMEOUT') or 5000) / 1000)
+        try:
+            connection.cursor().execute(f'BEGIN {mode}')
+        except Exception:
+            write_queue.release()
+            raise
+
+    return start_transaction_under_autocommit
+
+
+def releasing(method):
+    def wrapper():
+        try:
+            return method()
+        finally:
+            write_queue.release()
+
+    return wrapper
+
+
+@receiver(connection_created)
+def apply_sqlite_profile(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+
+    pragmas = [
+        ('busy_timeout', sqlite_setting('BUSY_TIMEOUT')),
+        ('synchronous', sqlite_setting('SYNCHRONOUS')),
+        ('cache_size', sqlite_setting('CACHE_SIZE')),
+    ]
+    if not connection.is_in_memory_db():
+        pragmas += [
+            ('journal_mode', sqlite_setting('JOURNAL_MODE')),
+            ('mmap_size', sqlite_setting('MMAP_SIZE')),
+        ]
+    with connection.cursor() as cursor:
+        for pragma, value in pragmas:
+            if value is not None:
+                cursor.execute(f'PRAGMA {pragma} = {value}')
+
+    mode = sqlite_setting('TRANSACTION_MODE')
+    # connection_created fires on every reconnect of the same wrapper.
+    if mode and not getattr(connection, 'sqlite_profile_hooks', False):
+        connection.sqlite_profile_hooks = True
+        # Atomic blocks start their transaction through this hook on SQLite.
+        connection._start_transaction_under_autocommit = begin_transaction(connection, mode)
+        connection._commit = releasing(connection._commit)
+        connection._rollback = releasing(connection._rollback)
+        connection._close = releasing(connection._close)
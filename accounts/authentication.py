@@ -1,5 +1,16 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.conf import settings
 from django.contrib.auth.backends import BaseBackend
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
 
 User = get_user_model()
 
@@ -17,3 +28,144 @@ class EmailBackend(BaseBackend):
             return User.objects.get(pk=user_id)
         except User.DoesNotExist:
             return None
+
+
+DEFAULTS = {
+    'MAX_ENTRIES': 10000,  # least recently used tokens are dropped beyond this
+    'TIMEOUT': 30,  # seconds before a cached token is re-verified; bounds staleness in other workers
+}
+
+
+def token_cache_setting(name):
+    return getattr(settings, 'AUTH_TOKEN_CACHE', {}).get(name, DEFAULTS[name])
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified access tokens, indexed by user id so a user's
+    tokens can be dropped together. Only the validated claims are kept;
+    users are never cached, since views save request.user and a stale
+    copy would write old values back.
+
+    Entries are keyed by the whole raw token rather than its jti claim:
+    trusting a jti would mean trusting a claim whose signature has not
+    been checked yet.
+    """
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._user_tokens = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, raw_token):
+        with self._lock:
+            entry = self._entries.get(raw_token)
+            if entry is not None and entry[2] <= time.time():
+                self._discard(raw_token)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(raw_token)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, raw_token, user_id, validated_token):
+        if self.timeout <= 0 or self.max_entries <= 0:
+            return
+        expires_at = min(time.time() + self.timeout, validated_token.get('exp', float('inf')))
+        with self._lock:
+            self._entries[raw_token] = (user_id, validated_token, expires_at)
+            self._entries.move_to_end(raw_token)
+            self._user_tokens.setdefault(user_id, set()).add(raw_token)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for raw_token in self._user_tokens.pop(user_id, ()):
+                self._entries.pop(raw_token, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_tokens.clear()
+
+    def _discard(self, raw_token):
+        user_id, _, _ = self._entries.pop(raw_token)
+        tokens = self._user_tokens.get(user_id)
+        if tokens is not None:
+            tokens.discard(raw_token)
+            if not tokens:
+                del self._user_tokens[user_id]
+
+
+token_cache = TokenCache(token_cache_setting('MAX_ENTRIES'), token_cache_setting('TIMEOUT'))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that skips signature verification and claim parsing
+    for tokens it has recently verified in this process. The user is still
+    loaded on every request, so views always see and save current data.
+    accounts.signals drops a user's tokens when their password, is_active
+    or admin_role changes or their tokens are blacklisted.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = token_cache.get(raw_token)
+        if validated_token is not None:
+            return self.get_user(validated_token), validated_token
+
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_user(validated_token)
+        token_cache.set(raw_token, user.pk, validated_token)
+        return user, validated_token
+
+
+# WebSocket clients that cannot put the token in the query string send the
+# subprotocols "bearer, <access token>" instead.
+BEARER_SUBPROTOCOL = 'bearer'
+
+
+def websocket_token(scope):
+    subprotocols = scope.get('subprotocols') or []
+    if len(subprotocols) >= 2 and subprotocols[0] == BEARER_SUBPROTOCOL:
+        return subprotocols[1]
+    query = parse_qs(scope.get('query_string', b'').decode())
+    return query.get('token', [None])[0]
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Sets scope['user'] from a JWT access token, checked like an HTTP request
+    would be. Connections without a valid token get an AnonymousUser.
+    """
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope)
+        scope['user'] = await self.get_user(websocket_token(scope))
+        return await self.inner(scope, receive, send)
+
+    @database_sync_to_async
+    def get_user(self, raw_token):
+        if not raw_token:
+            return AnonymousUser()
+        authentication = CachedJWTAuthentication()
+        raw_token = raw_token.encode()
+        try:
+            validated_token = token_cache.get(raw_token) or authentication.get_validated_token(raw_token)
+            return authentication.get_user(validated_token)
+        except AuthenticationFailed:
+            return AnonymousUser()
@@ -0,0 +1,152 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import token_cache
+
+DEFAULTS = {
+    'REFRESH_INTERVAL': 5,  # seconds between loads of tokens blacklisted by other processes
+    'REBUILD_INTERVAL': 300,  # seconds between full rebuilds, which also drop expired tokens
+    'FALSE_POSITIVE_RATE': 0.001,
+    'MIN_CAPACITY': 10000,
+}
+
+
+def blacklist_setting(name):
+    return getattr(settings, 'TOKEN_BLACKLIST_FILTER', {}).get(name, DEFAULTS[name])
+
+
+class BloomFilter:
+    """
+    Fixed-size set of strings that answers "definitely absent" or "maybe
+    present", sized for ``capacity`` members at ``false_positive_rate``.
+    """
+
+    def __init__(self, capacity, false_positive_rate):
+        self.size = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + index * second) % self.size for index in range(self.hash_count))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class BlacklistFilter:
+    """
+    In-memory filter over blacklisted token jtis. Tokens blacklisted in this
+    process are added straight away. Tokens blacklisted elsewhere are picked
+    up by an indexed "id > last seen" query at most every REFRESH_INTERVAL
+    seconds, so another process may accept a token for that long after it
+    was blacklisted. The whole filter is rebuilt, and resized, every
+    REBUILD_INTERVAL seconds or once it holds more than its capacity.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._last_id = 0
+        self._checked_at = float('-inf')
+        self._built_at = float('-inf')
+
+    def might_contain(self, jti):
+        return jti in self.refresh()
+
+    def add(self, jtis):
+        with self._lock:
+            if self._filter is not None:
+                for jti in jtis:
+                    self._filter.add(jti)
+
+    def clear(self):
+        with self._lock:
+            self._filter = None
+            self._checked_at = float('-inf')
+
+    def refresh(self, force=False):
+        """
+        Bring the filter up to date if it is due and return it. The
+        reference is taken under the lock, so a concurrent clear() cannot
+        leave the caller holding None.
+        """
+        with self._lock:
+            if self._filter is not None and not force and time.monotonic() - self._checked_at < blacklist_setting('REFRESH_INTERVAL'):
+                return self._filter
+            if (
+                self._filter is None
+                or self._filter.count > self._capacity
+                or time.monotonic() - self._built_at >= blacklist_setting('REBUILD_INTERVAL')
+            ):
+                self._rebuild()
+            else:
+                self._load(self._filter)
+            self._checked_at = time.monotonic()
+            return self._filter
+
+    def _rebuild(self):
+        last_id = BlacklistedToken.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        # Expired tokens fail verification anyway, so they need no place in the filter.
+        live = BlacklistedToken.objects.filter(id__lte=last_id, token__expires_at__gt=timezone.now())
+        self._capacity = max(blacklist_setting('MIN_CAPACITY'), 2 * live.count())
+        self._filter = BloomFilter(self._capacity, blacklist_setting('FALSE_POSITIVE_RATE'))
+        for jti in live.values_list('token__jti', flat=True).iterator():
+            self._filter.add(jti)
+        self._last_id = last_id
+        self._built_at = time.monotonic()
+
+    def _load(self, bloom):
+        for row_id, jti in BlacklistedToken.objects.filter(id__gt=self._last_id).values_list('id', 'token__jti'):
+            bloom.add(jti)
+            self._last_id = max(self._last_id, row_id)
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class FilteredRefreshToken(RefreshToken):
+    """
+    RefreshToken whose blacklist check only reaches the database when the
+    in-memory filter says the jti may be blacklisted.
+    """
+
+    def check_blacklist(self):
+        if blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+
+def blacklist_outstanding_tokens(user):
+    """
+    Blacklist every outstanding token of ``user`` that is not blacklisted
+    yet, with one INSERT. bulk_create sends no post_save, so the filter and
+    the authentication cache are updated here. Returns how many were added.
+    """
+    pending = list(
+        OutstandingToken.objects
+        .filter(user=user, blacklistedtoken__isnull=True)
+        .values_list('id', 'jti')
+    )
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token_id=token_id) for token_id, _ in pending],
+        ignore_conflicts=True,
+    )
+    blacklist_filter.add(jti for _, jti in pending)
+    token_cache.invalidate_user(user.pk)
+    return len(pending)
@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 5,  # seconds, doubled after every failed attempt
+    'CLAIM_TIMEOUT': 120,  # seconds before a claimed but unsent batch is retried
+    'POLL_INTERVAL': 10,  # seconds between queue scans when nothing wakes the sender
+    'AUTOSTART': True,  # run the sender in a background thread of each web worker
+    # Days sent and undeliverable emails are kept. Bodies hold verification and
+    # password reset codes in plain text, so keep this short.
+    'RETENTION_DAYS': 7,
+    'PURGE_INTERVAL': 3600,  # seconds between purges by a running sender
+}
+
+
+def email_queue_setting(name):
+    return getattr(settings, 'EMAIL_QUEUE', {}).get(name, DEFAULTS[name])
+
+
+def queue_mail(subject, body, recipients, from_email=None):
+    """
+    Queue an email in the caller's transaction; it is sent in the background
+    once that transaction commits.
+    """
+    email = QueuedEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipients),
+    )
+    if email_queue_setting('AUTOSTART'):
+        transaction.on_commit(sender.wake)
+    return email
+
+
+class EmailSender:
+    """
+    Drains QueuedEmail in batches over one SMTP connection, which stays open
+    from batch to batch while there is mail to send.
+
+    Batches are claimed with a single UPDATE so several workers can run a
+    sender against the same table without sending a message twice.
+    """
+
+    def __init__(self):
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._purged_at = None
+
+    def wake(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.run_forever, name='email-queue', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def run_forever(self):
+        while True:
+            self._wakeup.wait(email_queue_setting('POLL_INTERVAL'))
+            self._wakeup.clear()
+            try:
+                self.send_all()
+                self.purge_if_due()
+            except Exception:
+                logger.exception('Email queue delivery failed')
+            finally:
+                close_old_connections()
+
+    def purge_if_due(self):
+        """
+        Purge at most once per PURGE_INTERVAL. Returns the number of rows deleted.
+        """
+        now = time.monotonic()
+        if self._purged_at is not None and now - self._purged_at < email_queue_setting('PURGE_INTERVAL'):
+            return 0
+        self._purged_at = now
+        return self.purge()
+
+    def purge(self):
+        """
+        Delete emails sent, or given up on after MAX_ATTEMPTS, more than
+        RETENTION_DAYS ago. Returns the number of rows deleted.
+        """
+        cutoff = timezone.now() - timedelta(days=email_queue_setting('RETENTION_DAYS'))
+        sent = QueuedEmail.objects.filter(sent_at__lt=cutoff)
+        undeliverable = QueuedEmail.objects.filter(
+            sent_at__isnull=True, attempts__gte=email_queue_setting('MAX_ATTEMPTS'), created_at__lt=cutoff,
+        )
+        return sent.delete()[0] + undeliverable.delete()[0]
+
+    def send_all(self):
+        """
+        Send every due email, reusing one connection. Returns how many were handled.
+        """
+        connection = get_connection(fail_silently=False)
+        handled = 0
+        try:
+            while True:
+                batch = self.drain(connection)
+                if not batch:
+                    return handled
+                handled += batch
+        finally:
+            connection.close()
+
+    def drain(self, connection):
+        """
+        Send one batch of due emails over ``connection``. Returns the number of rows handled.
+        """
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        due = QueuedEmail.objects.filter(
+            sent_at__isnull=True,
+            attempts__lt=email_queue_setting('MAX_ATTEMPTS'),
+            next_attempt_at__lte=now,
+        )
+        due_ids = list(due.order_by('id').values_list('id', flat=True)[:email_queue_setting('BATCH_SIZE')])
+        if not due_ids:
+            return 0
+
+        # Rows another sender claimed in the meantime no longer match ``due``.
+        claimed = due.filter(id__in=due_ids).update(
+            claim_token=token,
+            next_attempt_at=now + timedelta(seconds=email_queue_setting('CLAIM_TIMEOUT')),
+        )
+        if not claimed:
+            return 0
+
+        batch = list(QueuedEmail.objects.filter(claim_token=token).order_by('id'))
+        for email in batch:
+            email.attempts += 1
+            message = EmailMessage(email.subject, email.body, email.from_email, email.recipients, connection=connection)
+            try:
+                # Opening explicitly keeps send_messages from closing the connection after each message.
+                connection.open()
+                connection.send_messages([message])
+            except Exception as exc:
+                delay = email_queue_setting('RETRY_DELAY') * 2 ** (email.attempts - 1)
+                email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+                email.last_error = repr(exc)
+                logger.warning('Email %s to %s failed: %r', email.id, email.recipients, exc)
+                # The connection may be unusable now; the next send opens a fresh one.
+                connection.close()
+            else:
+                email.sent_at = timezone.now()
+                email.last_error = ''
+
+        QueuedEmail.objects.bulk_update(batch, ['attempts', 'next_attempt_at', 'last_error', 'sent_at'])
+        return len(batch)
+
+
+sender = EmailSender()
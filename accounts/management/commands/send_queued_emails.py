@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.mail import email_queue_setting, sender
+
+
+class Command(BaseCommand):
+    help = (
+        'Send queued emails over a reused SMTP connection, and purge old sent and undeliverable ones. '
+        'Use with EMAIL_QUEUE["AUTOSTART"] = False.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = sender.send_all()
+            if sent:
+                self.stdout.write(f'Handled {sent} queued emails.')
+            purged = sender.purge_if_due()
+            if purged:
+                self.stdout.write(f'Purged {purged} old queued emails.')
+            if options['once']:
+                break
+            close_old_connections()
+            time.sleep(email_queue_setting('POLL_INTERVAL'))
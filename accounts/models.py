@@ -19,3 +19,22 @@ class CustomUser(AbstractUser):
         return self.email
     USERNAME_FIELD = 'email'  # Use email to identify the user
     REQUIRED_FIELDS = []  # 'username' is no longer required
+
+
+class QueuedEmail(models.Model):
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True, default='')
+    recipients = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True, default='')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['sent_at', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f'{self.subject} to {", ".join(self.recipients)}'
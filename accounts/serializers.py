@@ -1,28 +1,24 @@
 
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
-from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
+from django.db import transaction
 import datetime
 from django.contrib.auth import get_user_model, authenticate
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 import secrets
 from rest_framework_simplejwt.exceptions import AuthenticationFailed
 from .models import CustomUser
+from .blacklist import FilteredRefreshToken
+from .mail import queue_mail
 
 User = get_user_model()
 
 def send_verification_email(user):
     subject = 'Verify your account'
     message = f'Your verification code is: {user.verification_code}'
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        fail_silently=False,
-    )
+    queue_mail(subject, message, [user.email])
 
 
 
@@ -58,8 +54,10 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         user.verification_code = secrets.token_urlsafe(16)[:6]
         user.verification_code_expiry = timezone.now() + datetime.timedelta(minutes=10)
         try:
-            user.save()
-            send_verification_email(user)
+            # The user and their queued verification email commit together.
+            with transaction.atomic():
+                user.save()
+                send_verification_email(user)
             return user
         except Exception as e:
             raise serializers.ValidationError({"email": "Failed to send verification email, please try again."})
@@ -77,12 +75,10 @@ class PasswordResetRequestSerializer(serializers.Serializer):
         user = User.objects.get(email=self.validated_data['email'])
         user.reset_code = secrets.token_urlsafe(10)
         user.save()
-        send_mail(
+        queue_mail(
             'Password Reset Request',
             f'Your password reset code is: {user.reset_code}',
-            settings.DEFAULT_FROM_EMAIL,
             [user.email],
-            fail_silently=False,
         )
 
 
@@ -137,6 +133,10 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
             'admin_role':user.admin_role
         }
 
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FilteredRefreshToken
+
+
 class UsernameUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
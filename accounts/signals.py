@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .authentication import token_cache
+from .blacklist import blacklist_filter
+from .models import CustomUser
+
+# Changes to these fields drop the user's cached tokens.
+AUTH_FIELDS = ('password', 'is_active', 'admin_role')
+
+
+def auth_snapshot(instance):
+    # Read __dict__ directly so deferred fields are not fetched on load.
+    return tuple(instance.__dict__.get(field) for field in AUTH_FIELDS)
+
+
+@receiver(post_init, sender=CustomUser)
+def user_loaded(sender, instance, **kwargs):
+    instance._cached_auth = auth_snapshot(instance)
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, created, **kwargs):
+    snapshot = auth_snapshot(instance)
+    if not created and snapshot != instance._cached_auth:
+        token_cache.invalidate_user(instance.pk)
+    instance._cached_auth = snapshot
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    token_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def token_blacklisted(sender, instance, **kwargs):
+    blacklist_filter.add([instance.token.jti])
+    token_cache.invalidate_user(instance.token.user_id)
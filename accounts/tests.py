@@ -1,3 +1,341 @@
-from django.test import TestCase
+import socketserver
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import CachedJWTAuthentication, token_cache
+from .blacklist import BloomFilter, blacklist_filter
+from .mail import queue_mail, sender
+from .models import CustomUser, QueuedEmail
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        self.user.set_password('old-password')
+        self.user.save()
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.access = str(self.refresh.access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+
+    def get_details(self):
+        return self.client.get('/api/user/details/')
+
+    def verifications(self):
+        return mock.patch.object(
+            CachedJWTAuthentication, 'get_validated_token', wraps=CachedJWTAuthentication().get_validated_token,
+        )
+
+    def test_repeat_requests_skip_token_verification(self):
+        with self.verifications() as verify:
+            self.assertEqual(self.get_details().status_code, 200)
+            with self.assertNumQueries(1):
+                response = self.get_details()
+        self.assertEqual(verify.call_count, 1)
+        self.assertEqual(response.data['email'], 'dev@example.com')
+
+    def test_deactivation_takes_effect_immediately(self):
+        self.get_details()
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.get_details().status_code, 401)
+
+    def test_password_and_role_changes_drop_cached_tokens(self):
+        for change in (lambda user: user.set_password('new-password'), lambda user: setattr(user, 'admin_role', True)):
+            self.get_details()
+            user = CustomUser.objects.get(pk=self.user.pk)
+            change(user)
+            user.save()
+            with self.verifications() as verify:
+                self.get_details()
+            self.assertEqual(verify.call_count, 1)
+
+    def test_logout_blacklisting_drops_cached_tokens(self):
+        self.get_details()
+        response = self.client.post('/api/logout/', {'refresh_token': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 204)
+
+        with self.verifications() as verify:
+            self.get_details()
+        self.assertEqual(verify.call_count, 1)
+
+    def test_views_see_and_save_current_user_data(self):
+        self.get_details()
+        response = self.client.patch('/api/user/update-username/', {'username': 'renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_details().data['username'], 'renamed')
+
+        response = self.client.put(
+            '/api/user/update-password/', {'current_password': 'old-password', 'password': 'N3w-passw0rd!x', 'password2': 'N3w-passw0rd!x'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(CustomUser.objects.get(pk=self.user.pk).username, 'renamed')
+
+
+class TokenBlacklistTests(TestCase):
+    def setUp(self):
+        blacklist_filter.clear()
+        self.user = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        self.client = APIClient()
+
+    def logout(self, extra_tokens):
+        for _ in range(extra_tokens):
+            RefreshToken.for_user(self.user)
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        blacklist_filter.refresh(force=True)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/logout/', {'refresh_token': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, 204)
+        return len(queries)
+
+    def test_logout_query_count_does_not_grow_with_tokens(self):
+        few = self.logout(extra_tokens=2)
+        BlacklistedToken.objects.all().delete()
+        many = self.logout(extra_tokens=100)
+
+        self.assertEqual(few, many)
+        self.assertEqual(BlacklistedToken.objects.count(), OutstandingToken.objects.count())
+
+    def refresh(self, token):
+        return self.client.post('/api/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_refresh_skips_the_blacklist_query_for_live_tokens(self):
+        token = RefreshToken.for_user(self.user)
+        blacklist_filter.refresh(force=True)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.refresh(token)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([query for query in queries if 'blacklistedtoken' in query['sql']])
+
+    def test_refresh_rejects_blacklisted_tokens(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, 200)
+        token.blacklist()
+
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_tokens_blacklisted_by_other_processes_are_picked_up(self):
+        token = RefreshToken.for_user(self.user)
+        blacklist_filter.refresh(force=True)
+        # A bulk insert sends no signal, as if another worker had written it.
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=OutstandingToken.objects.get(jti=token['jti']))])
+
+        blacklist_filter.refresh(force=True)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_clear_between_refresh_and_lookup_rebuilds(self):
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        blacklist_filter.refresh(force=True)
+        blacklist_filter.clear()
+
+        self.assertTrue(blacklist_filter.might_contain(token['jti']))
+        self.assertFalse(blacklist_filter.might_contain('never-issued'))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, false_positive_rate=0.01)
+        members = [f'member-{index}' for index in range(1000)]
+        for member in members:
+            bloom.add(member)
+
+        self.assertTrue(all(member in bloom for member in members))
+        false_positives = sum(f'other-{index}' in bloom for index in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class SMTPStandIn(socketserver.StreamRequestHandler):
+    """
+    Just enough of an SMTP server for the email queue tests: accepts mail
+    without authentication or TLS, counts connections and can refuse the
+    next few senders with a temporary failure.
+    """
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.reply('220 localhost stand-in')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.split(b' ', 1)[0].strip().upper()
+            if command in (b'EHLO', b'HELO'):
+                self.reply('250 localhost')
+            elif command == b'MAIL':
+                if server.refuse_next:
+                    server.refuse_next -= 1
+                    self.reply('451 try again later')
+                else:
+                    self.reply('250 OK')
+            elif command in (b'RCPT', b'RSET', b'NOOP'):
+                self.reply('250 OK')
+            elif command == b'DATA':
+                self.reply('354 end with .')
+                data = b''.join(iter(self.rfile.readline, b'.\r\n'))
+                server.messages.append(data)
+                self.reply('250 queued')
+            elif command == b'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('502 not implemented')
+
+
+class EmailQueueTests(TestCase):
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPStandIn)
+        self.server.daemon_threads = True
+        self.server.connections = 0
+        self.server.refuse_next = 0
+        self.server.messages = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        smtp = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=self.server.server_address[1],
+            EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+            EMAIL_QUEUE={'BATCH_SIZE': 2, 'RETRY_DELAY': 60},
+        )
+        smtp.enable()
+        self.addCleanup(smtp.disable)
+        caches['throttle'].clear()
+
+    def test_password_reset_request_only_queues_the_email(self):
+        CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = APIClient().post('/api/password-reset-request/', {'email': 'dev@example.com'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.messages, [])
+        self.assertEqual(QueuedEmail.objects.get().recipients, ['dev@example.com'])
+        self.assertEqual(callbacks, [sender.wake])
+
+    def test_batches_share_one_smtp_connection(self):
+        for index in range(5):
+            queue_mail(f'Subject {index}', 'Body', [f'user{index}@example.com'])
+
+        self.assertEqual(sender.send_all(), 5)
+
+        self.assertEqual(len(self.server.messages), 5)
+        self.assertEqual(self.server.connections, 1)
+        self.assertFalse(QueuedEmail.objects.filter(sent_at__isnull=True).exists())
+
+    def test_failed_messages_are_retried_with_backoff(self):
+        first = queue_mail('First', 'Body', ['first@example.com'])
+        queue_mail('Second', 'Body', ['second@example.com'])
+        self.server.refuse_next = 1
+
+        with self.assertLogs('accounts.mail', level='WARNING'):
+            sender.send_all()
+        first.refresh_from_db()
+        self.assertIsNone(first.sent_at)
+        self.assertEqual(first.attempts, 1)
+        self.assertIn('try again later', first.last_error)
+        self.assertGreater(first.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertEqual(len(self.server.messages), 1)
+
+        QueuedEmail.objects.filter(id=first.id).update(next_attempt_at=timezone.now())
+        sender.send_all()
+        first.refresh_from_db()
+        self.assertIsNotNone(first.sent_at)
+        self.assertEqual(len(self.server.messages), 2)
+
+    def test_old_sent_and_undeliverable_emails_are_purged(self):
+        old = timezone.now() - timedelta(days=8)
+        sent = queue_mail('Sent', 'Code 123456', ['a@example.com'])
+        dead = queue_mail('Dead', 'Code 654321', ['b@example.com'])
+        retrying = queue_mail('Retrying', 'Body', ['c@example.com'])
+        recent = queue_mail('Recent', 'Body', ['d@example.com'])
+        QueuedEmail.objects.filter(id=sent.id).update(sent_at=old)
+        QueuedEmail.objects.filter(id__in=[dead.id, retrying.id]).update(created_at=old)
+        QueuedEmail.objects.filter(id=dead.id).update(attempts=5)
+        QueuedEmail.objects.filter(id=retrying.id).update(attempts=2)
+        QueuedEmail.objects.filter(id=recent.id).update(sent_at=timezone.now())
+
+        sender._purged_at = None
+        self.assertEqual(sender.purge_if_due(), 2)
+        self.assertEqual(sorted(QueuedEmail.objects.values_list('subject', flat=True)), ['Recent', 'Retrying'])
+        # The next purge waits for PURGE_INTERVAL.
+        QueuedEmail.objects.filter(id=recent.id).update(sent_at=old)
+        self.assertEqual(sender.purge_if_due(), 0)
+
+
+@override_settings(LOGIN_THROTTLE={
+    'STORE': 'accounts.throttling.CacheTokenBucketStore',
+    'STORE_OPTIONS': {'alias': 'throttle'},
+    'RATES': {
+        'login': {'email': (3, 60), 'ip': (5, 60)},
+        'password_reset': {'email': (2, 60), 'ip': (5, 60)},
+        'resend_verification': {'email': (2, 60), 'ip': (5, 60)},
+    },
+})
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        self.user = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        self.user.set_password('right-password')
+        self.user.save()
+        self.client = APIClient()
+
+    def login(self, email='dev@example.com', password='wrong-password', ip='10.0.0.1'):
+        return self.client.post('/api/login/', {'email': email, 'password': password}, format='json', REMOTE_ADDR=ip)
+
+    def test_email_bucket_rejects_before_hashing(self):
+        with mock.patch('accounts.serializers.authenticate', return_value=None) as authenticate:
+            statuses = [self.login(ip=f'10.0.0.{index}').status_code for index in range(5)]
+
+        self.assertEqual(statuses, [401, 401, 401, 429, 429])
+        self.assertEqual(authenticate.call_count, 3)
+        self.assertIn('Retry-After', self.login())
+
+    def test_ip_bucket_limits_many_emails_from_one_client(self):
+        statuses = [self.login(email=f'user{index}@example.com').status_code for index in range(6)]
+        self.assertEqual(statuses[-1], 429)
+        self.assertEqual(self.login(email='other@example.com', ip='10.0.0.2').status_code, 401)
+
+    def test_forwarded_for_header_does_not_change_the_ip_bucket(self):
+        statuses = [
+            self.client.post(
+                '/api/login/', {'email': f'user{index}@example.com', 'password': 'wrong-password'}, format='json',
+                REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'203.0.113.{index}',
+            ).status_code
+            for index in range(6)
+        ]
+        self.assertEqual(statuses[-1], 429)
+
+    def test_buckets_refill_over_time(self):
+        now = 1_000_000.0
+        with mock.patch('accounts.throttling.time.time', side_effect=lambda: now):
+            for _ in range(3):
+                self.login()
+            self.assertEqual(self.login(password='right-password').status_code, 429)
+            now += 20  # one token back at 3 per 60 seconds
+            self.assertEqual(self.login(password='right-password').status_code, 200)
+
+    def test_password_reset_and_resend_verification_are_throttled(self):
+        CustomUser.objects.create(email='new@example.com', username='new', is_active=False)
+        for url, email in (('/api/password-reset-request/', 'dev@example.com'), ('/api/resend-verification/', 'new@example.com')):
+            statuses = [self.client.post(url, {'email': email}, format='json').status_code for _ in range(3)]
+            self.assertEqual(statuses, [200, 200, 429])
+        self.assertEqual(QueuedEmail.objects.count(), 4)
 
-# Create your tests here.
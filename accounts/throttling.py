@@ -0,0 +1,149 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+DEFAULTS = {
+    'STORE': 'accounts.throttling.CacheTokenBucketStore',
+    'STORE_OPTIONS': {'alias': 'default'},
+    # scope: {bucket: (capacity, seconds to refill an empty bucket)}
+    'RATES': {
+        'login': {'email': (5, 300), 'ip': (30, 60)},
+        'password_reset': {'email': (3, 900), 'ip': (10, 300)},
+        'resend_verification': {'email': (3, 900), 'ip': (10, 300)},
+    },
+}
+
+
+def throttle_setting(name):
+    return getattr(settings, 'LOGIN_THROTTLE', {}).get(name, DEFAULTS[name])
+
+
+class CacheTokenBucketStore:
+    """
+    Token buckets in a Django cache. State is shared by every worker that
+    uses the same cache (file, Redis or Memcached backends). The read and
+    write are not atomic, so concurrent requests for one key can each take
+    the last token; use RedisTokenBucketStore where that matters.
+    """
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def consume(self, key, capacity, period):
+        """
+        Take one token from ``key``'s bucket. Returns (allowed, seconds until
+        the next token when refused).
+        """
+        now = time.time()
+        rate = capacity / period
+        tokens, updated = self.cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        if tokens < 1:
+            return False, (1 - tokens) / rate
+        # An untouched bucket is full again after ``period``, so it can expire then.
+        self.cache.set(key, (tokens - 1, now), timeout=math.ceil(period))
+        return True, 0
+
+
+class RedisTokenBucketStore:
+    """
+    Token buckets in Redis, updated atomically by a Lua script, for limits
+    shared across hosts.
+    """
+
+    script = """
+        local capacity = tonumber(ARGV[1])
+        local rate = tonumber(ARGV[2])
+        local now = tonumber(ARGV[3])
+        local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+        local tokens = tonumber(bucket[1]) or capacity
+        local updated = tonumber(bucket[2]) or now
+        tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+        local allowed = 0
+        if tokens >= 1 then
+            tokens = tokens - 1
+            allowed = 1
+        end
+        redis.call('HMSET', KEYS[1], 'tokens', tostring(tokens), 'updated', ARGV[3])
+        redis.call('EXPIRE', KEYS[1], ARGV[4])
+        return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url='redis://127.0.0.1:6379/0'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.consume_script = self.client.register_script(self.script)
+
+    def consume(self, key, capacity, period):
+        rate = capacity / period
+        allowed, tokens = self.consume_script(keys=[key], args=[capacity, rate, repr(time.time()), math.ceil(period)])
+        if allowed:
+            return True, 0
+        return False, (1 - float(tokens)) / rate
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = import_string(throttle_setting('STORE'))(**throttle_setting('STORE_OPTIONS'))
+        return _store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Allows a request only if both the client IP's bucket and the bucket of
+    the email in the request body have a token left. It runs in DRF's
+    check_throttles, before the view authenticates or sends anything. The
+    IP is REMOTE_ADDR unless REST_FRAMEWORK['NUM_PROXIES'] says proxies set
+    X-Forwarded-For.
+    """
+    scope = None
+
+    def allow_request(self, request, view):
+        rates = throttle_setting('RATES')[self.scope]
+        store = get_store()
+        self.retry_after = None
+        for bucket, identity in (('ip', self.get_ident(request)), ('email', self.get_email(request))):
+            if not identity:
+                continue
+            capacity, period = rates[bucket]
+            allowed, retry_after = store.consume(self.get_cache_key(bucket, identity), capacity, period)
+            if not allowed:
+                self.retry_after = retry_after
+                return False
+        return True
+
+    def get_email(self, request):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        return email.strip().lower() if isinstance(email, str) else None
+
+    def get_cache_key(self, bucket, identity):
+        digest = hashlib.sha256(identity.encode()).hexdigest()[:32]
+        return f'throttle:{self.scope}:{bucket}:{digest}'
+
+    def wait(self):
+        return self.retry_after
+
+
+class LoginThrottle(TokenBucketThrottle):
+    scope = 'login'
+
+
+class PasswordResetThrottle(TokenBucketThrottle):
+    scope = 'password_reset'
+
+
+class ResendVerificationThrottle(TokenBucketThrottle):
+    scope = 'resend_verification'
@@ -1,11 +1,11 @@
 from django.urls import path
-from .views import UserRegistrationView, VerifyEmailView, UserDetailView,PasswordResetRequestView,UsernameUpdateView,PasswordUpdateView, PasswordResetView,LogoutView,CustomTokenObtainPairView,ResendVerificationCode
-from rest_framework_simplejwt.views import  TokenRefreshView, TokenVerifyView
+from .views import UserRegistrationView, VerifyEmailView, UserDetailView,PasswordResetRequestView,UsernameUpdateView,PasswordUpdateView, PasswordResetView,LogoutView,CustomTokenObtainPairView,ResendVerificationCode,FilteredTokenRefreshView
+from rest_framework_simplejwt.views import TokenVerifyView
 
 urlpatterns = [
     path('register/', UserRegistrationView.as_view(), name='register'),
     path('verify-email/', VerifyEmailView.as_view(), name='verify-email'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', FilteredTokenRefreshView.as_view(), name='token_refresh'),
     path('token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     path('password-reset-request/', PasswordResetRequestView.as_view(), name='password-reset-request'),
     path('password-reset/', PasswordResetView.as_view(), name='password-reset'),
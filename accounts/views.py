@@ -10,7 +10,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.exceptions import AuthenticationFailed
 from datetime import timedelta
@@ -19,7 +19,9 @@ from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.permissions import AllowAny
 import secrets
-from .serializers import CustomTokenObtainPairSerializer
+from .serializers import CustomTokenObtainPairSerializer, FilteredTokenRefreshSerializer
+from .blacklist import FilteredRefreshToken, blacklist_outstanding_tokens
+from .throttling import LoginThrottle, PasswordResetThrottle, ResendVerificationThrottle
 from rest_framework.exceptions import NotAuthenticated, APIException
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -72,6 +74,7 @@ class VerifyEmailView(APIView):
 
 class PasswordResetRequestView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [PasswordResetThrottle]
 
     def post(self, request):
         serializer = PasswordResetRequestSerializer(data=request.data)
@@ -104,11 +107,10 @@ class LogoutView(APIView):
     def post(self, request):
         try:
             refresh_token = request.data.get("refresh_token")
-            token = RefreshToken(refresh_token)
+            token = FilteredRefreshToken(refresh_token)
             token.blacklist()
 
-            for outstanding_token in OutstandingToken.objects.filter(user=request.user):
-                BlacklistedToken.objects.get_or_create(token=outstanding_token)
+            blacklist_outstanding_tokens(request.user)
 
             return Response({'message': 'You have been logged out successfully.'}, status=status.HTTP_204_NO_CONTENT)
         except TokenError as e:
@@ -117,8 +119,13 @@ class LogoutView(APIView):
 
 
 
+class FilteredTokenRefreshView(TokenRefreshView):
+    serializer_class = FilteredTokenRefreshSerializer
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [LoginThrottle]
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -141,6 +148,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
 
 class ResendVerificationCode(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [ResendVerificationThrottle]
 
     def post(self, request, format=None):
         email = request.data.get('email')
@@ -0,0 +1,72 @@
+"""
+Requests per second on UserDetailView with simplejwt's JWTAuthentication
+against CachedJWTAuthentication.
+
+    python benchmarks/auth.py [--requests 2000]
+
+Both runs send the same Bearer access token through the full Django/DRF
+stack with the test client. Both still load the user with one SELECT per
+request (queries_per_request), so the difference is only the token
+signature verification and claim parsing that the cache skips.
+"""
+import argparse
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import utils  # noqa: E402
+
+utils.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework_simplejwt.authentication import JWTAuthentication  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from accounts.authentication import CachedJWTAuthentication, token_cache  # noqa: E402
+from accounts.models import CustomUser  # noqa: E402
+from accounts.views import UserDetailView  # noqa: E402
+
+
+def run(label, authentication_class, client, requests):
+    token_cache.clear()
+    with mock.patch.object(UserDetailView, 'authentication_classes', [authentication_class]):
+        client.get('/api/user/details/')  # warm up
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(requests):
+                response = client.get('/api/user/details/')
+                assert response.status_code == 200, response.data
+            seconds = time.perf_counter() - started
+    return {
+        'authentication': label,
+        'requests': requests,
+        'seconds': round(seconds, 4),
+        'requests_per_second': round(requests / seconds, 1),
+        'queries_per_request': round(len(queries) / requests, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    with utils.test_database():
+        user = CustomUser.objects.create(email='bench@example.com', username='bench', is_active=True)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        results = [
+            run('JWTAuthentication', JWTAuthentication, client, args.requests),
+            run('CachedJWTAuthentication', CachedJWTAuthentication, client, args.requests),
+        ]
+
+    utils.report('auth', results)
+
+
+if __name__ == '__main__':
+    main()
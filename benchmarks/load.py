@@ -0,0 +1,379 @@
+"""
+End-to-end load test: latency percentiles and throughput per endpoint.
+
+    python manage.py seed_load_test --flush
+    DEBUG=True daphne -p 8000 SW_Project_Management.asgi:application
+    python benchmarks/load.py [--base-url http://127.0.0.1:8000] [--concurrency 16] [--duration 60]
+                              [--mix task_list=30,gantt=15,...] [--output results.json]
+
+Logs in a pool of seeded developers and managers, then --concurrency
+threads replay a weighted mix of scenarios over keep-alive HTTP
+connections for --duration seconds:
+
+    login               POST /api/login/ for a random seeded account
+    task_list           a developer's GET /api/tasks/
+    start_complete      a developer starts and then completes an open task
+    gantt               a manager's GET /api/project-gantt-chart/
+    developer_metrics   a manager's GET /api/developer/metrics/
+    notification        the project's manager listens on ws/notifications/<id>/
+                        while a developer completes a task; timed from the
+                        complete request to the notification frame
+
+The report is JSON with the commit it ran against, so runs on different
+commits can be diffed. Logins are throttled per address (accounts/throttling.py),
+so from one host a login-heavy mix mostly measures 429s.
+"""
+import argparse
+import base64
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import utils  # noqa: E402
+
+MANAGER_EMAIL = 'load-manager-{}@example.com'
+DEVELOPER_EMAIL = 'load-developer-{}@example.com'
+
+DEFAULT_MIX = 'task_list=30,gantt=15,developer_metrics=15,start_complete=10,notification=3,login=1'
+
+
+class Client:
+    """
+    One keep-alive HTTP connection per thread.
+    """
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return connection
+
+    def request(self, method, path, token=None, body=None):
+        headers = {'Accept': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        connection = self.connection()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self.local.connection = None
+            raise
+        try:
+            payload = json.loads(data) if data else None
+        except ValueError:
+            payload = None
+        return response.status, payload
+
+
+class WebSocket:
+    """
+    Minimal RFC 6455 client: enough to read the server's text frames.
+    """
+
+    def __init__(self, url, origin, timeout):
+        parts = urlsplit(url)
+        self.sock = socket.create_connection((parts.hostname, parts.port or 80), timeout)
+        self.buffer = b''
+        key = base64.b64encode(os.urandom(16)).decode()
+        target = parts.path + ('?' + parts.query if parts.query else '')
+        self.sock.sendall((
+            f'GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+            f'Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\nOrigin: {origin}\r\n\r\n'
+        ).encode())
+        while b'\r\n\r\n' not in self.buffer:
+            self._fill()
+        head, self.buffer = self.buffer.split(b'\r\n\r\n', 1)
+        if not head.startswith(b'HTTP/1.1 101'):
+            self.sock.close()
+            raise ConnectionError(head.split(b'\r\n')[0].decode())
+
+    def _fill(self):
+        chunk = self.sock.recv(65536)
+        if not chunk:
+            raise ConnectionError('WebSocket closed by the server')
+        self.buffer += chunk
+
+    def _take(self, size):
+        while len(self.buffer) < size:
+            self._fill()
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def _send(self, opcode, payload=b''):
+        mask = os.urandom(4)
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, 0x80 | length)
+        elif length < 65536:
+            header = struct.pack('!BBH', 0x80 | opcode, 0x80 | 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 0x80 | 127, length)
+        self.sock.sendall(header + mask + bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload)))
+
+    def receive(self):
+        while True:
+            first, second = self._take(2)
+            opcode, length = first & 0x0F, second & 0x7F
+            if length == 126:
+                length = struct.unpack('!H', self._take(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', self._take(8))[0]
+            mask = self._take(4) if second & 0x80 else None
+            payload = self._take(length)
+            if mask:
+                payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+            if opcode == 0x1:
+                return payload.decode()
+            if opcode == 0x8:
+                raise ConnectionError('WebSocket closed by the server')
+            if opcode == 0x9:
+                self._send(0xA, payload)
+
+    def close(self):
+        try:
+            self._send(0x8, struct.pack('!H', 1000))
+        except OSError:
+            pass
+        finally:
+            self.sock.close()
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, endpoint, started, status):
+        elapsed = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.statuses[endpoint][status] += 1
+            if isinstance(status, int) and status < 400:
+                self.samples[endpoint].append(elapsed)
+
+    def summary(self, duration):
+        results = {}
+        for endpoint in sorted(self.statuses):
+            samples = self.samples[endpoint]
+            statuses = self.statuses[endpoint]
+            row = {
+                'requests': sum(statuses.values()),
+                'ok': len(samples),
+                'throughput_per_second': round(len(samples) / duration, 2),
+                'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+            }
+            if len(samples) >= 2:
+                cuts = statistics.quantiles(samples, n=100)
+                row.update({'p50_ms': round(cuts[49], 2), 'p95_ms': round(cuts[94], 2), 'p99_ms': round(cuts[98], 2)})
+            results[endpoint] = row
+        return results
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.client = Client(args.base_url, args.timeout)
+        self.recorder = Recorder()
+        self.lock = threading.Lock()
+        self.developers = []  # {'token', 'tasks': [open task dicts]}
+        self.managers = []  # {'token', 'id', 'projects': {project ids}}
+
+    def call(self, endpoint, method, path, token=None, body=None):
+        started = time.perf_counter()
+        try:
+            status, payload = self.client.request(method, path, token, body)
+        except (http.client.HTTPException, OSError) as exc:
+            self.recorder.record(endpoint, started, type(exc).__name__)
+            return None, None
+        self.recorder.record(endpoint, started, status)
+        return status, payload
+
+    def login(self, email):
+        status, payload = self.call('login', 'POST', '/api/login/', body={'email': email, 'password': self.args.password})
+        if status != 200:
+            raise SystemExit(f'Could not log in as {email} (HTTP {status}); seed with manage.py seed_load_test first.')
+        return payload['access']
+
+    def set_up(self, rng):
+        for index in rng.sample(range(self.args.managers), min(self.args.manager_sessions, self.args.managers)):
+            token = self.login(MANAGER_EMAIL.format(index))
+            _, user = self.call('user_details', 'GET', '/api/user/details/', token)
+            _, projects = self.call('gantt', 'GET', '/api/project-gantt-chart/', token)
+            self.managers.append({'token': token, 'id': user['id'], 'projects': {project['id'] for project in projects}})
+        for index in rng.sample(range(self.args.developers), min(self.args.developer_sessions, self.args.developers)):
+            token = self.login(DEVELOPER_EMAIL.format(index))
+            _, tasks = self.call('task_list', 'GET', '/api/tasks/', token)
+            open_tasks = [task for task in tasks if task['status'] != 'completed']
+            rng.shuffle(open_tasks)
+            self.developers.append({'token': token, 'tasks': open_tasks})
+
+    def take_task(self, rng, manager=None):
+        """
+        An open task of a logged-in developer, optionally on one of ``manager``'s projects.
+        """
+        with self.lock:
+            for developer in rng.sample(self.developers, len(self.developers)):
+                for task in developer['tasks']:
+                    if manager is None or task['project'] in manager['projects']:
+                        developer['tasks'].remove(task)
+                        return developer, task
+        return None, None
+
+    # Scenarios
+
+    def scenario_login(self, rng):
+        if rng.random() < 0.5:
+            email = MANAGER_EMAIL.format(rng.randrange(self.args.managers))
+        else:
+            email = DEVELOPER_EMAIL.format(rng.randrange(self.args.developers))
+        self.call('login', 'POST', '/api/login/', body={'email': email, 'password': self.args.password})
+
+    def scenario_task_list(self, rng):
+        self.call('task_list', 'GET', '/api/tasks/', rng.choice(self.developers)['token'])
+
+    def scenario_gantt(self, rng):
+        self.call('gantt', 'GET', '/api/project-gantt-chart/', rng.choice(self.managers)['token'])
+
+    def scenario_developer_metrics(self, rng):
+        self.call('developer_metrics', 'GET', '/api/developer/metrics/', rng.choice(self.managers)['token'])
+
+    def scenario_start_complete(self, rng):
+        developer, task = self.take_task(rng)
+        if task is None:
+            return self.recorder.record('start_complete', time.perf_counter(), 'no_open_task')
+        if task['status'] == 'not_started':
+            self.call('start_task', 'POST', f'/api/tasks/{task["id"]}/start/', developer['token'])
+        self.call('complete_task', 'POST', f'/api/tasks/{task["id"]}/complete/', developer['token'])
+
+    def scenario_notification(self, rng):
+        manager = rng.choice(self.managers)
+        developer, task = self.take_task(rng, manager)
+        if task is None:
+            return self.recorder.record('notification', time.perf_counter(), 'no_open_task')
+
+        ws_url = self.args.base_url.replace('http', 'ws', 1) + f'/ws/notifications/{manager["id"]}/?token={manager["token"]}'
+        started = time.perf_counter()
+        try:
+            socket_ = WebSocket(ws_url, self.args.base_url, self.args.timeout)
+        except (ConnectionError, OSError) as exc:
+            return self.recorder.record('ws_connect', started, type(exc).__name__)
+        self.recorder.record('ws_connect', started, 101)
+        try:
+            if task['status'] == 'not_started':
+                self.call('start_task', 'POST', f'/api/tasks/{task["id"]}/start/', developer['token'])
+            started = time.perf_counter()
+            status, _ = self.call('complete_task', 'POST', f'/api/tasks/{task["id"]}/complete/', developer['token'])
+            if status != 200:
+                return
+            expected = json.dumps(f'Task "{task["title"]}" has been completed.')[1:-1]
+            deadline = time.monotonic() + self.args.timeout
+            while True:
+                socket_.sock.settimeout(max(0.01, deadline - time.monotonic()))
+                if expected in socket_.receive():
+                    return self.recorder.record('ws_notification', started, 200)
+        except (ConnectionError, OSError) as exc:
+            self.recorder.record('ws_notification', started, type(exc).__name__)
+        finally:
+            socket_.close()
+
+    def worker(self, index, deadline, mix):
+        rng = random.Random(self.args.seed + index + 1)
+        names, weights = zip(*mix.items())
+        while time.perf_counter() < deadline:
+            getattr(self, f'scenario_{rng.choices(names, weights)[0]}')(rng)
+
+    def run(self):
+        mix = parse_mix(self.args.mix)
+        self.set_up(random.Random(self.args.seed))
+        # Only the timed phase is reported.
+        self.recorder = Recorder()
+        deadline = time.perf_counter() + self.args.duration
+        threads = [
+            threading.Thread(target=self.worker, args=(index, deadline, mix), daemon=True)
+            for index in range(self.args.concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - started
+        return {
+            'commit': current_commit(),
+            'base_url': self.args.base_url,
+            'concurrency': self.args.concurrency,
+            'duration_seconds': round(duration, 1),
+            'mix': mix,
+            'endpoints': self.recorder.summary(duration),
+        }
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if not hasattr(LoadTest, f'scenario_{name}'):
+            raise SystemExit(f'Unknown scenario {name!r}.')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=utils.ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=60)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Comma-separated scenario=weight pairs.')
+    parser.add_argument('--managers', type=int, default=10, help='Managers created by seed_load_test.')
+    parser.add_argument('--developers', type=int, default=200, help='Developers created by seed_load_test.')
+    parser.add_argument('--manager-sessions', type=int, default=4)
+    parser.add_argument('--developer-sessions', type=int, default=12)
+    parser.add_argument('--password', default='load-test-password')
+    parser.add_argument('--timeout', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Also write the report to this file.')
+    args = parser.parse_args()
+
+    results = LoadTest(args).run()
+    utils.report('load', results)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'benchmark': 'load', 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Frames per second and consumer CPU for a notification burst, with and
+without coalescing.
+
+    python benchmarks/notification_coalescing.py [--notifications 2000] [--max-batch 50]
+
+Each mode queues the same burst through notify(), then times delivery: the
+outbox draining into an in-memory channel layer and a connected
+NotificationConsumer turning the events into WebSocket frames, from the
+start of the drain to the last frame received. The CPU time is the whole
+process's, so both modes are charged for the same work.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import utils  # noqa: E402
+
+utils.setup()
+
+from channels.layers import channel_layers  # noqa: E402
+from channels.routing import URLRouter  # noqa: E402
+from channels.testing import WebsocketCommunicator  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from accounts.authentication import JWTAuthMiddleware  # noqa: E402
+from accounts.models import CustomUser  # noqa: E402
+from manager.models import Notification, NotificationOutbox  # noqa: E402
+from manager.notifications import dispatcher, notify  # noqa: E402
+from manager.routing import websocket_urlpatterns  # noqa: E402
+
+
+def run_mode(developer, notifications, max_batch):
+    with override_settings(
+        NOTIFICATION_OUTBOX={'AUTOSTART': False, 'BATCH_SIZE': 1000, 'COALESCE_MAX_BATCH': max_batch},
+        CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer', 'CONFIG': {'capacity': notifications + 1}}},
+    ):
+        channel_layers.backends.clear()
+        Notification.objects.all().delete()
+        NotificationOutbox.objects.all().delete()
+        with transaction.atomic():
+            for i in range(notifications):
+                notify(developer.id, f'You have been assigned a new task: Task {i}')
+
+        token = RefreshToken.for_user(developer).access_token
+
+        async def deliver():
+            communicator = WebsocketCommunicator(
+                JWTAuthMiddleware(URLRouter(websocket_urlpatterns)), f'/ws/notifications/{developer.id}/?token={token}',
+            )
+            await communicator.connect()
+
+            cpu_started = time.process_time()
+            started = time.perf_counter()
+            while await asyncio.to_thread(dispatcher.drain):
+                pass
+            dispatch_seconds = time.perf_counter() - started
+
+            frames = received = 0
+            while received < notifications:
+                frame = await communicator.receive_json_from(timeout=10)
+                frames += 1
+                received += len(frame.get('notifications', [frame]))
+            wall_seconds = time.perf_counter() - started
+            cpu_seconds = time.process_time() - cpu_started
+
+            await communicator.disconnect()
+            return dispatch_seconds, frames, wall_seconds, cpu_seconds
+
+        dispatch_seconds, frames, wall_seconds, cpu_seconds = asyncio.run(deliver())
+        channel_layers.backends.clear()
+
+    return {
+        'coalescing': max_batch > 1,
+        'max_batch': max_batch,
+        'notifications': notifications,
+        'frames': frames,
+        'dispatch_seconds': round(dispatch_seconds, 4),
+        'delivery_wall_seconds': round(wall_seconds, 4),
+        'delivery_cpu_seconds': round(cpu_seconds, 4),
+        'frames_per_second': round(frames / wall_seconds, 1),
+        'notifications_per_second': round(notifications / wall_seconds, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--notifications', type=int, default=2000)
+    parser.add_argument('--max-batch', type=int, default=50)
+    args = parser.parse_args()
+
+    with utils.test_database():
+        developer = CustomUser.objects.create(email='bench@example.com', username='bench', is_active=True)
+        results = [run_mode(developer, args.notifications, max_batch) for max_batch in (1, args.max_batch)]
+
+    utils.report('notification_coalescing', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Rows per second for risk scoring: one HTTP call per row against the batch
+endpoint, plus the same comparison for the scoring engine alone.
+
+    python benchmarks/risk_scoring.py [--rows 500] [--batch-size 100]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import utils  # noqa: E402
+
+utils.setup()
+
+from rest_framework.test import APIClient  # noqa: E402
+
+from accounts.models import CustomUser  # noqa: E402
+from manager.ai_service import evaluate_risk_level, evaluate_risk_levels  # noqa: E402
+from manager.models import Project  # noqa: E402
+from manager.risk_scoring import RISK_VOCABULARIES  # noqa: E402
+
+
+def make_rows(count):
+    rng = random.Random(0)
+    rows = []
+    for _ in range(count):
+        row = {field: rng.choice(values) for field, values in RISK_VOCABULARIES.items()}
+        row.update({
+            'probability': round(rng.random(), 2),
+            'affecting_no_of_modules': rng.randint(1, 20),
+            'fixing_duration_days': rng.randint(1, 60),
+            'fix_cost_percent': round(rng.uniform(0, 30), 1),
+            'priority': round(rng.random(), 2),
+        })
+        rows.append(row)
+    return rows
+
+
+def rate(label, rows, seconds):
+    return {'path': label, 'rows': rows, 'seconds': round(seconds, 4), 'rows_per_second': round(rows / seconds, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+    rows = make_rows(args.rows)
+    results = []
+
+    with utils.test_database():
+        manager = CustomUser.objects.create(email='bench@example.com', username='bench', admin_role=True, is_active=True)
+        project = Project.objects.create(
+            name='Bench', scope='Scope', manager=manager,
+            functional_requirements=['Process orders.'], non_functional_requirements=['Fast'],
+        )
+        client = APIClient()
+        client.force_authenticate(user=manager)
+
+        started = time.perf_counter()
+        for row in rows:
+            response = client.post(f'/api/evaluate-risk/{project.id}/', row, format='json')
+            assert response.status_code == 200, response.data
+        results.append(rate('http_single_row', len(rows), time.perf_counter() - started))
+
+        started = time.perf_counter()
+        for start in range(0, len(rows), args.batch_size):
+            response = client.post(f'/api/evaluate-risk/{project.id}/batch/', {'rows': rows[start:start + args.batch_size]}, format='json')
+            assert response.status_code == 200, response.data
+        results.append(rate(f'http_batch_{args.batch_size}', len(rows), time.perf_counter() - started))
+
+    requirements = ['Process orders.', 'Fast']
+    started = time.perf_counter()
+    for row in rows:
+        evaluate_risk_level(dict(row, requirements=requirements))
+    results.append(rate('engine_single_row', len(rows), time.perf_counter() - started))
+
+    started = time.perf_counter()
+    evaluate_risk_levels(requirements, rows)
+    results.append(rate('engine_batch', len(rows), time.perf_counter() - started))
+
+    utils.report('risk_scoring', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Search latency percentiles over a large index.
+
+    python benchmarks/search.py [--rows 1000000] [--projects 1000] [--queries 500] [--vocabulary 2000]
+
+Seeds --rows tasks spread over --projects projects (the triggers index them
+as they are inserted), then times search() for random one and two word
+queries from a developer on ten projects and from the manager of all of them.
+Text is drawn from --vocabulary distinct words; a small vocabulary is the
+worst case, where every word matches a large share of the index.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import utils  # noqa: E402
+
+utils.setup()
+
+from django.db import connection, transaction  # noqa: E402
+
+from accounts.models import CustomUser  # noqa: E402
+from manager.models import Project, Task  # noqa: E402
+from manager.search import search  # noqa: E402
+
+WORDS = [
+    'invoice', 'payment', 'report', 'export', 'login', 'profile', 'dashboard', 'chart', 'email', 'reminder',
+    'upload', 'template', 'schedule', 'calendar', 'search', 'filter', 'archive', 'audit', 'billing', 'customer',
+    'order', 'refund', 'shipping', 'inventory', 'notification', 'permission', 'role', 'settings', 'theme', 'mobile',
+]
+
+
+def make_vocabulary(rng, size):
+    words = list(WORDS[:size])
+    seen = set(words)
+    while len(words) < size:
+        word = ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(4, 10)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def seed(rng, words, rows, projects, batch_size=20000):
+    manager = CustomUser.objects.create(email='bench@example.com', username='bench', admin_role=True, is_active=True)
+    developer = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+    Project.objects.bulk_create([
+        Project(name=f'Project {index} {rng.choice(words)}', scope=' '.join(rng.choices(words, k=8)), manager=manager)
+        for index in range(projects)
+    ])
+    project_ids = list(Project.objects.order_by('id').values_list('id', flat=True))
+    for project in Project.objects.filter(id__in=project_ids[:10]):
+        project.developers.add(developer)
+
+    for start in range(0, rows, batch_size):
+        with transaction.atomic():
+            Task.objects.bulk_create([
+                Task(
+                    project_id=rng.choice(project_ids),
+                    title=' '.join(rng.choices(words, k=3)),
+                    description=' '.join(rng.choices(words, k=12)),
+                )
+                for _ in range(min(batch_size, rows - start))
+            ], batch_size=1000)
+    return manager, developer
+
+
+def percentiles(label, samples):
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        'caller': label,
+        'queries': len(samples),
+        'p50_ms': round(cuts[49], 2),
+        'p95_ms': round(cuts[94], 2),
+        'p99_ms': round(cuts[98], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--projects', type=int, default=1000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--vocabulary', type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    words = make_vocabulary(rng, args.vocabulary)
+    results = []
+
+    with utils.test_database():
+        started = time.perf_counter()
+        manager, developer = seed(rng, words, args.rows, args.projects)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM manager_searchindex')
+            indexed = cursor.fetchone()[0]
+        results.append({'indexed_rows': indexed, 'vocabulary': len(words), 'seed_seconds': round(time.perf_counter() - started, 1)})
+
+        for label, user in (('developer_on_10_projects', developer), ('manager_of_all_projects', manager)):
+            samples = []
+            for _ in range(args.queries):
+                query = ' '.join(rng.sample(words, rng.choice((1, 2))))
+                started = time.perf_counter()
+                search(user, query)
+                samples.append((time.perf_counter() - started) * 1000)
+            results.append(percentiles(label, samples))
+
+    utils.report('search', results)
+
+
+if __name__ == '__main__':
+    main()
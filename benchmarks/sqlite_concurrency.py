@@ -0,0 +1,153 @@
+"""
+Throughput and "database is locked" errors with many threads mixing reads
+and writes on one SQLite file, under each SQLite profile.
+
+    python benchmarks/sqlite_concurrency.py [--threads 32] [--seconds 5] [--write-ratio 0.2] [--tasks 500]
+
+Reads list a project's tasks with their developers. Writes repeat
+CompleteTaskView's transaction: read the task, save it, update the
+developer's metrics. Each profile runs on a fresh database file.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import utils  # noqa: E402
+
+utils.setup()
+
+from django.db import OperationalError, connection, transaction  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from accounts.models import CustomUser  # noqa: E402
+from manager.models import DeveloperMetrics, Project, Task  # noqa: E402
+
+TUNING = {'SYNCHRONOUS': 'NORMAL', 'BUSY_TIMEOUT': 5000, 'CACHE_SIZE': -65536, 'MMAP_SIZE': 268435456}
+
+PROFILES = {
+    'rollback_journal': {'JOURNAL_MODE': 'DELETE'},
+    'wal': {'JOURNAL_MODE': 'WAL', **TUNING},
+    'wal_immediate': {'JOURNAL_MODE': 'WAL', **TUNING, 'TRANSACTION_MODE': 'IMMEDIATE'},
+    'wal_immediate_write_queue': {'JOURNAL_MODE': 'WAL', **TUNING, 'TRANSACTION_MODE': 'IMMEDIATE', 'WRITE_QUEUE': True},
+}
+
+
+def seed(tasks, developers=20, projects=10):
+    manager = CustomUser.objects.create(email='bench@example.com', username='bench', admin_role=True, is_active=True)
+    users = CustomUser.objects.bulk_create([
+        CustomUser(email=f'dev{index}@example.com', username=f'dev{index}', is_active=True)
+        for index in range(developers)
+    ])
+    project_list = Project.objects.bulk_create([
+        Project(name=f'Project {index}', scope='Scope', manager=manager) for index in range(projects)
+    ])
+    now = timezone.now()
+    Task.objects.bulk_create([
+        Task(
+            project=project_list[index % projects], developer=users[index % developers], title=f'Task {index}',
+            status='in_progress', start_time=now, manager_start_time=now, manager_end_time=now,
+        )
+        for index in range(tasks)
+    ])
+    return [project.id for project in project_list], list(Task.objects.values_list('id', flat=True))
+
+
+def read(project_ids, rng):
+    list(Task.objects.filter(project_id=rng.choice(project_ids)).select_related('developer')[:50])
+
+
+def write(task_ids, rng):
+    with transaction.atomic():
+        task = Task.objects.select_for_update().get(id=rng.choice(task_ids))
+        if task.status == 'completed':
+            task.status = 'in_progress'
+            task.save()
+            DeveloperMetrics.record_restart(task)
+        else:
+            task.status = 'completed'
+            task.end_time = timezone.now()
+            task.save()
+            DeveloperMetrics.record_completion(task)
+
+
+def worker(seed_value, deadline, write_ratio, project_ids, task_ids, samples, errors):
+    rng = random.Random(seed_value)
+    try:
+        while time.perf_counter() < deadline:
+            kind = 'write' if rng.random() < write_ratio else 'read'
+            started = time.perf_counter()
+            try:
+                if kind == 'write':
+                    write(task_ids, rng)
+                else:
+                    read(project_ids, rng)
+            except OperationalError as exc:
+                errors.append(str(exc))
+                continue
+            samples[kind].append((time.perf_counter() - started) * 1000)
+    finally:
+        connection.close()
+
+
+def percentiles(samples):
+    if len(samples) < 2:
+        return {}
+    cuts = statistics.quantiles(samples, n=100)
+    return {'p50_ms': round(cuts[49], 2), 'p99_ms': round(cuts[98], 2)}
+
+
+def run(name, profile, args, directory):
+    with override_settings(SQLITE_PROFILE=profile), utils.test_database(os.path.join(directory, f'{name}.sqlite3')):
+        project_ids, task_ids = seed(args.tasks)
+        connection.close()
+        samples = {'read': [], 'write': []}
+        errors = []
+        deadline = time.perf_counter() + args.seconds
+        threads = [
+            threading.Thread(target=worker, args=(index, deadline, args.write_ratio, project_ids, task_ids, samples, errors))
+            for index in range(args.threads)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    completed = len(samples['read']) + len(samples['write'])
+    return {
+        'profile': name,
+        'operations_per_second': round(completed / elapsed, 1),
+        'reads': len(samples['read']),
+        'writes': len(samples['write']),
+        'lock_errors': sum('locked' in error for error in errors),
+        'other_errors': sum('locked' not in error for error in errors),
+        'read': percentiles(samples['read']),
+        'write': percentiles(samples['write']),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--tasks', type=int, default=500)
+    parser.add_argument('--profile', choices=list(PROFILES), action='append', help='Run only these profiles.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [run(name, PROFILES[name], args, directory) for name in args.profile or PROFILES]
+    utils.report('sqlite_concurrency', results)
+
+
+if __name__ == '__main__':
+    main()
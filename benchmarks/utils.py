@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+from contextlib import contextmanager
+
+import django
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup():
+    """
+    Configure Django for a standalone benchmark script run from any directory.
+    """
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SW_Project_Management.settings')
+    django.setup()
+
+
+@contextmanager
+def test_database(name=None):
+    """
+    Run the benchmark against a throwaway test database, never db.sqlite3.
+    SQLite test databases live in memory unless ``name`` gives a file path.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    if name:
+        connection.settings_dict['TEST']['NAME'] = name
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def report(name, results):
+    print(json.dumps({'benchmark': name, 'results': results}, indent=2, default=str))
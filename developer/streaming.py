@@ -0,0 +1,51 @@
+import json
+import logging
+import time
+
+from rest_framework.renderers import BaseRenderer
+
+logger = logging.getLogger(__name__)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets views accept ``Accept: text/event-stream``. Streaming views return
+    their own StreamingHttpResponse; anything rendered here (errors, mostly)
+    goes out as a single ``error`` event.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return sse_event('error', data).encode(self.charset)
+
+
+def sse_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+def stream_tokens(tokens, label):
+    """
+    Yield each token from ``tokens`` as a server-sent event, then a ``done``
+    event. If the client disconnects, the server closes this generator and
+    the close is passed on to ``tokens`` so generation stops there too.
+    Time to first byte and total time are logged separately.
+    """
+    started = time.perf_counter()
+    count = 0
+    finished = False
+    try:
+        for token in tokens:
+            if count == 0:
+                logger.info('%s ttfb_ms=%.1f', label, (time.perf_counter() - started) * 1000)
+            count += 1
+            yield sse_event('token', {'token': token})
+        yield sse_event('done', {'tokens': count})
+        finished = True
+    finally:
+        tokens.close()
+        logger.info(
+            '%s total_ms=%.1f tokens=%d cancelled=%s',
+            label, (time.perf_counter() - started) * 1000, count, not finished,
+        )
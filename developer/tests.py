@@ -1,3 +1,117 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from manager.models import Project, Task, DeveloperMetrics
+
+
+class TaskTransitionMetricsTests(TestCase):
+    def setUp(self):
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.developer = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        self.project = Project.objects.create(name='Project', scope='Scope', manager=self.manager)
+        now = timezone.now()
+        self.task = Task.objects.create(
+            project=self.project, developer=self.developer, title='Task', status='in_progress',
+            start_time=now - timedelta(hours=2),
+            manager_start_time=now - timedelta(hours=4), manager_end_time=now,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.developer)
+
+    def test_complete_updates_running_totals(self):
+        response = self.client.post(f'/api/tasks/{self.task.pk}/complete/')
+        self.assertEqual(response.status_code, 200)
+
+        metrics = DeveloperMetrics.objects.get(developer=self.developer)
+        self.task.refresh_from_db()
+        self.assertEqual(metrics.tasks_completed, 1)
+        self.assertEqual(metrics.total_delivery_time, self.task.actual_time_spent)
+        self.assertEqual(metrics.total_allocated_time, timedelta(hours=4))
+        self.assertEqual(metrics.average_completion_time, self.task.actual_time_spent)
+
+        # Completing twice is rejected and does not double count.
+        response = self.client.post(f'/api/tasks/{self.task.pk}/complete/')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(DeveloperMetrics.objects.get(developer=self.developer).tasks_completed, 1)
+
+    def test_restart_reverses_completion(self):
+        self.client.post(f'/api/tasks/{self.task.pk}/complete/')
+        response = self.client.post(f'/api/tasks/{self.task.pk}/RestartTask/')
+        self.assertEqual(response.status_code, 200)
+
+        metrics = DeveloperMetrics.objects.get(developer=self.developer)
+        self.assertEqual(metrics.tasks_completed, 0)
+        self.assertEqual(metrics.tasks_reassigned, 1)
+        self.assertEqual(metrics.total_delivery_time, timedelta(0))
+        self.assertEqual(metrics.total_allocated_time, timedelta(0))
+        self.assertIsNone(metrics.average_completion_time)
+
+    def test_manager_task_detail_does_not_write(self):
+        self.client.post(f'/api/tasks/{self.task.pk}/complete/')
+        manager_client = APIClient()
+        manager_client.force_authenticate(user=self.manager)
+
+        for _ in range(2):
+            response = manager_client.get(f'/api/task/{self.task.pk}/manager-details/')
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(DeveloperMetrics.objects.get(developer=self.developer).tasks_completed, 1)
+
+
+class GenerateCodeStreamingTests(TestCase):
+    def setUp(self):
+        self.developer = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.developer)
+
+    def events(self, response):
+        body = b''.join(response.streaming_content).decode()
+        return [
+            (block.split('\n')[0][len('event: '):], json.loads(block.split('\n')[1][len('data: '):]))
+            for block in body.strip().split('\n\n')
+        ]
+
+    def test_stream_matches_buffered_response(self):
+        buffered = self.client.post('/api/generate_code/', {'description': 'sort a list'}, format='json')
+        with self.assertLogs('developer.streaming', level='INFO') as logs:
+            streamed = self.client.post(
+                '/api/generate_code/', {'description': 'sort a list'}, format='json', HTTP_ACCEPT='text/event-stream',
+            )
+            events = self.events(streamed)
+
+        self.assertEqual(streamed['Content-Type'], 'text/event-stream')
+        tokens = [data['token'] for event, data in events if event == 'token']
+        self.assertEqual(''.join(tokens), buffered.data['generated_code'])
+        self.assertEqual(events[-1], ('done', {'tokens': len(tokens)}))
+        self.assertIn('ttfb_ms=', logs.output[0])
+        self.assertIn('cancelled=False', logs.output[1])
+
+    def test_disconnect_stops_generation(self):
+        produced = []
+        closed = []
+
+        def tokens(description):
+            try:
+                for index in range(1000):
+                    produced.append(index)
+                    yield f'token{index} '
+            finally:
+                closed.append(True)
+
+        with mock.patch('developer.views.generate_code_tokens', side_effect=tokens):
+            with self.assertLogs('developer.streaming', level='INFO') as logs:
+                response = self.client.post('/api/generate_code/?stream=1', {'description': 'x'}, format='json')
+                content = iter(response.streaming_content)
+                next(content)
+                next(content)
+                response.close()  # what the server does when the client goes away
 
-# Create your tests here.
+        self.assertEqual(closed, [True])
+        self.assertEqual(len(produced), 2)
+        self.assertIn('cancelled=True', logs.output[-1])
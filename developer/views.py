@@ -1,5 +1,7 @@
 from rest_framework import generics, permissions,status
 from manager.serializers import  TaskSerializer, ProjectSerializer
+from manager.pagination import KeysetPagination
+from manager.response_cache import VersionedResponseCacheMixin
 from manager.models import Task, Project
 from rest_framework import generics
 from rest_framework.response import Response
@@ -9,16 +11,21 @@ from .models import ToDo
 from manager.models import DeveloperMetrics,Task
 from .serializers import ToDoSerializer
 from django.utils import timezone
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from django.db import transaction
+from manager.notifications import notify
+from manager.ai_service import generate_code, generate_code_tokens
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+from .streaming import EventStreamRenderer, stream_tokens
 
 
 
 #list alll developer tasks 
 
-class DeveloperTaskListView(generics.ListAPIView):
+class DeveloperTaskListView(VersionedResponseCacheMixin, generics.ListAPIView):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return Task.objects.filter(developer=self.request.user)
@@ -32,9 +39,10 @@ class DeveloperTaskDetailView(generics.RetrieveAPIView):
         return Task.objects.filter(developer=self.request.user)
     
 #list developer projects 
-class DeveloperProjectListView(generics.ListAPIView):
+class DeveloperProjectListView(VersionedResponseCacheMixin, generics.ListAPIView):
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return Project.objects.filter(developers=self.request.user)
@@ -62,33 +70,48 @@ class CompleteTaskView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
-        task = Task.objects.get(pk=pk, developer=request.user)
-        if task.status == 'in_progress':
+        with transaction.atomic():
+            task = Task.objects.select_for_update().get(pk=pk, developer=request.user)
+            if task.status != 'in_progress':
+                return Response({'message': 'Task is not in progress.'}, status=status.HTTP_400_BAD_REQUEST)
+
             task.status = 'completed'
             task.end_time = timezone.now()  # Log end time
+            if task.start_time:
+                task.actual_time_spent = task.end_time - task.start_time
             task.save()
-            print(f"Manager ID: {task.project.manager.id}")
-            manager_id = task.project.manager.id
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f'notifications_{manager_id}',
-                {
-                    'type': 'send_notification',
-                    'notification': f'Task "{task.title}" has been completed  .'
-                }
-            )
 
-            return Response({'message': 'Task completed.'}, status=status.HTTP_200_OK)
-        return Response({'message': 'Task is not in progress.'}, status=status.HTTP_400_BAD_REQUEST)
+            # Update developer KPIs
+            DeveloperMetrics.record_completion(task)
+
+            # Notify the manager once the completion is committed
+            notify(task.project.manager_id, f'Task "{task.title}" has been completed.')
+
+        return Response({'message': 'Task completed.'}, status=status.HTTP_200_OK)
 
 
 #generate_code 
 class GenerateCodeFromDescriptionView(APIView):
+    """
+    Returns {"generated_code": ...} once generation finishes, or streams the
+    tokens as server-sent events when the client sends
+    ``Accept: text/event-stream`` or ``?stream=1``.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer]
+
     def post(self, request):
         description = request.data.get('description')
-        # Placeholder for AI code generation
-        generated_code = f"// Generated code for: {description}"
+        if request.accepted_renderer.format == 'sse' or request.query_params.get('stream') in ('1', 'true'):
+            response = StreamingHttpResponse(
+                stream_tokens(generate_code_tokens(description), 'generate_code'),
+                content_type='text/event-stream',
+            )
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+            return response
+
+        generated_code = generate_code(description)
         return Response({'generated_code': generated_code}, status=HTTP_200_OK)
 
 
@@ -99,6 +122,7 @@ class GenerateCodeFromDescriptionView(APIView):
 class ToDoListCreateView(generics.ListCreateAPIView):
     serializer_class = ToDoSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return ToDo.objects.filter(developer=self.request.user)
@@ -119,24 +143,24 @@ class RestartTaskView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
-        try:
-            task = Task.objects.get(pk=pk, developer=request.user)
-        except Task.DoesNotExist:
-            return Response({'message': 'Task not found or you do not have permission to restart it.'}, status=status.HTTP_404_NOT_FOUND)
+        with transaction.atomic():
+            try:
+                task = Task.objects.select_for_update().get(pk=pk, developer=request.user)
+            except Task.DoesNotExist:
+                return Response({'message': 'Task not found or you do not have permission to restart it.'}, status=status.HTTP_404_NOT_FOUND)
+
+            if task.status != 'completed':
+                return Response({'message': 'Task is not completed.'}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Update developer KPIs before the completion times are reset
+            DeveloperMetrics.record_restart(task)
 
-        if task.status == 'completed':
             task.status = 'in_progress'
             task.end_time = None  # Reset end time
+            task.actual_time_spent = None
             task.start_time = timezone.now()  # Log new start time
             task.save()
 
-            # Update developer KPIs
-            developer_metrics, created = DeveloperMetrics.objects.get_or_create(developer=task.developer)
-            developer_metrics.tasks_reassigned += 1
-            developer_metrics.save()
-
-            return Response({'message': 'Task returned to In Progress.'}, status=status.HTTP_200_OK)
-
-        return Response({'message': 'Task is not completed.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'message': 'Task returned to In Progress.'}, status=status.HTTP_200_OK)
 
 
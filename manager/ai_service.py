@@ -1,6 +1,21 @@
+import re
+
+import numpy as np
+
+from .model_registry import get_model_registry
+from .risk_scoring import encoder
 
 
 def generate_requirements(scope):
+    model = get_model_registry().get('requirements')
+    return draft_requirements(model, scope)
+
+
+def draft_requirements(model, scope):
+    """
+    Placeholder for the requirements model. Returns canned requirements
+    whether or not a model has been published.
+    """
     functional_requirements = (
         "The system can process orders in real-time. "
         "The platform supports advanced order processing features."
@@ -13,9 +28,33 @@ def generate_requirements(scope):
     return functional_requirements, non_functional_requirements
 
 
+def generate_code(description):
+    return ''.join(generate_code_tokens(description))
+
+
+def generate_code_tokens(description):
+    """
+    Yield generated code for ``description`` a token at a time. Closing the
+    generator stops generation.
+
+    Placeholder for the code model: emits a comment naming the description.
+    """
+    model = get_model_registry().get('code')
+    yield from draft_code(model, description)
+
+
+def draft_code(model, description):
+    for token in re.findall(r'\s*\S+', f"// Generated code for: {description}"):
+        yield token
+
+
 # risk_management/ai_service.py
 
-def evaluate_risk_level(input_data):
+# Default for the ``model`` arguments below: look up the serving 'risk' model.
+CURRENT_MODEL = object()
+
+
+def evaluate_risk_level(input_data, model=CURRENT_MODEL):
     """
     Placeholder function for AI model to evaluate risk level.
     
@@ -36,10 +75,65 @@ def evaluate_risk_level(input_data):
         - 'fixing_duration_days': int
         - 'fix_cost_percent': float
         - 'priority': float
+    - model: LoadedModel or None
+        The 'risk' model to score with, as returned by risk_model().
+        Defaults to the one currently serving.
     
     Returns:
     - risk_level: int
         The risk level as evaluated by the AI model.
     """
-    # For now, return a static response
-    return 3
+    return int(evaluate_risk_levels(input_data['requirements'], [input_data], model)[0])
+
+
+def evaluate_risk_levels(requirements, rows, model=CURRENT_MODEL):
+    """
+    Vectorized counterpart of evaluate_risk_level for many risk rows of one
+    project.
+
+    Parameters:
+    - requirements: list of str
+        The project's requirements, shared by every row.
+    - rows: list of dict
+        Rows with the same keys as evaluate_risk_level's input_data, minus
+        'requirements'.
+    - model: LoadedModel or None
+        As for evaluate_risk_level.
+
+    Returns:
+    - risk_levels: numpy.ndarray of int, one per row
+    """
+    features = encoder.encode(rows)
+    return predict_risk_levels(requirements, features, model)
+
+
+def risk_model():
+    """
+    The 'risk' model currently serving, or None for the placeholder. Callers
+    that key a cache on the version take it from this same object, so a hot
+    reload cannot pair one version's key with another version's scores.
+    """
+    return get_model_registry().get('risk')
+
+
+def risk_model_version(model):
+    return model.version if model is not None else None
+
+
+def predict_risk_levels(requirements, features, model=CURRENT_MODEL):
+    """
+    Score the whole feature matrix in one call with the published 'risk'
+    model: ``weights`` of shape (encoder.width, levels) and an optional
+    ``bias`` of shape (levels,). The risk level is the best scoring column,
+    counted from 1. Without a published model every row scores 3.
+    """
+    if model is CURRENT_MODEL:
+        model = risk_model()
+    if model is None:
+        return np.full(features.shape[0], 3, dtype=np.int64)
+
+    scores = features @ model['weights']
+    bias = model.get('bias')
+    if bias is not None:
+        scores += bias
+    return scores.argmax(axis=1).astype(np.int64) + 1
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ManagerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'manager'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from . import jobs  # noqa: F401  (reruns leftover jobs on the first request)
+        from SW_Project_Management import sqlite_profile  # noqa: F401
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+
+class SQLiteChannelLayer(BaseChannelLayer):
+    """
+    Channel layer backed by a shared SQLite file.
+
+    Every process that points at the same ``path`` sees the same channels and
+    groups, so a ``group_send`` from one worker reaches consumers connected to
+    another. It is meant as an offline stand-in for channels_redis (local
+    multi-worker runs and tests), not as a high-throughput production layer.
+    """
+
+    extensions = ['groups', 'flush']
+
+    def __init__(self, path='channels.sqlite3', expiry=60, group_expiry=86400, capacity=100,
+                 channel_capacity=None, poll_interval=0.05):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        self.channel_capacity = self.compile_capacities(self.channel_capacity)
+        self.path = str(path)
+        self.group_expiry = group_expiry
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+
+    # Connection handling
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript('''
+                CREATE TABLE IF NOT EXISTS channel_messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    channel TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    expires REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS channel_messages_channel ON channel_messages (channel, id);
+                CREATE TABLE IF NOT EXISTS channel_groups (
+                    grp TEXT NOT NULL,
+                    channel TEXT NOT NULL,
+                    expires REAL NOT NULL,
+                    PRIMARY KEY (grp, channel)
+                );
+            ''')
+            self._local.connection = connection
+        return connection
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    # Channel layer API
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), 'message is not a dict'
+        assert self.valid_channel_name(channel), 'Channel name not valid'
+        assert '__asgi_channel__' not in message
+        await self._run(self._send, channel, json.dumps(message))
+
+    def _send(self, channel, body):
+        connection = self._connection()
+        now = time.time()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            queued, = connection.execute(
+                'SELECT COUNT(*) FROM channel_messages WHERE channel = ? AND expires > ?', (channel, now),
+            ).fetchone()
+            if queued >= self.get_capacity(channel):
+                raise ChannelFull(channel)
+            connection.execute(
+                'INSERT INTO channel_messages (channel, message, expires) VALUES (?, ?, ?)',
+                (channel, body, now + self.expiry),
+            )
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel)
+        while True:
+            body = await self._run(self._pop, channel)
+            if body is not None:
+                return json.loads(body)
+            await asyncio.sleep(self.poll_interval)
+
+    def _pop(self, channel):
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            now = time.time()
+            connection.execute('DELETE FROM channel_messages WHERE channel = ? AND expires <= ?', (channel, now))
+            row = connection.execute(
+                'SELECT id, message FROM channel_messages WHERE channel = ? AND expires > ? ORDER BY id LIMIT 1',
+                (channel, now),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute('DELETE FROM channel_messages WHERE id = ?', (row[0],))
+            return row[1]
+
+    async def new_channel(self, prefix='specific.'):
+        return f'{prefix}{uuid.uuid4().hex}'
+
+    async def flush(self):
+        await self._run(self._flush)
+
+    def _flush(self):
+        connection = self._connection()
+        with connection:
+            connection.execute('DELETE FROM channel_messages')
+            connection.execute('DELETE FROM channel_groups')
+
+    async def close(self):
+        pass
+
+    # Groups extension
+
+    async def group_add(self, group, channel):
+        assert self.valid_group_name(group), 'Group name not valid'
+        assert self.valid_channel_name(channel), 'Channel name not valid'
+        await self._run(self._execute,
+                        'INSERT OR REPLACE INTO channel_groups (grp, channel, expires) VALUES (?, ?, ?)',
+                        (group, channel, time.time() + self.group_expiry))
+
+    async def group_discard(self, group, channel):
+        assert self.valid_group_name(group), 'Group name not valid'
+        assert self.valid_channel_name(channel), 'Channel name not valid'
+        await self._run(self._execute, 'DELETE FROM channel_groups WHERE grp = ? AND channel = ?', (group, channel))
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), 'Message is not a dict'
+        assert self.valid_group_name(group), 'Group name not valid'
+        now = time.time()
+        # Fan out to every member in one statement; like channels_redis, full
+        # channels silently drop group messages.
+        await self._run(self._execute, '''
+            INSERT INTO channel_messages (channel, message, expires)
+            SELECT g.channel, ?, ? FROM channel_groups g
+            WHERE g.grp = ? AND g.expires > ?
+              AND (SELECT COUNT(*) FROM channel_messages m WHERE m.channel = g.channel AND m.expires > ?) < ?
+        ''', (json.dumps(message), now + self.expiry, group, now, now, self.capacity))
+
+    def _execute(self, sql, params):
+        connection = self._connection()
+        with connection:
+            connection.execute(sql, params)
@@ -1,30 +1,146 @@
+import asyncio
 import json
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.utils import timezone
+
+from accounts.authentication import BEARER_SUBPROTOCOL
+from .models import Notification
+from .notifications import notification_setting, outbox_setting
+
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
-        self.developer_id = self.scope['url_route']['kwargs']['developer_id']
+        self.developer_id = int(self.scope['url_route']['kwargs']['developer_id'])
         self.room_group_name = f'notifications_{self.developer_id}'
+        self.replayed_ids = set()
+        self.pending_acks = set()
+        self.ack_flush = None
+        self.joined = False
+
+        # scope['user'] comes from JWTAuthMiddleware; only the recipient may listen.
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated or user.id != self.developer_id:
+            await self.close()
+            return
 
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
         )
+        self.joined = True
+
+        subprotocols = self.scope.get('subprotocols') or []
+        await self.accept(BEARER_SUBPROTOCOL if BEARER_SUBPROTOCOL in subprotocols else None)
 
-        await self.accept()
+        # Replay whatever was stored while the client was disconnected, in
+        # the same batched frames the dispatcher uses for bursts.
+        last_seen_id = self.get_last_seen_id()
+        if last_seen_id is not None:
+            await self.replay(last_seen_id)
+
+    async def replay(self, last_seen_id):
+        limit = notification_setting('REPLAY_LIMIT')
+        missed = await self.get_missed_notifications(last_seen_id, limit + 1)
+        truncated = len(missed) > limit
+        missed = missed[:limit]
+
+        batch_size = outbox_setting('COALESCE_MAX_BATCH')
+        for start in range(0, len(missed), batch_size):
+            await self.send_notifications({'notifications': [
+                {'id': notification.id, 'notification': notification.message}
+                for notification in missed[start:start + batch_size]
+            ]})
+        # Live events already queued for this socket may repeat what was just
+        # replayed; only those ids are skipped, whatever order events arrive in.
+        self.replayed_ids = {notification.id for notification in missed}
+
+        if truncated:
+            # The client should reconnect with this id to fetch the rest.
+            await self.send(text_data=json.dumps({'replay_truncated': True, 'last_replayed_id': missed[-1].id}))
 
     async def disconnect(self, close_code):
+        if not self.joined:
+            return
+        if self.ack_flush is not None:
+            self.ack_flush.cancel()
+        await self.flush_acks()
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
         )
 
     async def receive(self, text_data):
-        pass
+        """
+        Read acknowledgements: ``{"ack": [<id>, ...]}``. They are buffered and
+        written in one UPDATE per flush interval or batch.
+        """
+        try:
+            ids = json.loads(text_data).get('ack', [])
+            self.pending_acks.update(int(notification_id) for notification_id in ids)
+        except (ValueError, TypeError, AttributeError):
+            return
+
+        if len(self.pending_acks) >= notification_setting('ACK_BATCH_SIZE'):
+            await self.flush_acks()
+        elif self.pending_acks and self.ack_flush is None:
+            self.ack_flush = asyncio.ensure_future(self.flush_acks_later())
 
     async def send_notification(self, event):
-        notification = event['notification']
+        if not self.is_new(event.get('id')):
+            return
+
+        await self.send(text_data=json.dumps({
+            'id': event.get('id'),
+            'notification': event['notification']
+        }))
+
+    async def send_notifications(self, event):
+        """
+        A coalesced burst of notifications, delivered as one frame.
+        """
+        notifications = [notification for notification in event['notifications'] if self.is_new(notification.get('id'))]
+        if not notifications:
+            return
 
         await self.send(text_data=json.dumps({
-            'notification': notification
+            'notifications': notifications
         }))
+
+    def is_new(self, notification_id):
+        # Skip events already delivered by the replay on connect.
+        return notification_id is None or notification_id not in self.replayed_ids
+
+    def get_last_seen_id(self):
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        try:
+            return int(query['last_seen_id'][0])
+        except (KeyError, ValueError):
+            return None
+
+    async def flush_acks_later(self):
+        await asyncio.sleep(notification_setting('ACK_FLUSH_INTERVAL'))
+        self.ack_flush = None
+        await self.flush_acks()
+
+    async def flush_acks(self):
+        if not self.pending_acks:
+            return
+        ids, self.pending_acks = self.pending_acks, set()
+        await self.mark_read(ids)
+
+    @database_sync_to_async
+    def get_missed_notifications(self, last_seen_id, limit):
+        return list(
+            Notification.objects
+            .filter(recipient_id=self.developer_id, id__gt=last_seen_id)
+            .order_by('id')[:limit]
+        )
+
+    @database_sync_to_async
+    def mark_read(self, ids):
+        Notification.objects.filter(
+            recipient_id=self.developer_id, id__in=ids, read_at__isnull=True,
+        ).update(read_at=timezone.now())
@@ -0,0 +1,166 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import ai_service
+from .models import RequirementsJob
+from .notifications import notify
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'manager.jobs.ThreadPoolJobBackend',
+    'WORKERS': 2,  # threads per web process for ThreadPoolJobBackend
+    'POLL_INTERVAL': 2,  # seconds between queue scans in `manage.py run_requirements_jobs`
+    'CLAIM_TIMEOUT': 600,  # seconds before a job left running by a crashed worker is claimed again
+    'RECOVER': True,  # ThreadPoolJobBackend reruns pending and abandoned jobs when a web process starts
+}
+
+
+def jobs_setting(name):
+    return getattr(settings, 'REQUIREMENTS_JOBS', {}).get(name, DEFAULTS[name])
+
+
+def enqueue_requirements_job(project):
+    """
+    Record a pending job for ``project`` and hand it to the configured
+    backend once the surrounding transaction commits.
+    """
+    job = RequirementsJob.objects.create(project=project)
+    transaction.on_commit(lambda: get_backend().submit(job.id))
+    return job
+
+
+def claimable_jobs():
+    """
+    Pending jobs, and running jobs whose worker has not finished them within
+    CLAIM_TIMEOUT and is presumed dead.
+    """
+    abandoned_before = timezone.now() - timedelta(seconds=jobs_setting('CLAIM_TIMEOUT'))
+    return RequirementsJob.objects.filter(Q(status='pending') | Q(status='running', started_at__lt=abandoned_before))
+
+
+def run_requirements_job(job_id):
+    """
+    Generate and store the requirements for one job. Safe to call more than
+    once or from several workers: only the caller that claims the job does
+    the work.
+    """
+    claimed = claimable_jobs().filter(id=job_id).update(status='running', started_at=timezone.now())
+    if not claimed:
+        return
+
+    job = RequirementsJob.objects.select_related('project').get(id=job_id)
+    project = job.project
+    try:
+        functional_requirements, non_functional_requirements = ai_service.generate_requirements(project.scope)
+    except Exception as exc:
+        logger.exception('Requirements job %s failed', job_id)
+        with transaction.atomic():
+            RequirementsJob.objects.filter(id=job_id).update(status='failed', error=repr(exc), finished_at=timezone.now())
+            notify(project.manager_id, f'Generating requirements for project "{project.name}" failed.')
+        return
+
+    with transaction.atomic():
+        project.functional_requirements = functional_requirements
+        project.non_functional_requirements = non_functional_requirements
+        project.save(update_fields=['functional_requirements', 'non_functional_requirements', 'updated_at'])
+        RequirementsJob.objects.filter(id=job_id).update(status='succeeded', finished_at=timezone.now())
+        notify(project.manager_id, f'Requirements for project "{project.name}" are ready.')
+
+
+def run_pending_jobs():
+    """
+    Run every claimable job in this process. Returns how many were picked up.
+    """
+    job_ids = list(claimable_jobs().order_by('id').values_list('id', flat=True))
+    for job_id in job_ids:
+        run_requirements_job(job_id)
+    return len(job_ids)
+
+
+class ThreadPoolJobBackend:
+    """
+    Runs jobs on a small thread pool inside the web process. Jobs queued
+    here are lost if the process stops, so a new backend first reruns
+    whatever is still pending or was abandoned mid-run.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=jobs_setting('WORKERS'), thread_name_prefix='requirements-job')
+        if jobs_setting('RECOVER'):
+            self.executor.submit(self.recover)
+
+    def submit(self, job_id):
+        self.executor.submit(self.run, job_id)
+
+    def recover(self):
+        try:
+            run_pending_jobs()
+        except Exception:
+            logger.exception('Requirements job recovery failed')
+        finally:
+            close_old_connections()
+
+    def run(self, job_id):
+        try:
+            run_requirements_job(job_id)
+        except Exception:
+            logger.exception('Requirements job %s crashed', job_id)
+        finally:
+            close_old_connections()
+
+
+class DatabaseQueueJobBackend:
+    """
+    Leaves jobs in the RequirementsJob table for `manage.py run_requirements_jobs`
+    worker processes to pick up.
+    """
+
+    def submit(self, job_id):
+        pass
+
+
+class CeleryJobBackend:
+    """
+    Sends jobs to Celery workers (see SW_Project_Management/celery.py).
+    """
+
+    def submit(self, job_id):
+        import SW_Project_Management.celery  # noqa: F401  (configures the broker)
+        from .tasks import generate_requirements_task
+
+        generate_requirements_task.delay(job_id)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(jobs_setting('BACKEND'))()
+        return _backend
+
+
+def start_backend(sender, **kwargs):
+    """
+    Build the backend on a process's first request rather than its first
+    new job, so jobs left over from before a restart are picked up.
+    """
+    request_started.disconnect(start_backend)
+    get_backend()
+
+
+request_started.connect(start_backend)
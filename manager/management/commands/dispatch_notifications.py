@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from manager.notifications import dispatcher, outbox_setting
+
+
+class Command(BaseCommand):
+    help = 'Send queued NotificationOutbox rows to the channel layer. Use with NOTIFICATION_OUTBOX["AUTOSTART"] = False.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = 0
+            while True:
+                handled = dispatcher.drain()
+                if not handled:
+                    break
+                sent += handled
+            if sent:
+                self.stdout.write(f'Dispatched {sent} notifications.')
+            if options['once']:
+                break
+            close_old_connections()
+            time.sleep(outbox_setting('POLL_INTERVAL'))
@@ -0,0 +1,51 @@
+import json
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from manager.models import Project
+from manager.task_import import FORMATS, ImportFormatError, TaskImporter, detect_format
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create tasks in a project from an NDJSON or CSV file. Bad rows are reported and skipped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('path', help='File to import, or - for standard input.')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, help='Rows resolved and inserted per batch.')
+        parser.add_argument('--dry-run', action='store_true', help='Validate every row without saving.')
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(id=options['project_id'])
+        except Project.DoesNotExist:
+            raise CommandError(f'Project {options["project_id"]} does not exist.')
+
+        path = options['path']
+        file_format = options['format'] or detect_format(path)
+        if file_format is None:
+            raise CommandError('Cannot tell the format from the file name; pass --format.')
+
+        importer = TaskImporter(project, chunk_size=options['chunk_size'])
+        try:
+            if path == '-':
+                report = importer.run(sys.stdin.buffer, file_format, dry_run=options['dry_run'])
+            else:
+                if not os.path.exists(path):
+                    raise CommandError(f'{path} does not exist.')
+                with open(path, 'rb') as stream:
+                    report = importer.run(stream, file_format, dry_run=options['dry_run'])
+        except ImportFormatError as exc:
+            raise CommandError(f'{exc} {importer.created} tasks were imported before this point.')
+
+        for error in report['errors']:
+            self.stderr.write(f'line {error["line"]}: {json.dumps(error["errors"])}')
+        if report['errors_truncated']:
+            self.stderr.write(f'... {report["error_count"] - len(report["errors"])} more errors.')
+        verb = 'Validated' if report['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {report["valid"]} of {report["rows"]} rows; {report["error_count"]} rows had errors.'
+        ))
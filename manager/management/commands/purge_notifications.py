@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from manager.models import Notification, NotificationOutbox
+from manager.notifications import notification_setting, outbox_setting
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete notifications, delivered outbox rows and outbox rows that ran out of '
+        'delivery attempts, older than the retention window.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='Retention in days. Defaults to NOTIFICATIONS["RETENTION_DAYS"].')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows deleted per query.')
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else notification_setting('RETENTION_DAYS')
+        cutoff = timezone.now() - timedelta(days=days)
+
+        notifications = self.purge(Notification.objects.filter(created_at__lt=cutoff), options['batch_size'])
+        outbox = self.purge(NotificationOutbox.objects.filter(sent_at__lt=cutoff), options['batch_size'])
+        # The dispatcher never retries these again.
+        undeliverable = self.purge(
+            NotificationOutbox.objects.filter(
+                sent_at__isnull=True, attempts__gte=outbox_setting('MAX_ATTEMPTS'), created_at__lt=cutoff,
+            ),
+            options['batch_size'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {notifications} notifications, {outbox} delivered and {undeliverable} undeliverable '
+            f'outbox rows older than {days} days.'
+        ))
+
+    def purge(self, queryset, batch_size):
+        purged = 0
+        while True:
+            ids = list(queryset.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return purged
+            purged += queryset.model.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+
+from accounts.models import CustomUser
+from manager.models import DeveloperMetrics, Task
+
+
+class Command(BaseCommand):
+    help = "Rebuild every developer's DeveloperMetrics counters and sums from Task history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of developers rebuilt per transaction.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        developer_ids = (
+            CustomUser.objects
+            .filter(Q(assigned_tasks__isnull=False) | Q(metrics__isnull=False))
+            .values_list('id', flat=True)
+            .distinct()
+            .order_by('id')
+        )
+
+        rebuilt = 0
+        last_id = 0
+        while True:
+            batch = list(developer_ids.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            self.rebuild_batch(batch)
+            rebuilt += len(batch)
+            last_id = batch[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt metrics for {rebuilt} developers.'))
+
+    @transaction.atomic
+    def rebuild_batch(self, developer_ids):
+        completed = Q(status='completed')
+        delivery_time = ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField())
+        allocated_time = ExpressionWrapper(F('manager_end_time') - F('manager_start_time'), output_field=DurationField())
+
+        totals = {
+            row['developer']: row
+            for row in Task.objects
+            .filter(developer_id__in=developer_ids)
+            .values('developer')
+            .annotate(
+                tasks_completed=Count('id', filter=completed),
+                total_delivery_time=Sum(delivery_time, filter=completed),
+                total_allocated_time=Sum(allocated_time, filter=completed),
+            )
+            .order_by()
+        }
+
+        existing = {
+            metrics.developer_id: metrics
+            for metrics in DeveloperMetrics.objects.filter(developer_id__in=developer_ids)
+        }
+
+        to_create = []
+        for developer_id in developer_ids:
+            # tasks_reassigned has no Task history to rebuild from, so it is kept.
+            metrics = existing.get(developer_id)
+            if metrics is None:
+                metrics = DeveloperMetrics(developer_id=developer_id)
+                to_create.append(metrics)
+
+            row = totals.get(developer_id, {})
+            metrics.tasks_completed = row.get('tasks_completed', 0)
+            metrics.total_delivery_time = row.get('total_delivery_time')
+            metrics.total_allocated_time = row.get('total_allocated_time')
+
+        DeveloperMetrics.objects.bulk_create(to_create)
+        DeveloperMetrics.objects.bulk_update(
+            existing.values(),
+            ['tasks_completed', 'total_delivery_time', 'total_allocated_time'],
+        )
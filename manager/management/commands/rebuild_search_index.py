@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from manager.search import rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    help = 'Refill the full-text search index from projects, tasks and to-dos.'
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError('The search index needs SQLite with FTS5.')
+        indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} rows.'))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+from SW_Project_Management.db_routing import replica_setting, replicate_sqlite
+
+
+class Command(BaseCommand):
+    help = 'Copy the default SQLite database over its read replicas. A local stand-in for real replication.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Copy once and exit.')
+        parser.add_argument('--interval', type=float, default=2, help='Seconds between copies; keep it below DATABASE_REPLICAS["STICKY_SECONDS"].')
+
+    def handle(self, *args, **options):
+        aliases = replica_setting('ALIASES')
+        if not aliases:
+            raise CommandError('No replicas are configured in DATABASE_REPLICAS["ALIASES"].')
+        if any(connections[alias].vendor != 'sqlite' for alias in [DEFAULT_DB_ALIAS, *aliases]):
+            raise CommandError('replicate_sqlite only copies between SQLite databases.')
+        while True:
+            replicate_sqlite(aliases)
+            self.stdout.write(f'Copied {DEFAULT_DB_ALIAS} to {", ".join(aliases)}.')
+            if options['once']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
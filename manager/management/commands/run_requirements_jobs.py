@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from manager.jobs import jobs_setting, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run pending requirements generation jobs. Use with manager.jobs.DatabaseQueueJobBackend.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the pending jobs once and exit.')
+
+    def handle(self, *args, **options):
+        while True:
+            ran = run_pending_jobs()
+            if ran:
+                self.stdout.write(f'Ran {ran} requirements jobs.')
+            if options['once']:
+                break
+            close_old_connections()
+            time.sleep(jobs_setting('POLL_INTERVAL'))
@@ -0,0 +1,160 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from developer.models import ToDo
+from manager.models import Project, Task
+
+MANAGER_EMAIL = 'load-manager-{}@example.com'
+DEVELOPER_EMAIL = 'load-developer-{}@example.com'
+
+WORDS = [
+    'invoice', 'payment', 'report', 'export', 'login', 'profile', 'dashboard', 'chart', 'email', 'reminder',
+    'upload', 'template', 'schedule', 'calendar', 'search', 'filter', 'archive', 'audit', 'billing', 'customer',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-create managers, projects, developers, tasks and to-dos for load testing. '
+        'Accounts are named load-manager-<n>@example.com and load-developer-<n>@example.com.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--managers', type=int, default=10)
+        parser.add_argument('--projects-per-manager', type=int, default=5)
+        parser.add_argument('--developers', type=int, default=200)
+        parser.add_argument('--developers-per-project', type=int, default=8)
+        parser.add_argument('--tasks-per-project', type=int, default=200)
+        parser.add_argument('--todos-per-developer', type=int, default=20)
+        parser.add_argument('--password', default='load-test-password')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--flush', action='store_true', help='Delete the accounts of an earlier run, and their data, first.')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+
+        existing = CustomUser.objects.filter(email__startswith='load-', email__endswith='@example.com')
+        if existing.exists():
+            if not options['flush']:
+                raise CommandError('Load-test accounts already exist; pass --flush to replace them.')
+            existing.delete()
+
+        with transaction.atomic():
+            # One PBKDF2 run shared by every account instead of one per user.
+            password = make_password(options['password'])
+            managers = self.create_users(MANAGER_EMAIL, options['managers'], password, admin_role=True)
+            developers = self.create_users(DEVELOPER_EMAIL, options['developers'], password, admin_role=False)
+            projects = self.create_projects(managers, options['projects_per_manager'])
+            members = self.assign_developers(projects, developers, options['developers_per_project'])
+            tasks = self.create_tasks(projects, members, options['tasks_per_project'])
+            todos = self.create_todos(developers, options['todos_per_developer'])
+
+        call_command('rebuild_developer_metrics', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(managers)} managers, {len(projects)} projects, {len(developers)} developers, '
+            f'{tasks} tasks and {todos} to-dos.'
+        ))
+
+    def create_users(self, email, count, password, admin_role):
+        users = [
+            CustomUser(
+                email=email.format(index), username=email.format(index).split('@')[0], password=password,
+                admin_role=admin_role, is_active=True,
+            )
+            for index in range(count)
+        ]
+        return CustomUser.objects.bulk_create(users, batch_size=self.batch_size)
+
+    def create_projects(self, managers, per_manager):
+        projects = []
+        for manager in managers:
+            for _ in range(per_manager):
+                created_at = self.now - timedelta(days=self.rng.uniform(0, 180))
+                projects.append(Project(
+                    name=' '.join(self.rng.sample(WORDS, 2)).title(),
+                    scope=' '.join(self.rng.choices(WORDS, k=12)),
+                    manager=manager,
+                    created_at=created_at,
+                    # Some deadlines have passed, so the Gantt view shows finished projects too.
+                    deadline=created_at + timedelta(days=self.rng.uniform(30, 240)),
+                ))
+        created_at = [project.created_at for project in projects]
+        projects = Project.objects.bulk_create(projects, batch_size=self.batch_size)
+        # auto_now_add overwrites created_at on insert, so it is set again afterwards.
+        for project, value in zip(projects, created_at):
+            project.created_at = value
+        Project.objects.bulk_update(projects, ['created_at'], batch_size=self.batch_size)
+        return projects
+
+    def assign_developers(self, projects, developers, per_project):
+        members = {project.id: self.rng.sample(developers, min(per_project, len(developers))) for project in projects}
+        Membership = Project.developers.through
+        Membership.objects.bulk_create(
+            [Membership(project_id=project_id, customuser_id=developer.id) for project_id, team in members.items() for developer in team],
+            batch_size=self.batch_size,
+        )
+        return members
+
+    def create_tasks(self, projects, members, per_project):
+        created = 0
+        batch = []
+        for project in projects:
+            span = (project.deadline - project.created_at).total_seconds()
+            for index in range(per_project):
+                batch.append(self.make_task(project, members[project.id], span, index))
+                if len(batch) >= self.batch_size:
+                    created += len(Task.objects.bulk_create(batch))
+                    batch = []
+        created += len(Task.objects.bulk_create(batch))
+        return created
+
+    def make_task(self, project, team, span, index):
+        planned_start = project.created_at + timedelta(seconds=self.rng.uniform(0, span * 0.9))
+        planned_end = planned_start + timedelta(days=self.rng.uniform(1, 14))
+        task = Task(
+            project=project,
+            # A few tasks are still unassigned.
+            developer=self.rng.choice(team) if team and self.rng.random() > 0.05 else None,
+            title=f'{" ".join(self.rng.sample(WORDS, 3)).capitalize()} #{index}',
+            description=' '.join(self.rng.choices(WORDS, k=20)),
+            manager_start_time=planned_start,
+            manager_end_time=planned_end,
+        )
+        if task.developer is None:
+            return task
+
+        # Work planned in the past is mostly done, current work mostly under way.
+        if planned_end < self.now:
+            weights = (0.05, 0.10, 0.85)
+        elif planned_start < self.now:
+            weights = (0.20, 0.60, 0.20)
+        else:
+            weights = (0.90, 0.10, 0.00)
+        task.status = self.rng.choices(['not_started', 'in_progress', 'completed'], weights)[0]
+
+        if task.status != 'not_started':
+            task.start_time = min(self.now, planned_start + timedelta(hours=self.rng.gauss(0, 12)))
+        if task.status == 'completed':
+            planned = planned_end - planned_start
+            # Delivery times scatter around the plan, with a long tail of late tasks.
+            task.end_time = min(self.now, task.start_time + planned * self.rng.lognormvariate(0, 0.35))
+            task.actual_time_spent = task.end_time - task.start_time
+        return task
+
+    def create_todos(self, developers, per_developer):
+        todos = [
+            ToDo(title=' '.join(self.rng.sample(WORDS, 3)).capitalize(), completed=self.rng.random() < 0.4, developer=developer)
+            for developer in developers
+            for _ in range(self.rng.randint(0, 2 * per_developer))
+        ]
+        return len(ToDo.objects.bulk_create(todos, batch_size=self.batch_size))
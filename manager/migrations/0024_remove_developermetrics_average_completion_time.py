@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:33
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0023_alter_project_manager_alter_task_developer'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='developermetrics',
+            name='average_completion_time',
+        ),
+    ]
@@ -0,0 +1,137 @@
+from django.db import migrations
+
+# The statements are spelled out here rather than built by manager.search,
+# so later changes to that module cannot change what this migration does.
+
+CREATE_STATEMENTS = [
+    'CREATE VIRTUAL TABLE manager_searchindex USING fts5('
+    'kind UNINDEXED, object_id UNINDEXED, project_id UNINDEXED, owner_id UNINDEXED, scope, title, body, '
+    "tokenize = 'porter unicode61 remove_diacritics 2')",
+    "INSERT INTO manager_searchindex(manager_searchindex, rank) VALUES ('rank', 'bm25(0, 0, 0, 0, 0, 4.0, 1.0)')",
+    (
+        'CREATE TRIGGER manager_searchindex_project_insert AFTER INSERT ON manager_project BEGIN '
+        'INSERT INTO manager_searchindex(rowid, kind, object_id, project_id, owner_id, scope, title, body)'
+        " SELECT NEW.id * 4 + 1, 'project', NEW.id, NEW.id, NULL, 'p' || NEW.id, NEW.name, NEW.scope"
+        " || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(NEW.functional_requirements)), '')"
+        " || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(NEW.non_functional_requirements)), '')"
+        " || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(NEW.edited_functional_requirements)), '')"
+        " || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(NEW.edited_non_functional_requirements)), ''); "
+        'END'
+    ),
+    (
+        'CREATE TRIGGER manager_searchindex_project_update AFTER UPDATE OF name, scope, functional_requirements, non_functional_requirements, edited_functional_requirements, edited_non_functional_requirements ON manager_project BEGIN '
+        'DELETE FROM manager_searchindex WHERE rowid = OLD.id * 4 + 1; '
+        'INSERT INTO manager_searchindex(rowid, kind, object_id, project_id, owner_id, scope, title, body)'
+        " SELECT NEW.id * 4 + 1, 'project', NEW.id, NEW.id, NULL, 'p' || NEW.id, NEW.name, NEW.scope"
+        " || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(NEW.functional_requirements)), '')"
+        " || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(NEW.non_functional_requirements)), '')"
+        " || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(NEW.edited_functional_requirements)), '')"
+        " || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(NEW.edited_non_functional_requirements)), ''); "
+        'END'
+    ),
+    (
+        'CREATE TRIGGER manager_searchindex_project_delete AFTER DELETE ON manager_project BEGIN '
+        'DELETE FROM manager_searchindex WHERE rowid = OLD.id * 4 + 1; '
+        'END'
+    ),
+    (
+        'CREATE TRIGGER manager_searchindex_task_insert AFTER INSERT ON manager_task BEGIN '
+        'INSERT INTO manager_searchindex(rowid, kind, object_id, project_id, owner_id, scope, title, body)'
+        " SELECT NEW.id * 4 + 2, 'task', NEW.id, NEW.project_id, NULL, 'p' || NEW.project_id, NEW.title, coalesce(NEW.description, ''); "
+        'END'
+    ),
+    (
+        'CREATE TRIGGER manager_searchindex_task_update AFTER UPDATE OF title, description, project_id ON manager_task BEGIN '
+        'DELETE FROM manager_searchindex WHERE rowid = OLD.id * 4 + 2; '
+        'INSERT INTO manager_searchindex(rowid, kind, object_id, project_id, owner_id, scope, title, body)'
+        " SELECT NEW.id * 4 + 2, 'task', NEW.id, NEW.project_id, NULL, 'p' || NEW.project_id, NEW.title, coalesce(NEW.description, ''); "
+        'END'
+    ),
+    (
+        'CREATE TRIGGER manager_searchindex_task_delete AFTER DELETE ON manager_task BEGIN '
+        'DELETE FROM manager_searchindex WHERE rowid = OLD.id * 4 + 2; '
+        'END'
+    ),
+    (
+        'CREATE TRIGGER manager_searchindex_todo_insert AFTER INSERT ON developer_todo BEGIN '
+        'INSERT INTO manager_searchindex(rowid, kind, object_id, project_id, owner_id, scope, title, body)'
+        " SELECT NEW.id * 4 + 3, 'todo', NEW.id, NULL, NEW.developer_id, 'u' || NEW.developer_id, NEW.title, ''; "
+        'END'
+    ),
+    (
+        'CREATE TRIGGER manager_searchindex_todo_update AFTER UPDATE OF title, developer_id ON developer_todo BEGIN '
+        'DELETE FROM manager_searchindex WHERE rowid = OLD.id * 4 + 3; '
+        'INSERT INTO manager_searchindex(rowid, kind, object_id, project_id, owner_id, scope, title, body)'
+        " SELECT NEW.id * 4 + 3, 'todo', NEW.id, NULL, NEW.developer_id, 'u' || NEW.developer_id, NEW.title, ''; "
+        'END'
+    ),
+    (
+        'CREATE TRIGGER manager_searchindex_todo_delete AFTER DELETE ON developer_todo BEGIN '
+        'DELETE FROM manager_searchindex WHERE rowid = OLD.id * 4 + 3; '
+        'END'
+    ),
+]
+
+BACKFILL_STATEMENTS = [
+    (
+        'INSERT INTO manager_searchindex(rowid, kind, object_id, project_id, owner_id, scope, title, body)'
+        " SELECT source.id * 4 + 1, 'project', source.id, source.id, NULL, 'p' || source.id, source.name, source.scope"
+        " || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(source.functional_requirements)), '')"
+        " || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(source.non_functional_requirements)), '')"
+        " || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(source.edited_functional_requirements)), '')"
+        " || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(source.edited_non_functional_requirements)), '')"
+        ' FROM manager_project AS source'
+    ),
+    (
+        'INSERT INTO manager_searchindex(rowid, kind, object_id, project_id, owner_id, scope, title, body)'
+        " SELECT source.id * 4 + 2, 'task', source.id, source.project_id, NULL, 'p' || source.project_id, source.title, coalesce(source.description, '')"
+        ' FROM manager_task AS source'
+    ),
+    (
+        'INSERT INTO manager_searchindex(rowid, kind, object_id, project_id, owner_id, scope, title, body)'
+        " SELECT source.id * 4 + 3, 'todo', source.id, NULL, source.developer_id, 'u' || source.developer_id, source.title, '' FROM developer_todo AS source"
+    ),
+    "INSERT INTO manager_searchindex(manager_searchindex) VALUES ('optimize')",
+]
+
+DROP_STATEMENTS = [
+    'DROP TRIGGER IF EXISTS manager_searchindex_project_insert',
+    'DROP TRIGGER IF EXISTS manager_searchindex_project_update',
+    'DROP TRIGGER IF EXISTS manager_searchindex_project_delete',
+    'DROP TRIGGER IF EXISTS manager_searchindex_task_insert',
+    'DROP TRIGGER IF EXISTS manager_searchindex_task_update',
+    'DROP TRIGGER IF EXISTS manager_searchindex_task_delete',
+    'DROP TRIGGER IF EXISTS manager_searchindex_todo_insert',
+    'DROP TRIGGER IF EXISTS manager_searchindex_todo_update',
+    'DROP TRIGGER IF EXISTS manager_searchindex_todo_delete',
+    'DROP TABLE IF EXISTS manager_searchindex',
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_STATEMENTS:
+        schema_editor.execute(statement)
+    with schema_editor.connection.cursor() as cursor:
+        for statement in BACKFILL_STATEMENTS:
+            cursor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_STATEMENTS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('developer', '0001_initial'),
+        ('manager', '0027_requirementsjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,155 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ROOT': None,  # directory holding one folder per model; None disables the registry
+    'RELOAD_INTERVAL': 5,  # seconds between checks for a newly published version
+}
+
+
+def models_setting(name):
+    return getattr(settings, 'AI_MODELS', {}).get(name, DEFAULTS[name])
+
+
+def resident_bytes(path):
+    """
+    Bytes of files under ``path`` currently resident in this process, read
+    from /proc/self/smaps. None where that file is not available.
+    """
+    prefix = str(path) + os.sep
+    total = 0
+    mapped = False
+    try:
+        with open('/proc/self/smaps') as smaps:
+            for line in smaps:
+                fields = line.split()
+                if fields and '-' in fields[0] and len(fields) >= 5:
+                    mapped = len(fields) >= 6 and fields[5].startswith(prefix)
+                elif mapped and fields[0] == 'Rss:':
+                    total += int(fields[1]) * 1024
+    except OSError:
+        return None
+    return total
+
+
+class LoadedModel:
+    """
+    One version of a model: every ``*.npy`` file in its folder, opened with
+    mmap_mode='r'. Pages are read from disk on first use and live in the page
+    cache, so every worker mapping the same files shares one copy.
+    """
+
+    def __init__(self, name, version, path):
+        self.name = name
+        self.version = version
+        self.path = path
+        started = time.perf_counter()
+        self.arrays = {
+            artifact.stem: np.load(artifact, mmap_mode='r', allow_pickle=False)
+            for artifact in sorted(path.glob('*.npy'))
+        }
+        self.load_seconds = time.perf_counter() - started
+        self.loaded_at = time.time()
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def get(self, key, default=None):
+        return self.arrays.get(key, default)
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'artifacts': sorted(self.arrays),
+            'mapped_bytes': sum(array.nbytes for array in self.arrays.values()),
+            'resident_bytes': resident_bytes(self.path),
+            'load_seconds': round(self.load_seconds, 6),
+            'loaded_at': self.loaded_at,
+        }
+
+
+class ModelRegistry:
+    """
+    Resolves model names to their current LoadedModel. Models live in
+    ``<root>/<name>/<version>/*.npy`` and ``<root>/<name>/CURRENT`` names the
+    active version. Publishing a version means writing its folder and then
+    replacing CURRENT (os.replace), which running workers pick up within
+    RELOAD_INTERVAL seconds without a restart.
+    """
+
+    def __init__(self, root, reload_interval):
+        self.root = Path(root) if root else None
+        self.reload_interval = reload_interval
+        self._models = {}
+        self._checked_at = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """
+        The current version of ``name``, or None when it has not been published.
+        """
+        now = time.monotonic()
+        if now - self._checked_at.get(name, float('-inf')) < self.reload_interval:
+            return self._models.get(name)
+        with self._lock:
+            if now - self._checked_at.get(name, float('-inf')) >= self.reload_interval:
+                self._refresh(name)
+                self._checked_at[name] = time.monotonic()
+            return self._models.get(name)
+
+    def reload(self, name):
+        with self._lock:
+            self._refresh(name)
+            self._checked_at[name] = time.monotonic()
+            return self._models.get(name)
+
+    def _refresh(self, name):
+        version = self.current_version(name)
+        loaded = self._models.get(name)
+        if version is None:
+            self._models.pop(name, None)
+            return
+        if loaded is not None and loaded.version == version:
+            return
+        try:
+            model = LoadedModel(name, version, self.root / name / version)
+        except (OSError, ValueError):
+            # Keep serving the previous version if the new one is unreadable.
+            logger.exception('Could not load model %s version %s', name, version)
+            return
+        self._models[name] = model
+        logger.info('Loaded model %s version %s in %.3fs', name, version, model.load_seconds)
+
+    def current_version(self, name):
+        if self.root is None:
+            return None
+        try:
+            version = (self.root / name / 'CURRENT').read_text().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def stats(self):
+        with self._lock:
+            return [model.stats() for _, model in sorted(self._models.items())]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(models_setting('ROOT'), models_setting('RELOAD_INTERVAL'))
+        return _registry
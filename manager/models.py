@@ -1,4 +1,8 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from accounts.models import CustomUser
 from django.conf import settings
@@ -19,6 +23,72 @@ class Project(models.Model):
     def __str__(self):
         return self.name
 
+    def effective_requirements(self):
+        """
+        Functional plus non-functional requirements, preferring the edited
+        lists over the generated ones when they exist.
+        """
+        functional_requirements = self.edited_functional_requirements or self.functional_requirements or []
+        non_functional_requirements = self.edited_non_functional_requirements or self.non_functional_requirements or []
+        if isinstance(functional_requirements, str):
+            functional_requirements = [functional_requirements]
+        if isinstance(non_functional_requirements, str):
+            non_functional_requirements = [non_functional_requirements]
+        return list(functional_requirements) + list(non_functional_requirements)
+
+    def reconcile_tasks(self, requirements, prune=True):
+        """
+        Bring the project's tasks in line with a list of functional requirements.
+
+        Tasks whose title still matches a requirement are kept untouched.
+        Unassigned, not-started tasks are retitled in place for new
+        requirements, extra requirements are bulk-created and leftover
+        unassigned tasks are bulk-deleted. Tasks that are assigned or already
+        started are never retitled or deleted. With ``prune=False`` existing
+        tasks are left alone and only missing requirements are created.
+        Call inside a transaction.
+        """
+        if isinstance(requirements, str):
+            requirements = [requirements]
+
+        existing = {}
+        for task in self.tasks.order_by('id'):
+            existing.setdefault(task.title, []).append(task)
+
+        unmatched_requirements = []
+        for requirement in requirements:
+            if existing.get(requirement):
+                existing[requirement].pop(0)
+            else:
+                unmatched_requirements.append(requirement)
+
+        reusable = [
+            task
+            for tasks in existing.values()
+            for task in tasks
+            if prune and task.developer_id is None and task.status == 'not_started'
+        ]
+        reusable.sort(key=lambda task: task.id)
+
+        to_update = []
+        to_create = []
+        for requirement in unmatched_requirements:
+            if reusable:
+                task = reusable.pop(0)
+                task.title = requirement
+                to_update.append(task)
+            else:
+                to_create.append(Task(project=self, title=requirement))
+
+        if to_update:
+            Task.objects.bulk_update(to_update, ['title'])
+        if to_create:
+            Task.objects.bulk_create(to_create)
+        if reusable:
+            Task.objects.filter(id__in=[task.id for task in reusable]).delete()
+
+        return {'updated': len(to_update), 'created': len(to_create), 'deleted': len(reusable)}
+
 
 
 class Task(models.Model):
@@ -54,7 +124,116 @@ class Task(models.Model):
 class DeveloperMetrics(models.Model):
     developer = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='metrics')
     tasks_completed = models.IntegerField(default=0)
-    average_completion_time = models.DurationField(null=True, blank=True)
     tasks_reassigned = models.IntegerField(default=0)
     total_delivery_time = models.DurationField(null=True, blank=True)
     total_allocated_time = models.DurationField(null=True, blank=True)
+
+    @property
+    def average_completion_time(self):
+        if self.tasks_completed and self.total_delivery_time:
+            return self.total_delivery_time / self.tasks_completed
+        return None
+
+    @classmethod
+    def record_completion(cls, task):
+        """
+        Add a freshly completed task to its developer's running totals.
+        Must be called inside the transaction that saves the task.
+        """
+        cls._apply(task, tasks_completed=1, sign=1)
+
+    @classmethod
+    def record_restart(cls, task):
+        """
+        Take a completed task back out of the running totals when it is
+        restarted, and count the reassignment.
+        """
+        cls._apply(task, tasks_completed=-1, sign=-1, tasks_reassigned=1)
+
+    @classmethod
+    def record_imported(cls, totals):
+        """
+        Add tasks imported as already completed, given as {developer id:
+        (count, delivery time, allocated time)}. A time is None when none of
+        the developer's tasks had one.
+        """
+        zero = Value(timedelta(0), output_field=models.DurationField())
+        for developer_id, (count, delivery_time, allocated_time) in totals.items():
+            cls.objects.get_or_create(developer_id=developer_id)
+            updates = {'tasks_completed': F('tasks_completed') + count}
+            if delivery_time is not None:
+                updates['total_delivery_time'] = Coalesce(F('total_delivery_time'), zero) + delivery_time
+            if allocated_time is not None:
+                updates['total_allocated_time'] = Coalesce(F('total_allocated_time'), zero) + allocated_time
+            cls.objects.filter(developer_id=developer_id).update(**updates)
+
+    @classmethod
+    def _apply(cls, task, tasks_completed, sign, tasks_reassigned=0):
+        if task.developer_id is None:
+            return
+        cls.objects.get_or_create(developer_id=task.developer_id)
+
+        zero = Value(timedelta(0), output_field=models.DurationField())
+        updates = {
+            'tasks_completed': F('tasks_completed') + tasks_completed,
+            'tasks_reassigned': F('tasks_reassigned') + tasks_reassigned,
+        }
+        if task.start_time and task.end_time:
+            delivery_time = (task.end_time - task.start_time) * sign
+            updates['total_delivery_time'] = Coalesce(F('total_delivery_time'), zero) + delivery_time
+        if task.manager_start_time and task.manager_end_time:
+            allocated_time = (task.manager_end_time - task.manager_start_time) * sign
+            updates['total_allocated_time'] = Coalesce(F('total_allocated_time'), zero) + allocated_time
+        cls.objects.filter(developer_id=task.developer_id).update(**updates)
+
+
+class Notification(models.Model):
+    recipient = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='notifications')
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient'], condition=Q(read_at__isnull=True), name='notification_unread_idx'),
+        ]
+
+    def __str__(self):
+        return self.message
+
+
+class NotificationOutbox(models.Model):
+    group = models.CharField(max_length=200)
+    event = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True, default='')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    sent_at = models.DateTimeField(null=True, blank=True)
+    delivery_time = models.DurationField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['sent_at', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f'{self.group}: {self.event}'
+
+
+class RequirementsJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='requirements_jobs')
+    status = models.CharField(max_length=20, default='pending', choices=STATUS_CHOICES, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+
+    def __str__(self):
+        return f'{self.project} requirements ({self.status})'
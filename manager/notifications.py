@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Notification, NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DEFAULTS = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 2,  # seconds, doubled after every failed attempt
+    'CLAIM_TIMEOUT': 60,  # seconds before a claimed but unsent batch is retried
+    'POLL_INTERVAL': 5,  # seconds between outbox scans when nothing wakes the dispatcher
+    'AUTOSTART': True,  # run the dispatcher in a background thread of each web worker
+    'COALESCE_WINDOW': 0.05,  # seconds a wakeup waits so a burst lands in one batch
+    'COALESCE_MAX_BATCH': 50,  # most notifications per WebSocket frame, 1 disables coalescing
+}
+
+
+NOTIFICATION_DEFAULTS = {
+    'REPLAY_LIMIT': 500,  # most missed notifications replayed to a reconnecting consumer
+    'ACK_FLUSH_INTERVAL': 1.0,  # seconds read acknowledgements are buffered before one UPDATE
+    'ACK_BATCH_SIZE': 100,  # buffered acknowledgements that force an early flush
+    'RETENTION_DAYS': 30,  # age after which purge_notifications deletes notifications
+}
+
+
+def outbox_setting(name):
+    return getattr(settings, 'NOTIFICATION_OUTBOX', {}).get(name, OUTBOX_DEFAULTS[name])
+
+
+def notification_setting(name):
+    return getattr(settings, 'NOTIFICATIONS', {}).get(name, NOTIFICATION_DEFAULTS[name])
+
+
+def notify(user_id, notification):
+    """
+    Store a notification for ``user_id`` and queue it for the
+    ``notifications_<user_id>`` group.
+
+    Both rows are written in the caller's transaction and only sent once that
+    transaction commits, so rolled back writes never notify anyone. The stored
+    Notification lets a reconnecting consumer replay what it missed.
+    """
+    stored = Notification.objects.create(recipient_id=user_id, message=notification)
+    NotificationOutbox.objects.create(
+        group=f'notifications_{user_id}',
+        event={'type': 'send_notification', 'notification': notification, 'id': stored.id},
+    )
+    if outbox_setting('AUTOSTART'):
+        transaction.on_commit(dispatcher.wake)
+
+
+class OutboxDispatcher:
+    """
+    Drains NotificationOutbox in batches and pushes each row to the channel layer.
+
+    Batches are claimed with a single UPDATE so several workers can run a
+    dispatcher against the same table without sending a row twice.
+    """
+
+    def __init__(self):
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def wake(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.run_forever, name='notification-outbox', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def run_forever(self):
+        while True:
+            if self._wakeup.wait(outbox_setting('POLL_INTERVAL')):
+                # Let the rest of a burst reach the outbox so it is coalesced.
+                time.sleep(outbox_setting('COALESCE_WINDOW'))
+            self._wakeup.clear()
+            try:
+                while self.drain():
+                    pass
+            except Exception:
+                logger.exception('Notification outbox dispatch failed')
+            finally:
+                close_old_connections()
+
+    def drain(self):
+        """
+        Send one batch of due notifications. Returns the number of rows handled.
+        """
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        due = NotificationOutbox.objects.filter(
+            sent_at__isnull=True,
+            attempts__lt=outbox_setting('MAX_ATTEMPTS'),
+            next_attempt_at__lte=now,
+        )
+        due_ids = list(due.order_by('id').values_list('id', flat=True)[:outbox_setting('BATCH_SIZE')])
+        if not due_ids:
+            return 0
+
+        # Rows another dispatcher claimed in the meantime no longer match ``due``.
+        claimed = due.filter(id__in=due_ids).update(
+            claim_token=token,
+            next_attempt_at=now + timedelta(seconds=outbox_setting('CLAIM_TIMEOUT')),
+        )
+        if not claimed:
+            return 0
+
+        batch = list(NotificationOutbox.objects.filter(claim_token=token).order_by('id'))
+        channel_layer = get_channel_layer()
+        for group, messages in self.coalesce(batch):
+            for message in messages:
+                message.attempts += 1
+            started = time.perf_counter()
+            try:
+                async_to_sync(channel_layer.group_send)(group, self.frame(messages))
+            except Exception as exc:
+                for message in messages:
+                    delay = outbox_setting('RETRY_DELAY') * 2 ** (message.attempts - 1)
+                    message.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+                    message.last_error = repr(exc)
+                logger.warning('%s notifications to %s failed: %r', len(messages), group, exc)
+            else:
+                delivery_time = timedelta(seconds=time.perf_counter() - started)
+                for message in messages:
+                    message.sent_at = timezone.now()
+                    message.delivery_time = delivery_time
+                    message.last_error = ''
+
+        NotificationOutbox.objects.bulk_update(
+            batch, ['attempts', 'next_attempt_at', 'last_error', 'sent_at', 'delivery_time'],
+        )
+        return len(batch)
+
+    def coalesce(self, batch):
+        """
+        Split a batch into (group, messages) chunks, keeping each group's
+        send_notification events together up to COALESCE_MAX_BATCH per chunk.
+        """
+        max_batch = outbox_setting('COALESCE_MAX_BATCH')
+        chunks = []
+        open_chunks = {}
+        for message in batch:
+            if message.event.get('type') != 'send_notification':
+                chunks.append((message.group, [message]))
+                continue
+            chunk = open_chunks.get(message.group)
+            if chunk is None or len(chunk[1]) >= max_batch:
+                chunk = (message.group, [])
+                open_chunks[message.group] = chunk
+                chunks.append(chunk)
+            chunk[1].append(message)
+        return chunks
+
+    def frame(self, messages):
+        if len(messages) == 1:
+            return messages[0].event
+        return {
+            'type': 'send_notifications',
+            'notifications': [
+                {'id': message.event.get('id'), 'notification': message.event['notification']}
+                for message in messages
+            ],
+        }
+
+
+dispatcher = OutboxDispatcher()
@@ -0,0 +1,21 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Opt-in cursor pagination for list endpoints.
+
+    Clients that send neither ``cursor`` nor ``page_size`` keep getting the
+    full, unpaginated list. Pages are fetched with ``WHERE id > <cursor>``
+    on the primary key, so there is no ``OFFSET`` scan and no ``COUNT(*)``.
+    """
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (self.cursor_query_param not in request.query_params
+                and self.page_size_query_param not in request.query_params):
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,146 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.response import Response
+
+from SW_Project_Management.db_routing import replica_read_active, replica_setting
+
+DEFAULTS = {
+    'ALIAS': 'responses',  # entry in settings.CACHES holding versions and payloads
+    'TIMEOUT': 3600,  # seconds; only bounds memory when the cache is shared between workers
+    'LOCAL_TIMEOUT': 5,  # seconds for a local-memory cache, whose versions other workers never see bumped
+}
+
+
+def cache_setting(name):
+    return getattr(settings, 'RESPONSE_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def get_cache():
+    return caches[cache_setting('ALIAS')]
+
+
+class CacheStats:
+    """
+    Per-process hit and miss counters for the response cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else None,
+            'backend': settings.CACHES[cache_setting('ALIAS')]['BACKEND'],
+        }
+
+
+stats = CacheStats()
+
+
+def version_key(user_id):
+    return f'response-version:user:{user_id}'
+
+
+def get_version(user_id):
+    cache = get_cache()
+    version = cache.get(version_key(user_id))
+    if version is None:
+        # A fresh, unique value so entries cached under an evicted version never match again.
+        cache.add(version_key(user_id), time.time_ns(), timeout=None)
+        version = cache.get(version_key(user_id))
+    return version
+
+
+def bump_users(user_ids):
+    """
+    Invalidate every cached response of ``user_ids`` once the current
+    transaction commits.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+
+    def bump():
+        get_cache().set_many({version_key(user_id): time.time_ns() for user_id in user_ids}, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+class VersionedResponseCacheMixin:
+    """
+    Cache a view's GET payload per user, keyed by the user's version counter.
+
+    Signals in ``manager.signals`` bump the counter whenever a Project, Task,
+    project membership or user name that the user can see changes. With a
+    cache shared by every worker that makes invalidation exact; a
+    local-memory cache only sees its own worker's bumps, so its entries are
+    kept for LOCAL_TIMEOUT seconds at most.
+    """
+    cache_scope = None
+
+    def get_cache_key_parts(self, request):
+        return []
+
+    def get_response_cache_key(self, request):
+        query = request.META.get('QUERY_STRING', '')
+        parts = [self.cache_scope or type(self).__name__, request.user.pk, get_version(request.user.pk), query]
+        parts += self.get_cache_key_parts(request)
+        digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+        return f'response:{request.user.pk}:{digest}'
+
+    def get(self, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            stats.record(hit=True)
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        stats.record(hit=False)
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = cache_setting('TIMEOUT')
+            if isinstance(cache, LocMemCache):
+                # Writes handled by other workers bump their own copy of the
+                # version, so this one can only be trusted for a short while.
+                timeout = min(timeout, cache_setting('LOCAL_TIMEOUT'))
+            if replica_read_active():
+                # A lagging replica can serve data older than the version it is
+                # cached under, so keep it no longer than the lag allowance.
+                timeout = min(timeout, replica_setting('STICKY_SECONDS'))
+            cache.set(key, plain(response.data), timeout=timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+def plain(data):
+    """
+    Strip serializer-bound ReturnList/ReturnDict wrappers so payloads pickle.
+    """
+    if isinstance(data, dict):
+        return {key: plain(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [plain(value) for value in data]
+    return data
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .risk_scoring import NUMERIC_RISK_FIELDS, RISK_VOCABULARIES
+
+DEFAULTS = {
+    'MAX_ENTRIES': 1024,  # least recently used entries are evicted beyond this
+    'TIMEOUT': 600,  # seconds an evaluation stays valid
+}
+
+
+def risk_cache_setting(name):
+    return getattr(settings, 'RISK_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def risk_cache_key(requirements, row, model_version=None):
+    """
+    Stable hash of a normalized risk evaluation input: the effective
+    requirements plus the risk parameters, with categorical values
+    case-folded and numbers compared as floats, and the model version
+    that scored it.
+    """
+    normalized = {
+        'model': model_version,
+        'requirements': [str(requirement).strip() for requirement in requirements],
+        'params': {
+            **{field: str(row[field]).strip().lower() for field in RISK_VOCABULARIES},
+            **{field: float(row[field]) for field in NUMERIC_RISK_FIELDS},
+        },
+    }
+    payload = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class RiskEvaluationCache:
+    """
+    Thread-safe LRU cache with a TTL for risk levels, indexed by project so a
+    project's entries can be dropped when its requirements are edited.
+    """
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._project_keys = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, project_id):
+        with self._lock:
+            if key in self._entries:
+                # The key may have been filed under another project before.
+                self._discard(key)
+            self._entries[key] = (value, time.monotonic() + self.timeout, project_id)
+            self._entries.move_to_end(key)
+            self._project_keys.setdefault(project_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_project(self, project_id):
+        with self._lock:
+            for key in self._project_keys.pop(project_id, ()):
+                if key in self._entries:
+                    self._discard(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._project_keys.clear()
+
+    def _discard(self, key):
+        _, _, project_id = self._entries.pop(key)
+        keys = self._project_keys.get(project_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._project_keys[project_id]
+
+    def snapshot(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_risk_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RiskEvaluationCache(risk_cache_setting('MAX_ENTRIES'), risk_cache_setting('TIMEOUT'))
+        return _cache
@@ -0,0 +1,87 @@
+import numpy as np
+
+# Categorical risk fields and the values the risk model was trained on.
+# Index 0 of every vocabulary is reserved for values the model has not seen.
+RISK_VOCABULARIES = {
+    'project_category': [
+        'transaction processing system', 'management information system', 'decision support system',
+        'office automation system', 'expert system', 'web application', 'mobile application', 'embedded system',
+    ],
+    'requirement_category': [
+        'functional', 'non-functional', 'performance', 'usability', 'security', 'reliability',
+        'maintainability', 'portability',
+    ],
+    'risk_target_category': ['schedule', 'cost', 'quality', 'scope', 'resources', 'technology'],
+    'magnitude_of_risk': ['negligible', 'low', 'normal', 'moderate', 'high', 'extreme'],
+    'impact': ['negligible', 'low', 'moderate', 'high', 'catastrophic'],
+    'dimension_of_risk': [
+        'requirements', 'estimations', 'planning', 'team organization', 'project management',
+        'user', 'technology', 'external',
+    ],
+}
+
+NUMERIC_RISK_FIELDS = [
+    'probability', 'affecting_no_of_modules', 'fixing_duration_days', 'fix_cost_percent', 'priority',
+]
+
+RISK_FIELDS = list(RISK_VOCABULARIES) + NUMERIC_RISK_FIELDS
+
+
+class RiskFeatureEncoder:
+    """
+    Turns risk rows (dicts of the RISK_FIELDS) into one float matrix:
+    the numeric fields followed by a one-hot block per categorical field.
+    """
+
+    def __init__(self, vocabularies=RISK_VOCABULARIES, numeric_fields=NUMERIC_RISK_FIELDS):
+        self.numeric_fields = list(numeric_fields)
+        self.lookups = {}
+        self.offsets = {}
+        offset = len(self.numeric_fields)
+        for field, values in vocabularies.items():
+            self.lookups[field] = {value: index for index, value in enumerate(values, start=1)}
+            self.offsets[field] = offset
+            offset += len(values) + 1
+        self.width = offset
+
+    def encode(self, rows):
+        matrix = np.zeros((len(rows), self.width), dtype=np.float32)
+        if not rows:
+            return matrix
+
+        matrix[:, :len(self.numeric_fields)] = np.array(
+            [[row[field] for field in self.numeric_fields] for row in rows], dtype=np.float32,
+        )
+
+        positions = np.arange(len(rows))
+        for field, lookup in self.lookups.items():
+            indexes = np.fromiter(
+                (lookup.get(str(row[field]).strip().lower(), 0) for row in rows), dtype=np.intp, count=len(rows),
+            )
+            matrix[positions, self.offsets[field] + indexes] = 1.0
+        return matrix
+
+
+encoder = RiskFeatureEncoder()
+
+
+def validate_risk_rows(rows):
+    """
+    Check every row has all RISK_FIELDS and numeric values where needed.
+    Returns ``{row_index: [messages]}`` for the rows that are invalid.
+    """
+    errors = {}
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[index] = ['Row must be an object.']
+            continue
+        messages = [f'{field} is required.' for field in RISK_FIELDS if row.get(field) is None]
+        for field in NUMERIC_RISK_FIELDS:
+            if row.get(field) is not None:
+                try:
+                    float(row[field])
+                except (TypeError, ValueError):
+                    messages.append(f'{field} must be a number.')
+        if messages:
+            errors[index] = messages
+    return errors
@@ -0,0 +1,178 @@
+import json
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import Project
+
+SEARCH_TABLE = 'manager_searchindex'
+
+# kind: (rowid tag, source table, columns watched for updates, {index column: SQL expression over "{row}"})
+# Index rows use rowid = source id * 4 + tag, so triggers can replace or
+# delete a row by rowid without scanning the index. The scope column holds a
+# p<project id> or u<owner id> token so access checks are part of the match.
+SOURCES = {
+    'project': (1, 'manager_project', [
+        'name', 'scope', 'functional_requirements', 'non_functional_requirements',
+        'edited_functional_requirements', 'edited_non_functional_requirements',
+    ], {
+        'project_id': '{row}.id',
+        'owner_id': 'NULL',
+        'scope': "'p' || {row}.id",
+        'title': '{row}.name',
+        'body': " || ' ' || ".join([
+            '{row}.scope',
+            *(
+                f"coalesce((SELECT group_concat(value, ' ') FROM json_each({{row}}.{column})), '')"
+                for column in (
+                    'functional_requirements', 'non_functional_requirements',
+                    'edited_functional_requirements', 'edited_non_functional_requirements',
+                )
+            ),
+        ]),
+    }),
+    'task': (2, 'manager_task', ['title', 'description', 'project_id'], {
+        'project_id': '{row}.project_id',
+        'owner_id': 'NULL',
+        'scope': "'p' || {row}.project_id",
+        'title': '{row}.title',
+        'body': "coalesce({row}.description, '')",
+    }),
+    'todo': (3, 'developer_todo', ['title', 'developer_id'], {
+        'project_id': 'NULL',
+        'owner_id': '{row}.developer_id',
+        'scope': "'u' || {row}.developer_id",
+        'title': '{row}.title',
+        'body': "''",
+    }),
+}
+
+KINDS = list(SOURCES)
+
+INDEX_COLUMNS = ['kind', 'object_id', 'project_id', 'owner_id', 'scope', 'title', 'body']
+
+# bm25 weight per INDEX_COLUMNS entry: title matches count four times as much as body matches.
+RANK_WEIGHTS = '0, 0, 0, 0, 0, 4.0, 1.0'
+
+# Callers on more projects than this are filtered on project_id after
+# matching instead of through a very long OR of scope tokens.
+MAX_SCOPE_TOKENS = 200
+
+
+def source_select(kind, row):
+    tag, table, _, expressions = SOURCES[kind]
+    values = [f'{row}.id * 4 + {tag}', f"'{kind}'", f'{row}.id']
+    values += [expressions[column].format(row=row) for column in INDEX_COLUMNS[2:]]
+    return f"SELECT {', '.join(values)}"
+
+
+def insert_sql(kind, row, table=None):
+    columns = ', '.join(['rowid'] + INDEX_COLUMNS)
+    sql = f'INSERT INTO {SEARCH_TABLE}({columns}) {source_select(kind, row)}'
+    return sql + (f' FROM {table} AS {row}' if table else '')
+
+
+def create_statements():
+    statements = [
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+        "kind UNINDEXED, object_id UNINDEXED, project_id UNINDEXED, owner_id UNINDEXED, scope, title, body, "
+        "tokenize = 'porter unicode61 remove_diacritics 2')",
+        # ORDER BY rank lets FTS5 sort internally, so LIMIT stops before
+        # snippet() runs on rows that are not returned.
+        f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', 'bm25({RANK_WEIGHTS})')",
+    ]
+    for kind, (tag, table, watched, _) in SOURCES.items():
+        prefix = f'{SEARCH_TABLE}_{kind}'
+        statements += [
+            f'CREATE TRIGGER {prefix}_insert AFTER INSERT ON {table} BEGIN {insert_sql(kind, "NEW")}; END',
+            f"CREATE TRIGGER {prefix}_update AFTER UPDATE OF {', '.join(watched)} ON {table} BEGIN "
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id * 4 + {tag}; {insert_sql(kind, "NEW")}; END',
+            f'CREATE TRIGGER {prefix}_delete AFTER DELETE ON {table} BEGIN '
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id * 4 + {tag}; END',
+        ]
+    return statements
+
+
+def drop_statements():
+    statements = [
+        f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{kind}_{event}'
+        for kind in SOURCES for event in ('insert', 'update', 'delete')
+    ]
+    return statements + [f'DROP TABLE IF EXISTS {SEARCH_TABLE}']
+
+
+def search_available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def rebuild_index():
+    """
+    Refill the index from the source tables. The triggers keep it current
+    after that; this is for recovering from a damaged or missing index.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        for kind, (_, table, _, _) in SOURCES.items():
+            cursor.execute(insert_sql(kind, 'source', table))
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT count(*) FROM {SEARCH_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def match_expression(text):
+    """
+    Turn free text into an FTS5 query on title and body: every word must
+    appear, and the last one may be a prefix so results follow the user as
+    they type. Returns None when the text has no searchable words.
+    """
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return None
+    return '{title body} : (' + ' '.join(f'"{term}"' for term in terms) + '*)'
+
+
+def search(user, text, kinds=KINDS, limit=20):
+    """
+    Ranked matches for ``text`` among the projects ``user`` manages or is a
+    developer on, their tasks, and the user's own to-dos.
+    """
+    expression = match_expression(text)
+    if expression is None:
+        return []
+
+    project_ids = list(
+        Project.objects.filter(Q(manager=user) | Q(developers=user)).values_list('id', flat=True).distinct()
+    )
+    kind_placeholders = ', '.join(['%s'] * len(kinds))
+    params = [*kinds]
+    if len(project_ids) <= MAX_SCOPE_TOKENS:
+        scope = ' OR '.join([f'p{project_id}' for project_id in project_ids] + [f'u{user.id}'])
+        expression = f'{expression} AND scope : ({scope})'
+        access = ''
+    else:
+        access = 'AND (project_id IN (SELECT value FROM json_each(%s)) OR owner_id = %s) '
+        params += [json.dumps(project_ids), user.id]
+
+    sql = (
+        f'SELECT kind, object_id, project_id, title, '
+        f"snippet({SEARCH_TABLE}, {INDEX_COLUMNS.index('body')}, '[', ']', '...', 12), rank "
+        f'FROM {SEARCH_TABLE} '
+        f'WHERE {SEARCH_TABLE} MATCH %s AND kind IN ({kind_placeholders}) {access}'
+        f'ORDER BY rank LIMIT %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [expression, *params, limit])
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'type': kind,
+            'id': object_id,
+            'project_id': project_id,
+            'title': title,
+            'snippet': snippet,
+            'score': round(-score, 4),
+        }
+        for kind, object_id, project_id, title, snippet, score in rows
+    ]
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Project,Task
+from .models import Project,Task,RequirementsJob
 from .models import CustomUser
 from django.utils import timezone
 
@@ -107,4 +107,58 @@ class TaskSerializer(serializers.ModelSerializer):
 
 
 
+class TaskImportRowSerializer(serializers.Serializer):
+    """
+    One row of a bulk task import. ``developer`` stays an email here; the
+    importer resolves the emails of a whole chunk in one query. Pass the
+    project as ``context['project']`` to check task deadlines against it.
+    """
+    datetime_field_params = {
+        'required': False,
+        'allow_null': True,
+        'input_formats': ['iso-8601', *TaskSerializer.datetime_field_params['input_formats']],
+    }
+
+    title = serializers.CharField(max_length=200)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    developer = serializers.EmailField(required=False, allow_null=True)
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, default='not_started')
+    manager_start_time = DateTimeField(**datetime_field_params)
+    manager_end_time = DateTimeField(**datetime_field_params)
+    start_time = DateTimeField(**datetime_field_params)
+    end_time = DateTimeField(**datetime_field_params)
+
+    def validate(self, attrs):
+        if attrs.get('manager_start_time') and attrs.get('manager_end_time') and attrs['manager_end_time'] < attrs['manager_start_time']:
+            raise serializers.ValidationError({'manager_end_time': ['Must not be before manager_start_time.']})
+        # The importer fills in a missing start_time, and end_time of a
+        # completed task, with the current time; check the times it will store.
+        if attrs.get('end_time') and not attrs.get('start_time'):
+            raise serializers.ValidationError({'start_time': ['Required when end_time is given.']})
+        end_time = attrs.get('end_time')
+        if end_time is None and attrs.get('status') == 'completed':
+            end_time = timezone.now()
+        if attrs.get('start_time') and end_time and end_time < attrs['start_time']:
+            raise serializers.ValidationError({'end_time': ['Must not be before start_time.']})
+        project = self.context.get('project')
+        if project is not None and attrs.get('manager_end_time') and attrs['manager_end_time'] > project.deadline:
+            raise serializers.ValidationError({'manager_end_time': ["Task deadline cannot exceed the project's deadline."]})
+        return attrs
+
+
+class RequirementsJobSerializer(serializers.ModelSerializer):
+    functional_requirements = serializers.SerializerMethodField()
+    non_functional_requirements = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RequirementsJob
+        fields = [
+            'id', 'project', 'status', 'created_at', 'started_at', 'finished_at', 'error',
+            'functional_requirements', 'non_functional_requirements'
+        ]
+
+    def get_functional_requirements(self, job):
+        return job.project.functional_requirements if job.status == 'succeeded' else None
 
+    def get_non_functional_requirements(self, job):
+        return job.project.non_functional_requirements if job.status == 'succeeded' else None
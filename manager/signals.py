@@ -0,0 +1,121 @@
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from accounts.models import CustomUser
+from .models import Project, Task
+from .response_cache import bump_users
+from .risk_cache import get_risk_cache
+
+
+def project_member_ids(project):
+    return {project.manager_id, *project.developers.values_list('id', flat=True)}
+
+
+def member_ids_of(projects):
+    member_ids = set()
+    for manager_id, developer_id in projects.values_list('manager_id', 'developers__id'):
+        member_ids.update((manager_id, developer_id))
+    return member_ids
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, **kwargs):
+    bump_users(project_member_ids(instance))
+
+
+@receiver(pre_delete, sender=Project)
+def project_deleting(sender, instance, **kwargs):
+    # Membership rows are gone by post_delete, so collect them first.
+    instance._cached_member_ids = project_member_ids(instance)
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    bump_users(getattr(instance, '_cached_member_ids', {instance.manager_id}))
+
+
+@receiver(m2m_changed, sender=Project.developers.through)
+def project_developers_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # instance is a developer and pk_set holds project ids.
+        if action == 'pre_clear':
+            instance._cached_member_ids = member_ids_of(instance.assigned_projects.all()) | {instance.pk}
+        elif action == 'post_clear':
+            bump_users(getattr(instance, '_cached_member_ids', {instance.pk}))
+        elif action in ('post_add', 'post_remove'):
+            bump_users(member_ids_of(Project.objects.filter(id__in=pk_set)) | {instance.pk})
+        return
+
+    if action == 'pre_clear':
+        instance._cached_member_ids = project_member_ids(instance)
+    elif action == 'post_clear':
+        bump_users(getattr(instance, '_cached_member_ids', {instance.manager_id}))
+    elif action in ('post_add', 'post_remove'):
+        # Everyone on the project sees the developer list in ProjectSerializer.
+        bump_users(project_member_ids(instance) | set(pk_set or ()))
+
+
+@receiver(post_init, sender=Task)
+def task_loaded(sender, instance, **kwargs):
+    instance._cached_developer_id = instance.developer_id
+
+
+@receiver([post_save, post_delete], sender=Task)
+def task_changed(sender, instance, **kwargs):
+    bump_users({instance.developer_id, instance._cached_developer_id})
+    instance._cached_developer_id = instance.developer_id
+
+
+# User fields embedded in cached payloads, e.g. developer emails in task lists.
+USER_FIELDS = ('email', 'username')
+
+
+def user_snapshot(instance):
+    # Read __dict__ directly so deferred fields are not fetched on load.
+    return tuple(instance.__dict__.get(field) for field in USER_FIELDS)
+
+
+@receiver(post_init, sender=CustomUser)
+def user_loaded(sender, instance, **kwargs):
+    instance._cached_profile = user_snapshot(instance)
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, created, **kwargs):
+    snapshot = user_snapshot(instance)
+    if not created and snapshot != instance._cached_profile:
+        projects = Project.objects.filter(Q(manager=instance) | Q(developers=instance))
+        bump_users(member_ids_of(projects) | {instance.pk})
+    instance._cached_profile = snapshot
+
+
+REQUIREMENT_FIELDS = (
+    'functional_requirements', 'non_functional_requirements',
+    'edited_functional_requirements', 'edited_non_functional_requirements',
+)
+
+
+def requirement_snapshot(instance):
+    # Read __dict__ directly so deferred fields are not fetched on load.
+    return tuple(instance.__dict__.get(field) for field in REQUIREMENT_FIELDS)
+
+
+@receiver(post_init, sender=Project)
+def project_loaded(sender, instance, **kwargs):
+    instance._cached_requirements = requirement_snapshot(instance)
+
+
+@receiver(post_save, sender=Project)
+def project_requirements_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not set(update_fields) & set(REQUIREMENT_FIELDS)):
+        return
+    snapshot = requirement_snapshot(instance)
+    if snapshot != instance._cached_requirements:
+        get_risk_cache().invalidate_project(instance.pk)
+        instance._cached_requirements = snapshot
+
+
+@receiver(post_delete, sender=Project)
+def project_requirements_deleted(sender, instance, **kwargs):
+    get_risk_cache().invalidate_project(instance.pk)
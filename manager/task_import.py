@@ -0,0 +1,250 @@
+import codecs
+import csv
+import json
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from .models import DeveloperMetrics, Task
+from .notifications import notify
+from .response_cache import bump_users
+from .serializers import TaskImportRowSerializer
+from .signals import project_member_ids
+
+DEFAULTS = {
+    'CHUNK_SIZE': 1000,  # rows validated, resolved and inserted together
+    'MAX_ERRORS': 1000,  # row errors kept for the report; later ones are only counted
+    'MAX_LINE_BYTES': 1024 * 1024,
+}
+
+FORMATS = ('ndjson', 'csv')
+
+EXTENSIONS = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv'}
+
+CONTENT_TYPES = {
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'text/csv': 'csv',
+}
+
+
+def import_setting(name):
+    return getattr(settings, 'TASK_IMPORT', {}).get(name, DEFAULTS[name])
+
+
+class ImportFormatError(ValueError):
+    """
+    The upload cannot be read at all, as opposed to a single bad row.
+    """
+
+
+def detect_format(name='', content_type=''):
+    for extension, file_format in EXTENSIONS.items():
+        if name.lower().endswith(extension):
+            return file_format
+    return CONTENT_TYPES.get(content_type.split(';')[0].strip().lower())
+
+
+def iter_lines(stream, max_line_bytes=None, read_size=64 * 1024):
+    """
+    Yield the lines of a binary stream, newline included, holding at most
+    one line and one read in memory.
+    """
+    max_line_bytes = max_line_bytes or import_setting('MAX_LINE_BYTES')
+    buffer = b''
+    while True:
+        chunk = stream.read(read_size)
+        if not chunk:
+            break
+        buffer += chunk
+        lines = buffer.split(b'\n')
+        buffer = lines.pop()
+        for line in lines:
+            yield line + b'\n'
+        if len(buffer) > max_line_bytes:
+            raise ImportFormatError(f'A line is longer than {max_line_bytes} bytes.')
+    if buffer:
+        yield buffer
+
+
+def decode(lines):
+    try:
+        yield from codecs.iterdecode(lines, 'utf-8-sig')
+    except UnicodeDecodeError as exc:
+        raise ImportFormatError(f'The file is not valid UTF-8: {exc.reason}.')
+
+
+def ndjson_rows(lines):
+    """
+    Yield (line number, row dict or error message) for each non-blank line.
+    """
+    for number, line in enumerate(decode(lines), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, f'Invalid JSON: {exc.msg}.'
+            continue
+        if not isinstance(row, dict):
+            yield number, 'Each line must be a JSON object.'
+            continue
+        yield number, row
+
+
+def csv_rows(lines):
+    """
+    Yield (line number, row dict) for each record after the header row.
+    Empty cells are left out, so they fall back to the field defaults.
+    """
+    reader = csv.reader(decode(lines))
+    try:
+        header = [name.strip().lower() for name in next(reader)]
+    except StopIteration:
+        return
+    except csv.Error as exc:
+        raise ImportFormatError(f'Invalid CSV header: {exc}.')
+    if 'title' not in header:
+        raise ImportFormatError('The CSV header must include a "title" column.')
+
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            yield reader.line_num, f'Invalid CSV: {exc}.'
+            continue
+        if not any(cell.strip() for cell in record):
+            continue
+        yield reader.line_num, {name: cell for name, cell in zip(header, record) if name and cell.strip()}
+
+
+class TaskImporter:
+    """
+    Import tasks into ``project`` from an NDJSON or CSV stream.
+
+    Rows are validated one by one and inserted a chunk at a time, with the
+    developer emails of each chunk resolved in a single query, so memory
+    use depends on the chunk size, not the size of the upload. Rows that
+    fail validation are reported and skipped. Each chunk is committed in
+    its own transaction, so a large import never holds the database write
+    lock for longer than one chunk; if the upload turns out to be
+    unreadable partway, the chunks before that point stay imported.
+    """
+
+    def __init__(self, project, chunk_size=None, max_errors=None):
+        self.project = project
+        self.chunk_size = chunk_size or import_setting('CHUNK_SIZE')
+        self.max_errors = max_errors if max_errors is not None else import_setting('MAX_ERRORS')
+        self.rows = 0
+        self.valid = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.assigned = Counter()
+        self.member_ids = None
+
+    def run(self, stream, file_format, dry_run=False):
+        rows = ndjson_rows if file_format == 'ndjson' else csv_rows
+        # One serializer for every row: building its fields costs more than validating a row.
+        serializer = TaskImportRowSerializer(context={'project': self.project})
+        self.member_ids = project_member_ids(self.project)
+        try:
+            chunk = []
+            for line, row in rows(iter_lines(stream)):
+                self.rows += 1
+                if isinstance(row, str):
+                    self.add_error(line, {'non_field_errors': [row]})
+                    continue
+                try:
+                    data = serializer.run_validation(row)
+                except ValidationError as exc:
+                    self.add_error(line, as_serializer_error(exc))
+                    continue
+                chunk.append((line, data))
+                if len(chunk) >= self.chunk_size:
+                    self.insert(chunk, dry_run)
+                    chunk = []
+            self.insert(chunk, dry_run)
+        finally:
+            if not dry_run:
+                self.finish()
+        return self.report(dry_run)
+
+    def add_error(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'errors': {field: [str(error) for error in messages] for field, messages in errors.items()}})
+
+    def insert(self, chunk, dry_run):
+        if not chunk:
+            return
+        # Only the project's developers can be assigned, as in TaskSerializer.
+        emails = {data['developer'] for _, data in chunk if data.get('developer')}
+        developer_ids = dict(self.project.developers.filter(email__in=emails).values_list('email', 'id')) if emails else {}
+
+        now = timezone.now()
+        tasks = []
+        for line, data in chunk:
+            email = data.pop('developer', None)
+            developer_id = developer_ids.get(email) if email else None
+            if email and developer_id is None:
+                self.add_error(line, {'developer': ['No developer on this project has this email.']})
+                continue
+            task = Task(project=self.project, developer_id=developer_id, **data)
+            # bulk_create skips Task.save(), which fills these in.
+            if task.status in ('in_progress', 'completed') and task.start_time is None:
+                task.start_time = now
+            if task.status == 'completed':
+                task.end_time = task.end_time or now
+                task.actual_time_spent = task.end_time - task.start_time
+            tasks.append(task)
+        self.valid += len(tasks)
+        if dry_run or not tasks:
+            return
+
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            # What the per-task signals would have done, once per chunk.
+            DeveloperMetrics.record_imported(self.completed_totals(tasks))
+            bump_users(self.member_ids)
+        self.created += len(tasks)
+        self.assigned.update(task.developer_id for task in tasks if task.developer_id is not None)
+
+    def completed_totals(self, tasks):
+        totals = {}
+        for task in tasks:
+            if task.developer_id is None or task.status != 'completed':
+                continue
+            count, delivery_time, allocated_time = totals.get(task.developer_id, (0, None, None))
+            delivery_time = (delivery_time or timedelta(0)) + (task.end_time - task.start_time)
+            if task.manager_start_time and task.manager_end_time:
+                allocated_time = (allocated_time or timedelta(0)) + (task.manager_end_time - task.manager_start_time)
+            totals[task.developer_id] = (count + 1, delivery_time, allocated_time)
+        return totals
+
+    def finish(self):
+        """
+        Send one notification per developer for everything imported.
+        """
+        with transaction.atomic():
+            for developer_id, count in self.assigned.items():
+                notify(developer_id, f'{count} imported tasks in "{self.project.name}" have been assigned to you.')
+
+    def report(self, dry_run):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'valid': self.valid,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'errors_truncated': self.error_count > len(self.errors),
+            'dry_run': dry_run,
+        }
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .jobs import run_requirements_job
+
+
+@shared_task
+def generate_requirements_task(job_id):
+    run_requirements_job(job_id)
@@ -1,3 +1,1355 @@
-from django.test import TestCase
+import asyncio
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from asgiref.sync import async_to_sync
+from channels.exceptions import ChannelFull
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings as django_settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, router, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.authentication import JWTAuthMiddleware, token_cache
+from SW_Project_Management.request_metrics import clear_metrics
+from SW_Project_Management.sqlite_profile import write_queue
+from accounts.models import CustomUser
+from developer.models import ToDo
+from .channel_layers import SQLiteChannelLayer
+from .ai_service import evaluate_risk_levels, generate_requirements, risk_model, risk_model_version
+from .jobs import ThreadPoolJobBackend, run_pending_jobs, run_requirements_job
+from .model_registry import ModelRegistry
+from .models import Project, Task, DeveloperMetrics, Notification, NotificationOutbox, RequirementsJob
+from .notifications import dispatcher, notify
+from .search import rebuild_index
+from .task_import import ImportFormatError, iter_lines
+from .risk_cache import RiskEvaluationCache, get_risk_cache
+from .risk_scoring import NUMERIC_RISK_FIELDS, RISK_VOCABULARIES, encoder as risk_encoder
+from .response_cache import get_cache as get_response_cache
+from .routing import websocket_urlpatterns
+
+
+class DeveloperMetricsViewTests(TestCase):
+    def setUp(self):
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.project = Project.objects.create(name='Project', scope='Scope', manager=self.manager)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+
+    def add_developers(self, count):
+        now = timezone.now()
+        for _ in range(count):
+            index = CustomUser.objects.count()
+            developer = CustomUser.objects.create(email=f'dev{index}@example.com', username=f'dev{index}', is_active=True)
+            self.project.developers.add(developer)
+            Task.objects.create(
+                project=self.project, developer=developer, title='Done', status='completed',
+                start_time=now - timedelta(hours=2), end_time=now,
+                manager_start_time=now - timedelta(hours=3), manager_end_time=now,
+            )
+            Task.objects.create(project=self.project, developer=developer, title='Open', status='not_started')
+
+    def fetch_metrics(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/developer/metrics/')
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(queries)
+
+    def test_query_count_does_not_grow_with_developers(self):
+        self.add_developers(2)
+        data, small_count = self.fetch_metrics()
+        self.assertEqual(len(data), 2)
+
+        self.add_developers(20)
+        data, large_count = self.fetch_metrics()
+        self.assertEqual(len(data), 22)
+        self.assertEqual(small_count, large_count)
+
+    def test_metrics_values(self):
+        self.add_developers(1)
+        developer = CustomUser.objects.get(email='dev1@example.com')
+        DeveloperMetrics.objects.create(developer=developer, tasks_reassigned=1)
+
+        data, _ = self.fetch_metrics()
+
+        self.assertEqual(data, [{
+            'developer': 'dev1',
+            'tasks_completed': 1,
+            'average_completion_time': '2 hours, 0 minutes',
+            'tasks_reassigned': 1,
+            'average_delivery_status': 'early',
+            'rating': 4.0,
+        }])
+
+
+class RebuildDeveloperMetricsCommandTests(TestCase):
+    def test_rebuilds_from_task_history(self):
+        manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        project = Project.objects.create(name='Project', scope='Scope', manager=manager)
+        now = timezone.now()
+        developers = []
+        for index in range(3):
+            developer = CustomUser.objects.create(email=f'dev{index}@example.com', username=f'dev{index}', is_active=True)
+            developers.append(developer)
+            for _ in range(index):
+                Task.objects.create(
+                    project=project, developer=developer, title='Done', status='completed',
+                    start_time=now - timedelta(hours=1), end_time=now,
+                    manager_start_time=now - timedelta(hours=2), manager_end_time=now,
+                )
+        DeveloperMetrics.objects.create(developer=developers[0], tasks_completed=7, tasks_reassigned=2)
+
+        call_command('rebuild_developer_metrics', batch_size=2, stdout=StringIO())
+
+        stale = DeveloperMetrics.objects.get(developer=developers[0])
+        self.assertEqual(stale.tasks_completed, 0)
+        self.assertEqual(stale.tasks_reassigned, 2)
+        rebuilt = DeveloperMetrics.objects.get(developer=developers[2])
+        self.assertEqual(rebuilt.tasks_completed, 2)
+        self.assertEqual(rebuilt.total_delivery_time, timedelta(hours=2))
+        self.assertEqual(rebuilt.total_allocated_time, timedelta(hours=4))
+        self.assertEqual(rebuilt.average_completion_time, timedelta(hours=1))
+
+
+class SeedLoadTestCommandTests(TestCase):
+    def seed(self, *args):
+        call_command(
+            'seed_load_test', '--managers', '2', '--projects-per-manager', '3', '--developers', '10',
+            '--developers-per-project', '4', '--tasks-per-project', '40', '--todos-per-developer', '3', *args,
+            stdout=StringIO(),
+        )
+
+    def test_seeds_loginable_accounts_and_consistent_tasks(self):
+        self.seed()
+
+        self.assertEqual(CustomUser.objects.filter(admin_role=True).count(), 2)
+        self.assertEqual(Project.objects.count(), 6)
+        self.assertEqual(Task.objects.count(), 240)
+        developer = CustomUser.objects.get(email='load-developer-0@example.com')
+        self.assertTrue(developer.check_password('load-test-password'))
+        self.assertLess(Project.objects.order_by('created_at').first().created_at, timezone.now() - timedelta(days=1))
+
+        completed = Task.objects.filter(status='completed')
+        self.assertTrue(completed.exists())
+        for task in completed:
+            self.assertLessEqual(task.start_time, task.end_time)
+            self.assertEqual(task.actual_time_spent, task.end_time - task.start_time)
+        self.assertFalse(Task.objects.filter(developer__isnull=True).exclude(status='not_started').exists())
+        self.assertEqual(
+            sum(DeveloperMetrics.objects.values_list('tasks_completed', flat=True)),
+            completed.count(),
+        )
+
+    def test_refuses_to_seed_twice_without_flush(self):
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.seed('--flush')
+        self.assertEqual(Project.objects.count(), 6)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.project = Project.objects.create(name='Project', scope='Scope', manager=self.manager)
+        Task.objects.bulk_create(Task(project=self.project, title=f'Task {i}') for i in range(25))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+        self.url = f'/api/projects/{self.project.id}/tasks/'
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 25)
+
+    def test_walks_pages_with_cursor(self):
+        titles = []
+        url = f'{self.url}?page_size=10'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            for query in queries:
+                self.assertNotIn('COUNT(', query['sql'].upper())
+                self.assertNotIn('OFFSET', query['sql'].upper())
+            titles.extend(task['title'] for task in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(titles, [f'Task {i}' for i in range(25)])
+
+
+class EditAndSaveRequirementsTests(TestCase):
+    def setUp(self):
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.developer = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        self.project = Project.objects.create(name='Project', scope='Scope', manager=self.manager)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+        self.url = f'/api/projects/{self.project.id}/edit-requirements/'
+
+    def edit(self, requirements):
+        response = self.client.post(self.url, {'functional_requirements': requirements, 'non_functional_requirements': []}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_preserves_assigned_and_matching_tasks(self):
+        kept = Task.objects.create(project=self.project, title='Login')
+        assigned = Task.objects.create(project=self.project, title='Checkout', developer=self.developer, status='in_progress')
+        reused = Task.objects.create(project=self.project, title='Search')
+
+        self.edit(['Login', 'Search v2', 'Reports'])
+
+        tasks = {task.id: task for task in Task.objects.filter(project=self.project)}
+        self.assertEqual(tasks[kept.id].title, 'Login')
+        self.assertEqual(tasks[assigned.id].developer, self.developer)
+        self.assertEqual(tasks[reused.id].title, 'Search v2')
+        self.assertEqual(sorted(task.title for task in tasks.values()), ['Checkout', 'Login', 'Reports', 'Search v2'])
+
+    def test_large_edit_uses_constant_queries(self):
+        self.edit([f'Requirement {i}' for i in range(250)])
+        requirements = [f'Requirement {i}' for i in range(0, 250, 2)] + [f'New {i}' for i in range(375)]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.edit(requirements)
+
+        self.assertLess(len(queries), 15)
+        self.assertEqual(
+            sorted(Task.objects.filter(project=self.project).values_list('title', flat=True)),
+            sorted(requirements),
+        )
+
+
+    def accept(self, client=None):
+        return (client or self.client).post(f'/api/projects/{self.project.id}/accept-requirements/')
+
+    def test_accept_only_adds_missing_tasks(self):
+        self.project.functional_requirements = ['Login', 'Search']
+        self.project.save()
+        self.edit(['Login', 'Search v2'])
+
+        response = self.accept()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['deleted']), (1, 0))
+        self.assertEqual(
+            sorted(Task.objects.filter(project=self.project).values_list('title', flat=True)),
+            ['Login', 'Search', 'Search v2'],
+        )
+        self.assertEqual(self.accept().data['created'], 0)
+
+    def test_other_managers_cannot_change_tasks(self):
+        other = CustomUser.objects.create(email='other@example.com', username='other', admin_role=True, is_active=True)
+        client = APIClient()
+        client.force_authenticate(user=other)
+        task = Task.objects.create(project=self.project, title='Login')
+
+        self.assertEqual(self.accept(client).status_code, 404)
+        response = client.post(self.url, {'functional_requirements': [], 'non_functional_requirements': []}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Task.objects.filter(id=task.id).exists())
+
+
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        CustomUser.objects.create(id=7, email='dev@example.com', username='dev', is_active=True)
+        self.channel_layer = get_channel_layer()
+        async_to_sync(self.channel_layer.flush)()
+        async_to_sync(self.channel_layer.group_add)('notifications_7', 'test-channel')
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': True})
+    def test_dispatches_after_commit(self):
+        # The wakeup callback is captured, not run, so no dispatcher thread starts.
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                notify(7, 'Hello')
+        self.assertEqual(len(callbacks), 1)
+
+        self.assertEqual(dispatcher.drain(), 1)
+        message = async_to_sync(self.channel_layer.receive)('test-channel')
+        self.assertEqual(message['notification'], 'Hello')
+        self.assertEqual(message['id'], Notification.objects.get().id)
+
+        outbox = NotificationOutbox.objects.get()
+        self.assertIsNotNone(outbox.sent_at)
+        self.assertIsNotNone(outbox.delivery_time)
+        self.assertEqual(dispatcher.drain(), 0)
+
+    def test_rolled_back_write_is_not_queued(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    notify(7, 'Hello')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertFalse(Notification.objects.exists())
+
+    def test_failed_send_is_retried_later(self):
+        with self.captureOnCommitCallbacks():
+            notify(7, 'Hello')
+
+        with mock.patch.object(self.channel_layer, 'group_send', side_effect=ConnectionError('down')):
+            self.assertEqual(dispatcher.drain(), 1)
+
+        outbox = NotificationOutbox.objects.get()
+        self.assertIsNone(outbox.sent_at)
+        self.assertEqual(outbox.attempts, 1)
+        self.assertIn('down', outbox.last_error)
+        self.assertGreater(outbox.next_attempt_at, timezone.now())
+        self.assertEqual(dispatcher.drain(), 0)
+
+        NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(dispatcher.drain(), 1)
+        self.assertIsNotNone(NotificationOutbox.objects.get().sent_at)
+
+
+def _receive_in_worker(path, group, results):
+    async def run():
+        layer = SQLiteChannelLayer(path=path)
+        channel = await layer.new_channel()
+        await layer.group_add(group, channel)
+        results.put(('ready', channel))
+        message = await asyncio.wait_for(layer.receive(channel), timeout=10)
+        results.put(('received', message['notification']))
+
+    asyncio.run(run())
+
+
+class SQLiteChannelLayerTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'channels.sqlite3')
+
+    def test_group_send_reaches_every_worker_process(self):
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [context.Process(target=_receive_in_worker, args=(self.path, 'notifications_1', results)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        self.addCleanup(lambda: [worker.terminate() for worker in workers])
+
+        for _ in workers:
+            self.assertEqual(results.get(timeout=10)[0], 'ready')
+
+        layer = SQLiteChannelLayer(path=self.path)
+        async_to_sync(layer.group_send)('notifications_1', {'type': 'send_notification', 'notification': 'Hello'})
+
+        received = [results.get(timeout=10) for _ in workers]
+        self.assertEqual(received, [('received', 'Hello')] * 3)
+        for worker in workers:
+            worker.join(timeout=10)
+            self.assertEqual(worker.exitcode, 0)
+
+    def test_capacity_and_discard(self):
+        layer = SQLiteChannelLayer(path=self.path, capacity=1)
+        async_to_sync(layer.send)('tasks', {'type': 'a'})
+        with self.assertRaises(ChannelFull):
+            async_to_sync(layer.send)('tasks', {'type': 'b'})
+        self.assertEqual(async_to_sync(layer.receive)('tasks'), {'type': 'a'})
+
+        async_to_sync(layer.group_add)('group', 'tasks')
+        async_to_sync(layer.group_discard)('group', 'tasks')
+        async_to_sync(layer.group_send)('group', {'type': 'c'})
+        async_to_sync(layer.send)('tasks', {'type': 'd'})
+        self.assertEqual(async_to_sync(layer.receive)('tasks'), {'type': 'd'})
+
+
+class NotificationConsumerTests(TransactionTestCase):
+    def setUp(self):
+        self.developer = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        self.application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+        self.token = str(RefreshToken.for_user(self.developer).access_token)
+
+    def notify(self, message):
+        with transaction.atomic():
+            notify(self.developer.id, message)
+        return Notification.objects.latest('id')
+
+    async def connect(self, query='', token=None, subprotocols=None):
+        query = f'{query}&' if query else '?'
+        if subprotocols is None:
+            query += f'token={token or self.token}'
+        communicator = WebsocketCommunicator(
+            self.application, f'/ws/notifications/{self.developer.id}/{query}', subprotocols=subprotocols,
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': False})
+    def test_rejects_anonymous_and_other_users(self):
+        other = CustomUser.objects.create(email='other@example.com', username='other', is_active=True)
+        self.notify('private')
+
+        async def connected(query):
+            communicator = WebsocketCommunicator(self.application, f'/ws/notifications/{self.developer.id}/{query}')
+            accepted, _ = await communicator.connect()
+            await communicator.disconnect()
+            return accepted
+
+        other_token = RefreshToken.for_user(other).access_token
+        for query in ('?last_seen_id=0', f'?last_seen_id=0&token={other_token}', '?token=not-a-jwt'):
+            self.assertFalse(async_to_sync(connected)(query), query)
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': False})
+    def test_accepts_the_token_as_a_subprotocol(self):
+        async def run():
+            communicator = await self.connect(subprotocols=['bearer', self.token])
+            await communicator.disconnect()
+
+        async_to_sync(run)()
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': False})
+    def test_live_events_are_not_dropped_when_out_of_order(self):
+        async def run():
+            communicator = await self.connect()
+            layer = get_channel_layer()
+            group = f'notifications_{self.developer.id}'
+            for notification_id in (12, 11, 12):
+                await layer.group_send(group, {'type': 'send_notification', 'id': notification_id, 'notification': str(notification_id)})
+            frames = [await communicator.receive_json_from() for _ in range(3)]
+            await communicator.disconnect()
+            return frames
+
+        self.assertEqual([frame['id'] for frame in async_to_sync(run)()], [12, 11, 12])
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': False}, NOTIFICATIONS={'REPLAY_LIMIT': 2})
+    def test_truncated_replay_is_reported(self):
+        notifications = [self.notify(f'message {i}') for i in range(3)]
+
+        async def run():
+            communicator = await self.connect('?last_seen_id=0')
+            frames = [await communicator.receive_json_from() for _ in range(2)]
+            await communicator.disconnect()
+            return frames
+
+        replayed, truncated = async_to_sync(run)()
+        self.assertEqual([message['id'] for message in replayed['notifications']], [n.id for n in notifications[:2]])
+        self.assertEqual(truncated, {'replay_truncated': True, 'last_replayed_id': notifications[1].id})
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': False})
+    def test_replays_missed_notifications_on_reconnect(self):
+        seen = self.notify('first')
+        self.notify('second')
+        self.notify('third')
+
+        async def run():
+            communicator = await self.connect(f'?last_seen_id={seen.id}')
+            replayed = await communicator.receive_json_from()
+            self.assertTrue(await communicator.receive_nothing())
+            await communicator.disconnect()
+            return replayed
+
+        replayed = async_to_sync(run)()
+        self.assertEqual([message['notification'] for message in replayed['notifications']], ['second', 'third'])
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': False, 'COALESCE_MAX_BATCH': 3})
+    def test_bursts_are_coalesced_into_batched_frames(self):
+        for i in range(5):
+            self.notify(f'task {i}')
+
+        async def run():
+            communicator = await self.connect()
+            await database_sync_to_async(dispatcher.drain)()
+            frames = [await communicator.receive_json_from() for _ in range(2)]
+            self.assertTrue(await communicator.receive_nothing())
+            await communicator.disconnect()
+            return frames
+
+        frames = async_to_sync(run)()
+        self.assertEqual([len(frame['notifications']) for frame in frames], [3, 2])
+        self.assertEqual(
+            [notification['notification'] for frame in frames for notification in frame['notifications']],
+            [f'task {i}' for i in range(5)],
+        )
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': False}, NOTIFICATIONS={'ACK_FLUSH_INTERVAL': 60, 'ACK_BATCH_SIZE': 100})
+    def test_acknowledgements_are_written_in_one_batch(self):
+        notifications = [self.notify(f'message {i}') for i in range(3)]
+
+        async def run():
+            communicator = await self.connect()
+            for notification in notifications[:2]:
+                await communicator.send_json_to({'ack': [notification.id]})
+            await communicator.receive_nothing()
+            unread_before_flush = await database_sync_to_async(
+                Notification.objects.filter(read_at__isnull=True).count
+            )()
+            await communicator.disconnect()
+            return unread_before_flush
+
+        self.assertEqual(async_to_sync(run)(), 3)
+        self.assertEqual(Notification.objects.filter(read_at__isnull=True).count(), 1)
+
+        client = APIClient()
+        client.force_authenticate(user=self.developer)
+        response = client.get('/api/notifications/unread-count/')
+        self.assertEqual(response.data, {'unread_count': 1, 'latest_id': notifications[-1].id})
+
+
+class PurgeNotificationsCommandTests(TestCase):
+    def test_purges_old_notifications(self):
+        developer = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        old = Notification.objects.create(recipient=developer, message='old')
+        Notification.objects.filter(id=old.id).update(created_at=timezone.now() - timedelta(days=40))
+        Notification.objects.create(recipient=developer, message='new')
+
+        call_command('purge_notifications', days=30, stdout=StringIO())
+
+        self.assertEqual(list(Notification.objects.values_list('message', flat=True)), ['new'])
+
+    @override_settings(NOTIFICATION_OUTBOX={'MAX_ATTEMPTS': 3})
+    def test_purges_old_undeliverable_outbox_rows(self):
+        old = timezone.now() - timedelta(days=40)
+        rows = NotificationOutbox.objects.bulk_create([
+            NotificationOutbox(group='g', event={}, attempts=3),
+            NotificationOutbox(group='g', event={}, attempts=2),
+            NotificationOutbox(group='g', event={}, attempts=3),
+        ])
+        NotificationOutbox.objects.filter(id__in=[rows[0].id, rows[1].id]).update(created_at=old)
+        stdout = StringIO()
+
+        call_command('purge_notifications', days=30, stdout=stdout)
+
+        # Still being retried, or dead but within the retention window.
+        self.assertEqual(sorted(NotificationOutbox.objects.values_list('id', flat=True)), [rows[1].id, rows[2].id])
+        self.assertIn('1 undeliverable', stdout.getvalue())
+
+
+class VersionedResponseCacheTests(TestCase):
+    def setUp(self):
+        get_response_cache().clear()
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.developer = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project = Project.objects.create(name='Project', scope='Scope', manager=self.manager)
+        self.manager_client = APIClient()
+        self.manager_client.force_authenticate(user=self.manager)
+        self.developer_client = APIClient()
+        self.developer_client.force_authenticate(user=self.developer)
+
+    def get(self, client, url):
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_hits_until_project_changes(self):
+        self.assertEqual(self.get(self.manager_client, '/api/view_projects/')['X-Cache'], 'MISS')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(self.manager_client, '/api/view_projects/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(len(queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.filter(id=self.project.id).get().save()
+        self.assertEqual(self.get(self.manager_client, '/api/view_projects/')['X-Cache'], 'MISS')
+
+    def test_membership_change_invalidates_developer_views(self):
+        self.assertEqual(self.get(self.developer_client, '/api/projects/').data, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.developers.add(self.developer)
+        response = self.get(self.developer_client, '/api/projects/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([project['name'] for project in response.data], ['Project'])
+
+    def test_task_reassignment_invalidates_both_developers(self):
+        other = CustomUser.objects.create(email='other@example.com', username='other', is_active=True)
+        other_client = APIClient()
+        other_client.force_authenticate(user=other)
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(project=self.project, title='Task', developer=self.developer)
+        self.assertEqual(len(self.get(self.developer_client, '/api/tasks/').data), 1)
+        self.assertEqual(len(self.get(other_client, '/api/tasks/').data), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.get(id=task.id)
+            task.developer = other
+            task.save()
+
+        self.assertEqual(len(self.get(self.developer_client, '/api/tasks/').data), 0)
+        self.assertEqual(len(self.get(other_client, '/api/tasks/').data), 1)
+
+    def test_user_email_change_invalidates_project_members(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.developers.add(self.developer)
+        self.get(self.manager_client, '/api/view_projects/')
+        self.assertEqual(self.get(self.manager_client, '/api/view_projects/')['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            developer = CustomUser.objects.get(id=self.developer.id)
+            developer.email = 'renamed@example.com'
+            developer.save()
+        self.assertEqual(self.get(self.manager_client, '/api/view_projects/')['X-Cache'], 'MISS')
+
+    def test_local_memory_entries_are_short_lived(self):
+        cache = get_response_cache()
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.get(self.manager_client, '/api/view_projects/')
+        self.assertEqual(cache_set.call_args.kwargs['timeout'], 5)
+
+
+class ProjectTimelineViewTests(TestCase):
+    def setUp(self):
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.developer = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        self.project = Project.objects.create(name='Project', scope='Scope', manager=self.manager)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+        self.now = timezone.now()
+
+    def add_task(self, title, start_days, end_days, **fields):
+        return Task.objects.create(
+            project=self.project, title=title, developer=self.developer,
+            manager_start_time=self.now + timedelta(days=start_days),
+            manager_end_time=self.now + timedelta(days=end_days),
+            **fields,
+        )
+
+    def fetch(self, query=''):
+        response = self.client.get(f'/api/projects/{self.project.id}/timeline/{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_annotates_task_bars_in_the_database(self):
+        self.add_task('Halfway', -5, 5, status='in_progress', start_time=self.now - timedelta(days=5))
+        self.add_task('Late', -10, -2)
+        self.add_task('Done', -4, -1, status='completed', start_time=self.now - timedelta(days=4), end_time=self.now - timedelta(days=2))
+
+        tasks = {task['title']: task for task in self.fetch()['tasks']}
+
+        self.assertEqual(tasks['Halfway']['timeline_status'], 'In Progress')
+        self.assertEqual(tasks['Halfway']['percentage_elapsed'], 50)
+        self.assertEqual(tasks['Halfway']['remaining_days'], 4)
+        self.assertEqual(tasks['Halfway']['developer'], 'dev@example.com')
+        self.assertEqual(tasks['Late']['timeline_status'], 'Overdue')
+        self.assertEqual(tasks['Late']['remaining_days'], 0)
+        self.assertEqual(tasks['Late']['percentage_elapsed'], 100)
+        self.assertEqual(tasks['Done']['timeline_status'], 'Completed')
+
+    def test_filters_to_requested_window(self):
+        self.add_task('Past', -30, -20)
+        self.add_task('Current', -1, 1)
+        self.add_task('Future', 20, 30)
+
+        start = (self.now - timedelta(days=2)).date().isoformat()
+        end = (self.now + timedelta(days=2)).date().isoformat()
+        data = self.fetch(f'?start={start}&end={end}')
+
+        self.assertEqual([task['title'] for task in data['tasks']], ['Current'])
+
+    def test_rejects_invalid_dates(self):
+        response = self.client.get(f'/api/projects/{self.project.id}/timeline/?start=tomorrow')
+        self.assertEqual(response.status_code, 400)
+
+
+class RequirementsJobTests(TestCase):
+    def setUp(self):
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+
+    def create_project(self):
+        deadline = (timezone.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post('/api/create_project/', {'name': 'Shop', 'scope': 'Orders', 'deadline': deadline, 'developers': []}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['requirements_job'], callbacks
+
+    def test_create_returns_pending_job_without_generating(self):
+        with mock.patch('manager.ai_service.generate_requirements') as generate:
+            job, callbacks = self.create_project()
+        generate.assert_not_called()
+        self.assertEqual(job['status'], 'pending')
+
+        with mock.patch('manager.jobs.get_backend') as get_backend:
+            for callback in callbacks:
+                callback()
+        get_backend.return_value.submit.assert_called_once_with(job['id'])
+
+        response = self.client.get(f"/api/requirements-jobs/{job['id']}/")
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertIsNone(response.data['functional_requirements'])
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': False})
+    def test_job_stores_requirements_and_notifies_manager(self):
+        job, _ = self.create_project()
+
+        run_requirements_job(job['id'])
+        run_requirements_job(job['id'])
+
+        project = Project.objects.get(id=job['project'])
+        self.assertEqual(project.non_functional_requirements, generate_requirements(project.scope)[1])
+        response = self.client.get(f"/api/requirements-jobs/{job['id']}/")
+        self.assertEqual(response.data['status'], 'succeeded')
+        self.assertEqual(response.data['non_functional_requirements'], project.non_functional_requirements)
+        self.assertEqual(Notification.objects.filter(recipient=self.manager).count(), 1)
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': False})
+    def test_failed_generation_is_recorded(self):
+        job, _ = self.create_project()
+
+        with mock.patch('manager.ai_service.generate_requirements', side_effect=RuntimeError('model offline')):
+            run_requirements_job(job['id'])
+
+        failed = RequirementsJob.objects.get(id=job['id'])
+        self.assertEqual(failed.status, 'failed')
+        self.assertIn('model offline', failed.error)
+        self.assertIn('failed', Notification.objects.get(recipient=self.manager).message)
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': False})
+    def test_accept_waits_for_a_successful_job(self):
+        job, _ = self.create_project()
+        Task.objects.create(project_id=job['project'], title='Written by hand')
+        url = f"/api/projects/{job['project']}/accept-requirements/"
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['requirements_job']['status'], 'pending')
+
+        RequirementsJob.objects.filter(id=job['id']).update(status='failed')
+        self.assertEqual(self.client.post(url).status_code, 409)
+
+        RequirementsJob.objects.filter(id=job['id']).update(status='pending')
+        run_requirements_job(job['id'])
+        self.assertEqual(self.client.post(url).status_code, 200)
+        self.assertTrue(Task.objects.filter(title='Written by hand').exists())
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': False}, REQUIREMENTS_JOBS={'CLAIM_TIMEOUT': 60})
+    def test_abandoned_running_jobs_are_claimed_again(self):
+        job, _ = self.create_project()
+        RequirementsJob.objects.filter(id=job['id']).update(status='running', started_at=timezone.now())
+        self.assertEqual(run_pending_jobs(), 0)
+
+        RequirementsJob.objects.filter(id=job['id']).update(started_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(run_pending_jobs(), 1)
+        self.assertEqual(RequirementsJob.objects.get(id=job['id']).status, 'succeeded')
+
+    def test_thread_pool_backend_reruns_leftover_jobs(self):
+        with mock.patch('manager.jobs.run_pending_jobs') as run_pending:
+            with override_settings(REQUIREMENTS_JOBS={'RECOVER': True}):
+                ThreadPoolJobBackend().executor.shutdown(wait=True)
+            with override_settings(REQUIREMENTS_JOBS={'RECOVER': False}):
+                ThreadPoolJobBackend().executor.shutdown(wait=True)
+        run_pending.assert_called_once_with()
+
+
+RISK_ROW = {
+    'project_category': 'Web Application',
+    'requirement_category': 'Functional',
+    'risk_target_category': 'Schedule',
+    'probability': 0.4,
+    'magnitude_of_risk': 'High',
+    'impact': 'Moderate',
+    'dimension_of_risk': 'Requirements',
+    'affecting_no_of_modules': 3,
+    'fixing_duration_days': 10,
+    'fix_cost_percent': 5.5,
+    'priority': 0.8,
+}
+
+
+class RiskScoringTests(TestCase):
+    def setUp(self):
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.project = Project.objects.create(
+            name='Project', scope='Scope', manager=self.manager,
+            functional_requirements='Process orders.', non_functional_requirements=['Fast'],
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+        get_risk_cache().clear()
+
+    def test_encoder_builds_one_hot_matrix(self):
+        rows = [RISK_ROW, dict(RISK_ROW, impact='unheard of', probability='0.9')]
+        matrix = risk_encoder.encode(rows)
+
+        self.assertEqual(matrix.shape, (2, risk_encoder.width))
+        numeric_width = len(NUMERIC_RISK_FIELDS)
+        self.assertEqual(matrix[:, numeric_width:].sum(axis=1).tolist(), [len(RISK_VOCABULARIES)] * 2)
+        impact_offset = risk_encoder.offsets['impact']
+        self.assertEqual(matrix[1, impact_offset], 1.0)  # unknown bucket
+        self.assertAlmostEqual(float(matrix[1, 0]), 0.9, places=5)
+
+    def test_batch_matches_single_row_path(self):
+        single = self.client.post(f'/api/evaluate-risk/{self.project.id}/', RISK_ROW, format='json')
+        batch = self.client.post(f'/api/evaluate-risk/{self.project.id}/batch/', {'rows': [RISK_ROW] * 5}, format='json')
+
+        self.assertEqual(single.status_code, 200)
+        self.assertEqual(batch.status_code, 200)
+        self.assertEqual(batch.data['risk_levels'], [single.data['risk_level']] * 5)
+
+    def test_batch_reports_invalid_rows(self):
+        rows = [RISK_ROW, dict(RISK_ROW, priority=None), dict(RISK_ROW, probability='likely')]
+        response = self.client.post(f'/api/evaluate-risk/{self.project.id}/batch/', {'rows': rows}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(response.data['rows']), [1, 2])
+
+
+class RiskCacheTests(TestCase):
+    def setUp(self):
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.project = Project.objects.create(
+            name='Project', scope='Scope', manager=self.manager,
+            functional_requirements=['Process orders.'], non_functional_requirements=['Fast'],
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+        get_risk_cache().clear()
+        self.url = f'/api/evaluate-risk/{self.project.id}/'
+
+    def test_repeat_evaluation_is_served_from_cache(self):
+        with mock.patch('manager.views.evaluate_risk_level', return_value=4) as evaluate:
+            first = self.client.post(self.url, RISK_ROW, format='json')
+            # Same input up to case and number formatting
+            second = self.client.post(self.url, dict(RISK_ROW, impact=RISK_ROW['impact'].upper(), priority=str(RISK_ROW['priority'])), format='json')
+
+        self.assertEqual((first.data['cache'], second.data['cache']), ('miss', 'hit'))
+        self.assertEqual(second.data['risk_level'], 4)
+        evaluate.assert_called_once()
+
+    def test_editing_requirements_invalidates_entries(self):
+        self.client.post(self.url, RISK_ROW, format='json')
+        self.assertEqual(get_risk_cache().snapshot()['entries'], 1)
+
+        response = self.client.post(f'/api/projects/{self.project.id}/edit-requirements/', {
+            'functional_requirements': ['Process orders.', 'Refund orders.'],
+            'non_functional_requirements': ['Fast'],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_risk_cache().snapshot()['entries'], 0)
+
+        self.assertEqual(self.client.post(self.url, RISK_ROW, format='json').data['cache'], 'miss')
+
+    def test_batch_only_scores_uncached_rows(self):
+        self.client.post(self.url, RISK_ROW, format='json')
+        other = dict(RISK_ROW, impact='high')
+
+        with mock.patch('manager.views.evaluate_risk_levels', wraps=evaluate_risk_levels) as evaluate:
+            response = self.client.post(f'{self.url}batch/', {'rows': [RISK_ROW, other, other]}, format='json')
+
+        self.assertEqual(response.data['cache'], {'hits': 1, 'misses': 2})
+        self.assertEqual(len(evaluate.call_args.args[1]), 2)
+        stats = self.client.get('/api/evaluate-risk/cache/stats/').data
+        self.assertEqual((stats['hits'], stats['entries']), (1, 2))
+
+    def test_reusing_a_key_moves_it_to_the_new_project(self):
+        cache = RiskEvaluationCache(max_entries=10, timeout=60)
+        cache.set('a', 1, project_id=1)
+        cache.set('a', 2, project_id=2)
+
+        cache.invalidate_project(1)
+        self.assertEqual(cache.get('a'), 2)
+        cache.invalidate_project(2)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache._project_keys, {})
+
+    def test_lru_eviction_and_ttl(self):
+        cache = RiskEvaluationCache(max_entries=2, timeout=60)
+        cache.set('a', 1, project_id=1)
+        cache.set('b', 2, project_id=1)
+        cache.get('a')
+        cache.set('c', 3, project_id=2)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.evictions, 1)
+
+        with mock.patch('manager.risk_cache.time.monotonic', return_value=10 ** 9):
+            self.assertIsNone(cache.get('c'))
+
+
+class ModelRegistryTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        self.registry = ModelRegistry(self.root, reload_interval=0)
+        patcher = mock.patch('manager.ai_service.get_model_registry', return_value=self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def publish_risk_model(self, version, level):
+        path = os.path.join(self.root, 'risk', version)
+        os.makedirs(path)
+        weights = np.zeros((risk_encoder.width, 5), dtype=np.float32)
+        bias = np.zeros(5, dtype=np.float32)
+        bias[level - 1] = 1.0
+        np.save(os.path.join(path, 'weights.npy'), weights)
+        np.save(os.path.join(path, 'bias.npy'), bias)
+        with open(os.path.join(self.root, 'risk', 'CURRENT.tmp'), 'w') as current:
+            current.write(version)
+        os.replace(os.path.join(self.root, 'risk', 'CURRENT.tmp'), os.path.join(self.root, 'risk', 'CURRENT'))
+
+    def test_unpublished_model_falls_back_to_placeholder(self):
+        self.assertIsNone(self.registry.get('risk'))
+        self.assertEqual(evaluate_risk_levels(['Fast'], [RISK_ROW]).tolist(), [3])
+
+    def test_loads_memory_mapped_artifacts_and_hot_reloads(self):
+        self.publish_risk_model('v1', level=2)
+        self.assertEqual(evaluate_risk_levels(['Fast'], [RISK_ROW] * 2).tolist(), [2, 2])
+        model = self.registry.get('risk')
+        self.assertIsInstance(model['weights'], np.memmap)
+
+        self.publish_risk_model('v2', level=5)
+        self.assertEqual(evaluate_risk_levels(['Fast'], [RISK_ROW]).tolist(), [5])
+
+        [stats] = self.registry.stats()
+        self.assertEqual((stats['name'], stats['version']), ('risk', 'v2'))
+        self.assertEqual(stats['artifacts'], ['bias', 'weights'])
+        self.assertGreaterEqual(stats['load_seconds'], 0)
+        self.assertIn('resident_bytes', stats)
+
+    def test_version_and_scores_come_from_the_same_model(self):
+        self.publish_risk_model('v1', level=2)
+        model = risk_model()
+        self.publish_risk_model('v2', level=5)
+
+        self.assertEqual(risk_model_version(model), 'v1')
+        self.assertEqual(evaluate_risk_levels(['Fast'], [RISK_ROW], model).tolist(), [2])
+        self.assertEqual(evaluate_risk_levels(['Fast'], [RISK_ROW]).tolist(), [5])
+
+    def test_unreadable_version_keeps_serving_previous_one(self):
+        self.publish_risk_model('v1', level=2)
+        self.registry.get('risk')
+        os.makedirs(os.path.join(self.root, 'risk', 'broken'))
+        with open(os.path.join(self.root, 'risk', 'broken', 'weights.npy'), 'w') as artifact:
+            artifact.write('not an array')
+        with open(os.path.join(self.root, 'risk', 'CURRENT'), 'w') as current:
+            current.write('broken')
+
+        with self.assertLogs('manager.model_registry', level='ERROR'):
+            self.assertEqual(self.registry.get('risk').version, 'v1')
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.developer = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        self.outsider = CustomUser.objects.create(email='out@example.com', username='out', admin_role=True, is_active=True)
+        self.project = Project.objects.create(
+            name='Billing portal', scope='Invoices for customers', manager=self.manager,
+            functional_requirements=['Export invoices as PDF'], non_functional_requirements=['Fast'],
+        )
+        self.project.developers.add(self.developer)
+        self.other = Project.objects.create(name='Invoice archive', scope='Old invoices', manager=self.outsider)
+        self.task = Task.objects.create(project=self.project, title='Render invoice template', description='Use the PDF library')
+        self.client = APIClient()
+
+    def search(self, user, query, **params):
+        self.client.force_authenticate(user=user)
+        response = self.client.get('/api/search/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(result['type'], result['id']) for result in response.data['results']]
+
+    def test_results_are_ranked_and_scoped_to_member_projects(self):
+        results = self.search(self.developer, 'invoice')
+
+        # Title matches outrank body matches; the outsider's project never shows up.
+        self.assertEqual(results, [('task', self.task.id), ('project', self.project.id)])
+        self.assertEqual(self.search(self.outsider, 'invoice'), [('project', self.other.id)])
+
+        with mock.patch('manager.search.MAX_SCOPE_TOKENS', 0):
+            self.assertEqual(self.search(self.developer, 'invoice'), results)
+
+    def test_index_follows_writes_including_bulk_ones(self):
+        self.project.edited_functional_requirements = ['Send reminder emails']
+        self.project.save()
+        Task.objects.bulk_create([Task(project=self.project, title='Schedule reminders')])
+        Task.objects.filter(id=self.task.id).update(title='Draw charts')
+
+        self.assertEqual(len(self.search(self.manager, 'remind')), 2)
+        self.assertEqual(self.search(self.manager, 'template'), [])
+
+        self.task.delete()
+        self.assertEqual(self.search(self.manager, 'charts'), [])
+
+    def test_todos_are_private_to_their_developer(self):
+        todo = ToDo.objects.create(title='Review invoice totals', developer=self.developer)
+
+        self.assertIn(('todo', todo.id), self.search(self.developer, 'totals'))
+        self.assertEqual(self.search(self.manager, 'totals'), [])
+        self.assertEqual(self.search(self.developer, 'invoice', type='todo'), [('todo', todo.id)])
+
+    def test_query_syntax_is_not_passed_through(self):
+        self.assertEqual(self.search(self.manager, '"invoice*'), [('task', self.task.id), ('project', self.project.id)])
+        # Operators are ordinary words, so every one of them has to match.
+        self.assertEqual(self.search(self.manager, 'invoice OR (NEAR'), [])
+
+    def test_rebuild_restores_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM manager_searchindex')
+        self.assertEqual(rebuild_index(), 3)
+        self.assertEqual(len(self.search(self.manager, 'invoice')), 2)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Runs against a second SQLite file that only changes when
+    replicate_sqlite copies the primary over it.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        connections.settings['replica_test'] = {
+            **connections.settings['default'],
+            'NAME': os.path.join(self.directory.name, 'replica.sqlite3'),
+        }
+        self.addCleanup(connections.settings.pop, 'replica_test')
+        self.addCleanup(connections.__delitem__, 'replica_test')
+        self.addCleanup(lambda: connections['replica_test'].close())
+        overrides = override_settings(
+            CACHES={**django_settings.CACHES, 'replica_pins': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': os.path.join(self.directory.name, 'pins'),
+            }},
+            DATABASE_REPLICAS={'ALIASES': ['replica_test'], 'STICKY_SECONDS': 10, 'CACHE_ALIAS': 'replica_pins'},
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        get_response_cache().clear()
+        token_cache.clear()
+
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.project = Project.objects.create(
+            name='Launch', scope='Scope', manager=self.manager, deadline=timezone.now() + timedelta(days=10),
+        )
+        call_command('replicate_sqlite', '--once', stdout=StringIO())
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+    def gantt_names(self, client):
+        response = client.get('/api/project-gantt-chart/')
+        self.assertEqual(response.status_code, 200)
+        return [project['name'] for project in response.data]
+
+    def test_get_requests_read_from_the_replica(self):
+        Project.objects.create(name='Unreplicated', scope='Scope', manager=self.manager)
+        client = self.client_for(self.manager)
+
+        self.assertEqual(self.gantt_names(client), ['Launch'])
+        call_command('replicate_sqlite', '--once', stdout=StringIO())
+        get_response_cache().clear()
+        self.assertEqual(sorted(self.gantt_names(client)), ['Launch', 'Unreplicated'])
+
+    def test_writer_reads_its_own_writes_until_the_pin_expires(self):
+        writer, other = self.client_for(self.manager), self.client_for(self.manager)
+        response = writer.patch(f'/api/projects/{self.project.id}/update/', {'name': 'Relaunch'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.gantt_names(writer), ['Relaunch'])
+        # Another session of the same user has not written, so it may lag.
+        self.assertEqual(Project.objects.using('replica_test').get().name, 'Launch')
+        get_response_cache().clear()
+        self.assertEqual(self.gantt_names(other), ['Launch'])
+
+        get_response_cache().clear()
+        with mock.patch('SW_Project_Management.db_routing.time.time', return_value=time.time() + 11):
+            self.assertEqual(self.gantt_names(writer), ['Launch'])
+
+    @override_settings(RESPONSE_CACHE={'LOCAL_TIMEOUT': 3600})
+    def test_replica_responses_are_cached_only_for_the_lag_allowance(self):
+        client = self.client_for(self.manager)
+        with mock.patch.object(get_response_cache(), 'set', wraps=get_response_cache().set) as cache_set:
+            self.gantt_names(client)
+        self.assertEqual(cache_set.call_args.kwargs['timeout'], 10)
+
+    def test_local_memory_pin_cache_is_refused(self):
+        with override_settings(DATABASE_REPLICAS={'ALIASES': ['replica_test'], 'CACHE_ALIAS': 'default'}):
+            with self.assertRaises(ImproperlyConfigured):
+                self.client_for(self.manager).get('/api/project-gantt-chart/')
+
+    def test_writes_and_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(router.db_for_read(Project), 'default')
+        self.assertEqual(router.db_for_write(Project), 'default')
+        self.assertFalse(router.allow_migrate('replica_test', 'manager'))
+
+
+class SQLiteProfileTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'profile.sqlite3')
+        connections.settings['profile_test'] = {**connections.settings['default'], 'NAME': self.path}
+        self.addCleanup(connections.settings.pop, 'profile_test')
+        self.addCleanup(connections.__delitem__, 'profile_test')
+        self.addCleanup(lambda: connections['profile_test'].close())
+
+    def pragma(self, name, using='profile_test'):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied_to_new_connections(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('cache_size'), -65536)
+        self.assertEqual(self.pragma('busy_timeout', using='default'), 5000)
+
+    @override_settings(SQLITE_PROFILE={'JOURNAL_MODE': 'WAL', 'TRANSACTION_MODE': 'IMMEDIATE', 'WRITE_QUEUE': True})
+    def test_transactions_take_the_write_lock_when_they_begin(self):
+        with connections['profile_test'].cursor() as cursor:
+            cursor.execute('CREATE TABLE counter (value INTEGER)')
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        self.addCleanup(other.close)
+
+        with transaction.atomic(using='profile_test'):
+            self.assertTrue(write_queue._lock.locked())
+            with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+                other.execute('BEGIN IMMEDIATE')
+            # Readers are not held up by the writer.
+            self.assertEqual(other.execute('SELECT count(*) FROM counter').fetchone()[0], 0)
+        self.assertFalse(write_queue._lock.locked())
+
+        with self.assertRaises(ValueError), transaction.atomic(using='profile_test'):
+            raise ValueError
+        self.assertFalse(write_queue._lock.locked())
+
+
+@override_settings(REQUEST_METRICS={'SERVER_TIMING': True, 'TOKEN': 'scrape-secret'})
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        clear_metrics()
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.project = Project.objects.create(name='Project', scope='Scope', manager=self.manager)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+
+    def metrics(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_sql_and_python_time_per_route(self):
+        response = self.client.get('/api/developer/metrics/')
+        # The view runs one grouped query.
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+, sql;dur=[\d.]+;desc="1 queries", app;dur=[\d.]+$')
+
+        body = self.metrics()
+        labels = '{view="manager:developer-metrics",method="GET"'
+        self.assertIn(f'http_responses_total{labels},status="200"}} 1', body)
+        self.assertIn(f'http_request_queries_sum{labels}}} 1.0', body)
+        self.assertIn(f'http_request_duration_seconds_bucket{labels},le="+Inf"}} 1', body)
+        self.assertIn(f'http_request_sql_duration_seconds_count{labels}}} 1', body)
+        self.assertIn(f'http_response_size_bytes_sum{labels}}} {float(len(response.content))}', body)
+
+    @override_settings(REQUEST_METRICS={'SAMPLE_RATE': 0, 'SERVER_TIMING': True, 'TOKEN': 'scrape-secret'})
+    def test_unsampled_requests_skip_sql_timing(self):
+        response = self.client.get('/api/developer/metrics/')
+        self.assertNotIn('sql;', response['Server-Timing'])
+        body = self.metrics()
+        self.assertIn('http_request_duration_seconds_count{view="manager:developer-metrics",method="GET"} 1', body)
+        self.assertNotIn('http_request_queries_count{view="manager:developer-metrics"', body)
+
+    def test_unknown_urls_share_one_label(self):
+        self.client.get('/api/no-such-page/')
+        self.client.get('/api/another-missing-page/')
+        self.assertIn('http_responses_total{view="unmatched",method="GET",status="404"} 2', self.metrics())
+
+    def test_token_protects_the_endpoint(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', self.metrics())
+
+    @override_settings(REQUEST_METRICS={})
+    def test_without_a_token_only_staff_can_read_metrics(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+        self.client.force_login(CustomUser.objects.create(email='staff@example.com', username='staff', is_staff=True, is_active=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(REQUEST_METRICS={})
+    def test_server_timing_follows_debug_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/developer/metrics/'))
+        with override_settings(DEBUG=True):
+            self.assertIn('Server-Timing', self.client.get('/api/developer/metrics/'))
+
+
+@override_settings(TASK_IMPORT={'CHUNK_SIZE': 2})
+class ImportTasksTests(TestCase):
+    def setUp(self):
+        self.manager = CustomUser.objects.create(email='manager@example.com', username='manager', admin_role=True, is_active=True)
+        self.developer = CustomUser.objects.create(email='dev@example.com', username='dev', is_active=True)
+        self.project = Project.objects.create(name='Migration', scope='Scope', manager=self.manager)
+        self.project.developers.add(self.developer)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+        self.url = f'/api/projects/{self.project.id}/tasks/import/'
+
+    def post_ndjson(self, rows, query=''):
+        body = '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+        return self.client.generic('POST', self.url + query, body, content_type='application/x-ndjson')
+
+    def test_ndjson_rows_are_imported_and_bad_rows_reported(self):
+        rows = [
+            {'title': 'Plain'},
+            {'title': 'Assigned', 'developer': 'dev@example.com', 'manager_start_time': '2024-01-01', 'manager_end_time': '2024-01-05'},
+            '{"title": ',
+            {'description': 'No title'},
+            {'title': 'Ghost', 'developer': 'nobody@example.com'},
+            '',
+            {
+                'title': 'Done', 'developer': 'dev@example.com', 'status': 'completed',
+                'start_time': '2024-01-01T09:00:00Z', 'end_time': '2024-01-01T11:00:00Z',
+                'manager_start_time': '2024-01-01T09:00:00Z', 'manager_end_time': '2024-01-01T12:00:00Z',
+            },
+            {'title': 'Backwards', 'manager_start_time': '2024-02-01', 'manager_end_time': '2024-01-01'},
+        ]
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            response = self.post_ndjson(rows)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['rows'], 7)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(response.data['error_count'], 4)
+        self.assertEqual(
+            sorted((error['line'], list(error['errors'])) for error in response.data['errors']),
+            [(3, ['non_field_errors']), (4, ['title']), (5, ['developer']), (8, ['manager_end_time'])],
+        )
+        # One email lookup per chunk of two rows that passed validation.
+        lookups = [query for query in queries if 'FROM "accounts_customuser"' in query['sql'] and '"email" IN' in query['sql']]
+        self.assertEqual(len(lookups), 2)
+
+        self.assertEqual(sorted(Task.objects.filter(project=self.project).values_list('title', flat=True)), ['Assigned', 'Done', 'Plain'])
+        done = Task.objects.get(title='Done')
+        self.assertEqual(done.actual_time_spent, timedelta(hours=2))
+        metrics = DeveloperMetrics.objects.get(developer=self.developer)
+        self.assertEqual((metrics.tasks_completed, metrics.total_delivery_time, metrics.total_allocated_time), (1, timedelta(hours=2), timedelta(hours=3)))
+        self.assertEqual(
+            list(Notification.objects.filter(recipient=self.developer).values_list('message', flat=True)),
+            ['2 imported tasks in "Migration" have been assigned to you.'],
+        )
+
+    def test_rows_that_would_store_a_negative_duration_are_rejected(self):
+        rows = [
+            {'title': 'No start', 'developer': 'dev@example.com', 'status': 'completed', 'end_time': '2024-01-01T11:00:00Z'},
+            {'title': 'Future start', 'developer': 'dev@example.com', 'status': 'completed', 'start_time': '2999-01-01T09:00:00Z'},
+            {'title': 'Ended early', 'status': 'in_progress', 'end_time': '2024-01-01T11:00:00Z'},
+        ]
+        response = self.post_ndjson(rows)
+
+        self.assertEqual((response.status_code, response.data['created']), (200, 0))
+        self.assertEqual(
+            [(error['line'], list(error['errors'])) for error in response.data['errors']],
+            [(1, ['start_time']), (2, ['end_time']), (3, ['start_time'])],
+        )
+        self.assertFalse(Task.objects.filter(project=self.project).exists())
+        self.assertFalse(DeveloperMetrics.objects.filter(developer=self.developer, tasks_completed__gt=0).exists())
+
+    def test_csv_upload_with_quoted_newlines_and_empty_cells(self):
+        content = (
+            '\ufeffTitle,Description,Developer,Status\r\n'
+            'Write docs,"Two\r\nlines",dev@example.com,in_progress\r\n'
+            'Triage,,,\r\n'
+            ',missing title,,\r\n'
+        ).encode()
+        upload = SimpleUploadedFile('tasks.csv', content, content_type='text/csv')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['errors'], [{'line': 5, 'errors': {'title': ['This field is required.']}}])
+        task = Task.objects.get(title='Write docs')
+        self.assertEqual((task.description, task.developer, task.status), ('Two\r\nlines', self.developer, 'in_progress'))
+        self.assertIsNotNone(task.start_time)
+        self.assertIsNone(Task.objects.get(title='Triage').developer)
+
+    @override_settings(NOTIFICATION_OUTBOX={'AUTOSTART': False})
+    def test_only_project_developers_and_deadlines_are_accepted(self):
+        CustomUser.objects.create(email='outsider@example.com', username='outsider', is_active=True)
+        self.project.deadline = timezone.now() + timedelta(days=10)
+        self.project.save()
+        late = (self.project.deadline + timedelta(days=1)).isoformat()
+        rows = [
+            {'title': 'Outsider', 'developer': 'outsider@example.com', 'status': 'completed'},
+            {'title': 'Manager', 'developer': 'manager@example.com'},
+            {'title': 'Late', 'manager_end_time': late},
+            {'title': 'Member', 'developer': 'dev@example.com'},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post_ndjson(rows)
+
+        self.assertEqual(
+            sorted((error['line'], list(error['errors'])) for error in response.data['errors']),
+            [(1, ['developer']), (2, ['developer']), (3, ['manager_end_time'])],
+        )
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['Member'])
+        self.assertFalse(DeveloperMetrics.objects.exclude(developer=self.developer).exists())
+        self.assertEqual(list(Notification.objects.values_list('recipient__email', flat=True)), ['dev@example.com'])
+
+    def test_chunks_are_committed_separately(self):
+        body = b'{"title": "One"}\n{"title": "Two"}\n{"title": "\xff"}\n'
+        with mock.patch('manager.task_import.transaction', wraps=transaction) as import_transaction:
+            response = self.client.generic('POST', self.url, body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(Task.objects.count(), 2)
+        # One transaction for the committed chunk, one for the notifications.
+        self.assertEqual(import_transaction.atomic.call_count, 2)
+
+    def test_dry_run_saves_nothing(self):
+        response = self.post_ndjson([{'title': 'One'}, {'title': 'Two'}, {'title': 'Three'}], '?dry_run=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['valid'], response.data['created'], response.data['dry_run']), (3, 0, True))
+        self.assertFalse(Task.objects.exists())
+
+    def test_unreadable_uploads_are_rejected(self):
+        response = self.client.generic('POST', self.url, 'name,status\nx,completed\n', content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.data['error'])
+
+        response = self.client.generic('POST', self.url, '{"title": "x"}', content_type='text/plain')
+        self.assertEqual(response.status_code, 400)
+
+        other = CustomUser.objects.create(email='other@example.com', username='other', admin_role=True, is_active=True)
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.post_ndjson([{'title': 'x'}]).status_code, 404)
+        self.assertFalse(Task.objects.exists())
+
+    def test_line_length_is_bounded(self):
+        stream = BytesIO(b'{"title": "ok"}\n' + b'x' * 5000)
+        lines = iter_lines(stream, max_line_bytes=1000, read_size=256)
+        self.assertEqual(next(lines), b'{"title": "ok"}\n')
+        with self.assertRaises(ImportFormatError):
+            next(lines)
+
+    def test_command_imports_a_file(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as handle:
+            handle.write('\n'.join(json.dumps({'title': f'Task {index}'}) for index in range(5)) + '\n{}\n')
+        self.addCleanup(os.unlink, handle.name)
+        stdout, stderr = StringIO(), StringIO()
+
+        call_command('import_tasks', str(self.project.id), handle.name, stdout=stdout, stderr=stderr)
+
+        self.assertEqual(Task.objects.filter(project=self.project).count(), 5)
+        self.assertIn('Imported 5 of 6 rows; 1 rows had errors.', stdout.getvalue())
+        self.assertIn('line 6: {"title": ["This field is required."]}', stderr.getvalue())
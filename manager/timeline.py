@@ -0,0 +1,99 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, CharField, DateTimeField, F, FloatField, Func, Q, Value, When
+from django.db.models.functions import Coalesce, Floor, Greatest, Least, Round
+
+
+class DayNumber(Func):
+    """
+    A datetime as a fractional day count, so day arithmetic stays in SQL.
+    """
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='julianday(%(expressions)s)', **extra_context)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='(EXTRACT(EPOCH FROM %(expressions)s) / 86400.0)', **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='(UNIX_TIMESTAMP(%(expressions)s) / 86400.0)', **extra_context)
+
+
+def annotate_timeline(queryset, now):
+    """
+    Add remaining_days, percentage_elapsed and timeline_status to a Task
+    queryset, using the manager's planned window for each task.
+    """
+    today = DayNumber(Value(now, output_field=DateTimeField()))
+    planned_start = DayNumber('manager_start_time')
+    planned_end = DayNumber('manager_end_time')
+    planned = Q(manager_start_time__isnull=False, manager_end_time__isnull=False, manager_end_time__gt=F('manager_start_time'))
+
+    return queryset.annotate(
+        remaining_days=Case(
+            When(manager_end_time__isnull=False, then=Greatest(Floor(planned_end - today), Value(0.0))),
+            default=None,
+            output_field=FloatField(),
+        ),
+        percentage_elapsed=Case(
+            When(status='completed', then=Value(100.0)),
+            When(planned, then=Round(Least(Greatest((today - planned_start) * 100.0 / (planned_end - planned_start), Value(0.0)), Value(100.0)))),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+        timeline_status=Case(
+            When(status='completed', then=Value('Completed')),
+            When(manager_end_time__lt=now, then=Value('Overdue')),
+            When(status='in_progress', then=Value('In Progress')),
+            default=Value('Not Started'),
+            output_field=CharField(),
+        ),
+    )
+
+
+def filter_window(queryset, start=None, end=None):
+    """
+    Keep tasks whose planned or actual bar overlaps [start, end].
+    """
+    bar_start = Coalesce('manager_start_time', 'start_time')
+    bar_end = Coalesce('end_time', 'manager_end_time', 'start_time')
+    queryset = queryset.alias(bar_start=bar_start, bar_end=bar_end)
+    if end is not None:
+        queryset = queryset.filter(bar_start__lte=end)
+    if start is not None:
+        queryset = queryset.filter(bar_end__gte=start)
+    return queryset
+
+
+TIMELINE_FIELDS = [
+    'id', 'title', 'status', 'developer__email',
+    'manager_start_time', 'manager_end_time', 'start_time', 'end_time',
+    'remaining_days', 'percentage_elapsed', 'timeline_status',
+]
+
+
+def stream_timeline(header, tasks, chunk_size=500):
+    """
+    Yield ``{...header, "tasks": [...]}`` as JSON a few rows at a time, reading
+    the queryset with iterator() so memory does not grow with the project.
+    """
+    encoder = DjangoJSONEncoder()
+    yield json.dumps(header, cls=DjangoJSONEncoder)[:-1] + ', "tasks": ['
+
+    rows = []
+    first = True
+    for task in tasks.values(*TIMELINE_FIELDS).iterator(chunk_size=chunk_size):
+        task['developer'] = task.pop('developer__email')
+        if task['remaining_days'] is not None:
+            task['remaining_days'] = int(task['remaining_days'])
+        task['percentage_elapsed'] = int(task['percentage_elapsed'])
+        rows.append(('' if first else ', ') + encoder.encode(task))
+        first = False
+        if len(rows) >= chunk_size:
+            yield ''.join(rows)
+            rows = []
+
+    rows.append(']}')
+    yield ''.join(rows)
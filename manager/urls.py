@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import  AssignDevelopersToTaskView,DeveloperMetricsView,EvaluateRiskLevelView,TaskDetailForManagerView,CreateTaskView,DeleteTaskView,AcceptAIRequirementsView,ProjectCreateView,ProjectListView,RemoveDeveloperView, ProjectDetailView, ProjectDevelopersListView, ProjectAssignDevelopersView,ProjectUpdateView,ProjectDeleteView,EditAndSaveRequirementsView,EditTaskView,ListTasksForProjectView,ListProjectsForGanttChartView
+from .views import  AssignDevelopersToTaskView,DeveloperMetricsView,EvaluateRiskLevelView,TaskDetailForManagerView,CreateTaskView,DeleteTaskView,AcceptAIRequirementsView,ProjectCreateView,ProjectListView,RemoveDeveloperView, ProjectDetailView, ProjectDevelopersListView, ProjectAssignDevelopersView,ProjectUpdateView,ProjectDeleteView,EditAndSaveRequirementsView,EditTaskView,ListTasksForProjectView,ListProjectsForGanttChartView,UnreadNotificationCountView,ResponseCacheStatsView,ProjectTimelineView,RequirementsJobDetailView,EvaluateRiskLevelBatchView,RiskCacheStatsView,ModelRegistryStatsView,SearchView,ImportTasksView
 urlpatterns = [
     path('create_project/', ProjectCreateView.as_view(), name='project-create'),
+    path('requirements-jobs/<int:job_id>/', RequirementsJobDetailView.as_view(), name='requirements-job-detail'),#poll_requirements_generation
     path('projects/<int:project_id>/accept-requirements/', AcceptAIRequirementsView.as_view(), name='accept-ai-requirements'),
     path('projects/<int:project_id>/edit-requirements/', EditAndSaveRequirementsView.as_view(), name='edit-and-save-requirements'),
     path('view_projects/', ProjectListView.as_view(), name='project-list'),#view_all_projects
@@ -13,16 +14,27 @@ urlpatterns = [
     path('developers/<int:pk>/remove/', RemoveDeveloperView.as_view(), name='remove-developer'),#remove_developers_from_project
     path('projects/<int:project_id>/tasks/', ListTasksForProjectView.as_view(), name='list_tasks_for_project'),#list_all_this_project_tasks
     path('project-gantt-chart/', ListProjectsForGanttChartView.as_view(), name='project_gantt_chart'),
+    path('projects/<int:project_id>/timeline/', ProjectTimelineView.as_view(), name='project_timeline'),#task_bars_for_gantt_chart
     #########TASK########
     path('projects/<int:project_id>/tasks/create/', CreateTaskView.as_view(), name='create_task'),
+    path('projects/<int:project_id>/tasks/import/', ImportTasksView.as_view(), name='import_tasks'),
     path('projects/<int:project_id>/tasks/<int:task_id>/assign/', AssignDevelopersToTaskView.as_view(), name='assign_developers_to_task'),#assign_developers_to_task
     path('projects/<int:project_id>/tasks/<int:task_id>/edit/', EditTaskView.as_view(), name='task-edit'),
     path('projects/<int:project_id>/tasks/<int:task_id>/delete/', DeleteTaskView.as_view(), name='delete_task'),
     path('task/<int:pk>/manager-details/', TaskDetailForManagerView.as_view(), name='manager-task-details'),
     ###########risk_level############
     path('evaluate-risk/<int:project_id>/', EvaluateRiskLevelView.as_view(), name='evaluate-risk'),
+    path('evaluate-risk/<int:project_id>/batch/', EvaluateRiskLevelBatchView.as_view(), name='evaluate-risk-batch'),
     #######kpi's#########
     path('developer/metrics/', DeveloperMetricsView.as_view(), name='developer-metrics'),
+    #######notifications#########
+    path('notifications/unread-count/', UnreadNotificationCountView.as_view(), name='notification-unread-count'),
+    #######response_cache#########
+    path('response-cache/stats/', ResponseCacheStatsView.as_view(), name='response-cache-stats'),
+    path('evaluate-risk/cache/stats/', RiskCacheStatsView.as_view(), name='risk-cache-stats'),
+    path('ai-models/stats/', ModelRegistryStatsView.as_view(), name='ai-model-stats'),
+    #######search#########
+    path('search/', SearchView.as_view(), name='search'),
 ]
 
 
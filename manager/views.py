@@ -1,9 +1,12 @@
 from rest_framework import status,views
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .models import Project,Task,DeveloperMetrics
-from .serializers import ProjectSerializer,UserSerializer,TaskSerializer
+from .models import Project,Task,DeveloperMetrics,Notification,RequirementsJob
+from .serializers import ProjectSerializer,UserSerializer,TaskSerializer,RequirementsJobSerializer
 from .permissions import IsAdminUser  # Make sure to import the custom permission
+from .pagination import KeysetPagination
+from .timeline import annotate_timeline, filter_window, stream_timeline
+from .response_cache import VersionedResponseCacheMixin, stats as response_cache_stats
 from rest_framework import generics,permissions,serializers
 from .models import CustomUser
 from rest_framework.permissions import IsAuthenticated
@@ -11,11 +14,19 @@ from django.http import Http404
 from rest_framework.exceptions import PermissionDenied,NotFound
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
-from .ai_service import generate_requirements,evaluate_risk_level # AI service integration
-from django.db.models import  Avg,Sum, F, ExpressionWrapper, DurationField
+from .ai_service import evaluate_risk_level,evaluate_risk_levels,risk_model,risk_model_version # AI service integration
+from .model_registry import get_model_registry
+from .search import KINDS as SEARCH_KINDS, search, search_available
+from .task_import import FORMATS as IMPORT_FORMATS, ImportFormatError, TaskImporter, detect_format
+from .risk_scoring import validate_risk_rows
+from .risk_cache import get_risk_cache, risk_cache_key
+from .jobs import enqueue_requirements_job
+from django.db.models import  Avg,Sum, F, ExpressionWrapper, DurationField, Count, Q
 from django.utils import timezone
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from django.http import StreamingHttpResponse
+from datetime import datetime, timedelta
+from django.db import transaction
+from .notifications import notify
 
 #########################PROJECT#########################
 
@@ -27,41 +38,57 @@ class ProjectCreateView(APIView):
     def post(self, request):
         project_serializer = ProjectSerializer(data=request.data, context={'request': request})
         if project_serializer.is_valid():
-            project = project_serializer.save()
-
-            # Generate requirements
-            functional_requirements, non_functional_requirements = generate_requirements(project.scope)
-            
-            # Save the generated requirements in the project instance
-            project.functional_requirements = functional_requirements
-            project.non_functional_requirements = non_functional_requirements
-            project.save()
+            with transaction.atomic():
+                project = project_serializer.save()
+
+                # Generate requirements in the background; poll the job or wait for the notification
+                job = enqueue_requirements_job(project)
 
             response_data = {
                 "project": project_serializer.data,
-                "functional_requirements": functional_requirements,
-                "non_functional_requirements": non_functional_requirements,
+                "requirements_job": RequirementsJobSerializer(job).data,
             }
             return Response(response_data, status=status.HTTP_201_CREATED)
         
         return Response(project_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class RequirementsJobDetailView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+
+    def get(self, request, job_id):
+        try:
+            job = RequirementsJob.objects.select_related('project').get(id=job_id, project__manager=request.user)
+        except RequirementsJob.DoesNotExist:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(RequirementsJobSerializer(job).data, status=status.HTTP_200_OK)
+
+
 class AcceptAIRequirementsView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsAdminUser]
 
     def post(self, request, project_id):
         try:
-            project = Project.objects.get(id=project_id)
+            project = Project.objects.get(id=project_id, manager=request.user)
         except Project.DoesNotExist:
             return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
 
+        # Until generation succeeds the saved requirements are empty or stale.
+        job = project.requirements_jobs.order_by('-id').first()
+        if job is not None and job.status != 'succeeded':
+            return Response(
+                {"error": "Requirements are not ready", "requirements_job": RequirementsJobSerializer(job).data},
+                status=status.HTTP_409_CONFLICT,
+            )
+
         functional_requirements = project.functional_requirements  # Use saved requirements
 
-        for fr in functional_requirements:
-            Task.objects.create(project=project, title=fr)
+        with transaction.atomic():
+            # Accepting only adds tasks; edits go through EditAndSaveRequirementsView.
+            counts = project.reconcile_tasks(functional_requirements, prune=False)
 
-        return Response({"message": "Tasks created successfully"}, status=status.HTTP_200_OK)
+        return Response({"message": "Tasks created successfully", **counts}, status=status.HTTP_200_OK)
 
 
 
@@ -70,31 +97,31 @@ class EditAndSaveRequirementsView(APIView):
 
     def post(self, request, project_id):
         try:
-            project = Project.objects.get(id=project_id)
+            project = Project.objects.get(id=project_id, manager=request.user)
         except Project.DoesNotExist:
             return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
 
         functional_requirements = request.data.get('functional_requirements', [])
         non_functional_requirement = request.data.get('non_functional_requirements', [])
 
-        # Validate and save the edited requirements
-        project.edited_functional_requirements = functional_requirements
-        project.edited_non_functional_requirements = non_functional_requirement
-        project.save()
+        with transaction.atomic():
+            # Validate and save the edited requirements
+            project.edited_functional_requirements = functional_requirements
+            project.edited_non_functional_requirements = non_functional_requirement
+            project.save()
 
-        # Update tasks based on edited functional requirements
-        Task.objects.filter(project=project).delete()  # Clear existing tasks
-        for fr in functional_requirements:
-            Task.objects.create(project=project, title=fr)
+            # Update tasks based on edited functional requirements, keeping assigned work
+            counts = project.reconcile_tasks(functional_requirements)
 
-        return Response({"message": "Tasks created successfully"}, status=status.HTTP_200_OK)
+        return Response({"message": "Tasks created successfully", **counts}, status=status.HTTP_200_OK)
 
 
 #view_all_projects
 
-class ProjectListView(generics.ListAPIView):
+class ProjectListView(VersionedResponseCacheMixin, generics.ListAPIView):
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         # Filter projects to only those owned by the current user
@@ -304,6 +331,7 @@ class RemoveDeveloperView(generics.UpdateAPIView):
 class ListTasksForProjectView(generics.ListAPIView):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         project_id = self.kwargs.get('project_id')
@@ -323,9 +351,13 @@ class ListTasksForProjectView(generics.ListAPIView):
 
 
 
-class ListProjectsForGanttChartView(generics.ListAPIView):
+class ListProjectsForGanttChartView(VersionedResponseCacheMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsAdminUser]
 
+    def get_cache_key_parts(self, request):
+        # Remaining days and elapsed percentage change with the date.
+        return [timezone.now().date().isoformat()]
+
     def get_queryset(self):
         user = self.request.user
         return Project.objects.filter(manager=user)
@@ -361,6 +393,44 @@ class ListProjectsForGanttChartView(generics.ListAPIView):
 
         return Response(project_data, status=200)
 
+class ProjectTimelineView(APIView):
+    """
+    Task bars for one project's Gantt chart, optionally limited to a
+    ?start=YYYY-MM-DD&end=YYYY-MM-DD window and streamed as JSON.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+
+    def get(self, request, project_id):
+        try:
+            project = Project.objects.get(id=project_id, manager=request.user)
+        except Project.DoesNotExist:
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            start = self.parse_date(request.query_params.get('start'))
+            end = self.parse_date(request.query_params.get('end'), end_of_day=True)
+        except ValueError:
+            return Response({"error": "start and end must be dates formatted as YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        tasks = filter_window(Task.objects.filter(project=project), start, end)
+        tasks = annotate_timeline(tasks, now).order_by('manager_start_time', 'id')
+
+        header = {
+            'project': {'id': project.id, 'name': project.name, 'start_date': project.created_at, 'end_date': project.deadline},
+            'window': {'start': start, 'end': end},
+        }
+        return StreamingHttpResponse(stream_timeline(header, tasks), content_type='application/json')
+
+    def parse_date(self, value, end_of_day=False):
+        if not value:
+            return None
+        day = datetime.strptime(value, '%Y-%m-%d')
+        if end_of_day:
+            day = day + timedelta(days=1) - timedelta(microseconds=1)
+        return timezone.make_aware(day)
+
+
 #########################TASK#########################
 
 class CreateTaskView(generics.CreateAPIView):
@@ -384,18 +454,12 @@ class CreateTaskView(generics.CreateAPIView):
         except CustomUser.DoesNotExist:
             raise ValidationError({'developer': ['No developer found with this email.']})
         
-        # Save the task with the project and developer
-        serializer.save(project=project, developer=developer)
-
-        # Send notification to the developer
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f'notifications_{developer.id}',
-            {
-                'type': 'send_notification',
-                'notification': f'You have been assigned a new task: '
-            }
-        )
+        with transaction.atomic():
+            # Save the task with the project and developer
+            task = serializer.save(project=project, developer=developer)
+
+            # Notify the developer once the task is committed
+            notify(developer.id, f'You have been assigned a new task: {task.title}')
 
     def create(self, request, *args, **kwargs):
         response = super().create(request, *args, **kwargs)
@@ -406,6 +470,48 @@ class CreateTaskView(generics.CreateAPIView):
             }, status=status.HTTP_201_CREATED)
         return response
 
+class ImportTasksView(APIView):
+    """
+    Bulk-create tasks in a project from NDJSON or CSV, sent either as the
+    request body (Content-Type application/x-ndjson or text/csv) or as a
+    multipart "file" upload. ?file_format= overrides detection and
+    ?dry_run=1 validates without saving. Bad rows are reported, not fatal.
+    Tasks are committed a chunk at a time.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def post(self, request, project_id):
+        try:
+            project = Project.objects.get(id=project_id, manager=request.user)
+        except Project.DoesNotExist:
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        if request.content_type.startswith('multipart/form-data'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                return Response({"error": "Upload the tasks as 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+            stream, detected = upload, detect_format(upload.name, upload.content_type or '')
+        else:
+            # Read straight from the request so the body is never held in memory.
+            stream, detected = request._request, detect_format(content_type=request.content_type)
+
+        file_format = request.query_params.get('file_format') or detected
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {"error": f"Send NDJSON or CSV, or set file_format to one of: {', '.join(IMPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        dry_run = request.query_params.get('dry_run') in ('1', 'true')
+        importer = TaskImporter(project)
+        try:
+            report = importer.run(stream, file_format, dry_run=dry_run)
+        except ImportFormatError as exc:
+            # Chunks committed before the unreadable part stay imported.
+            return Response({"error": str(exc), **importer.report(dry_run)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK)
+
+
         #############################################################################################
 
  
@@ -471,20 +577,14 @@ class EditTaskView(generics.UpdateAPIView):
 
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
-
-        # Check if the developer has changed
-        new_developer = instance.developer
-        if old_developer != new_developer:
-            # Send notification to the new developer
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f'notifications_{new_developer.id}',
-                {
-                    'type': 'send_notification',
-                    'notification': f'You have been assigned a new task: {instance.title}'
-                }
-            )
+        with transaction.atomic():
+            self.perform_update(serializer)
+
+            # Check if the developer has changed
+            new_developer = instance.developer
+            if new_developer is not None and old_developer != new_developer:
+                # Notify the new developer once the update is committed
+                notify(new_developer.id, f'You have been assigned a new task: {instance.title}')
 
         return Response({
             'status': 'success',
@@ -558,11 +658,7 @@ class EvaluateRiskLevelView(APIView):
             return Response({"error": "Missing required fields in the request payload."}, status=status.HTTP_400_BAD_REQUEST)
 
         # Use the edited requirements if available, otherwise use the original
-        functional_requirements = project.edited_functional_requirements or project.functional_requirements
-        non_functional_requirements = project.edited_non_functional_requirements or project.non_functional_requirements
-
-        # Combine functional and non-functional requirements
-        all_requirements = functional_requirements + non_functional_requirements
+        all_requirements = project.effective_requirements()
 
         # Prepare input data for the evaluate_risk_level function
         input_data = {
@@ -580,11 +676,67 @@ class EvaluateRiskLevelView(APIView):
             "priority": priority
         }
 
-        # Evaluate risk level using the placeholder AI function
-        risk_level = evaluate_risk_level(input_data)
+        errors = validate_risk_rows([input_data])
+        if errors:
+            return Response({"error": "Invalid risk fields.", "fields": errors[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Identical inputs score identically, so reuse a recent evaluation
+        cache = get_risk_cache()
+        model = risk_model()
+        cache_key = risk_cache_key(all_requirements, input_data, risk_model_version(model))
+        risk_level = cache.get(cache_key)
+        cache_hit = risk_level is not None
+        if not cache_hit:
+            risk_level = evaluate_risk_level(input_data, model)
+            cache.set(cache_key, risk_level, project.id)
 
         # Return the risk level as response
-        return Response({"risk_level": risk_level}, status=status.HTTP_200_OK)
+        return Response({"risk_level": risk_level, "cache": "hit" if cache_hit else "miss"}, status=status.HTTP_200_OK)
+
+
+class EvaluateRiskLevelBatchView(APIView):
+    """
+    Score many risk rows of one project in a single vectorized model call.
+    Expects {"rows": [{<the EvaluateRiskLevelView fields>}, ...]}.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+    max_rows = 1000
+
+    def post(self, request, project_id):
+        try:
+            project = Project.objects.get(id=project_id)
+        except Project.DoesNotExist:
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        rows = request.data.get('rows')
+        if not isinstance(rows, list) or not rows:
+            return Response({"error": "'rows' must be a non-empty list of risk rows."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > self.max_rows:
+            return Response({"error": f"At most {self.max_rows} rows can be evaluated per request."}, status=status.HTTP_400_BAD_REQUEST)
+
+        errors = validate_risk_rows(rows)
+        if errors:
+            return Response({"error": "Invalid risk rows.", "rows": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        requirements = project.effective_requirements()
+        cache = get_risk_cache()
+        model = risk_model()
+        model_version = risk_model_version(model)
+        keys = [risk_cache_key(requirements, row, model_version) for row in rows]
+        risk_levels = [cache.get(key) for key in keys]
+
+        # Only rows without a cached evaluation go to the model, still in one call
+        missing = [index for index, risk_level in enumerate(risk_levels) if risk_level is None]
+        if missing:
+            scored = evaluate_risk_levels(requirements, [rows[index] for index in missing], model).tolist()
+            for index, risk_level in zip(missing, scored):
+                risk_levels[index] = risk_level
+                cache.set(keys[index], risk_level, project.id)
+
+        return Response({
+            "risk_levels": risk_levels,
+            "cache": {"hits": len(rows) - len(missing), "misses": len(missing)},
+        }, status=status.HTTP_200_OK)
 
 
 
@@ -610,9 +762,7 @@ class TaskDetailForManagerView(APIView):
             return Response({'message': 'Start time or end time is not set for this task.'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Calculate time taken by the developer
-        actual_time_taken = task.end_time - task.start_time
-        task.actual_time_spent = actual_time_taken
-        task.save()
+        actual_time_taken = task.actual_time_spent or task.end_time - task.start_time
 
         # Ensure manager_end_time and manager_start_time are set
         if task.manager_start_time is None or task.manager_end_time is None:
@@ -636,26 +786,6 @@ class TaskDetailForManagerView(APIView):
 
         actual_time_taken_str = f"{days} days, {hours} hours, {minutes} minutes"
 
-        # Update developer KPIs
-        developer_metrics, created = DeveloperMetrics.objects.get_or_create(developer=task.developer)
-        developer_metrics.tasks_completed += 1
-
-        if developer_metrics.average_completion_time:
-            developer_metrics.average_completion_time = (
-                developer_metrics.average_completion_time + actual_time_taken
-            ) / 2
-        else:
-            developer_metrics.average_completion_time = actual_time_taken
-
-        if developer_metrics.total_delivery_time and developer_metrics.total_allocated_time:
-            developer_metrics.total_delivery_time += actual_time_taken
-            developer_metrics.total_allocated_time += allocated_time
-        else:
-            developer_metrics.total_delivery_time = actual_time_taken
-            developer_metrics.total_allocated_time = allocated_time
-
-        developer_metrics.save()
-
         return Response({
             'task_name': task.title,
             'message': message,
@@ -678,69 +808,73 @@ class DeveloperMetricsView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        # Get the projects managed by the authenticated manager
-        projects_managed = Project.objects.filter(manager=request.user)
-        
-        # Get the developers assigned to these projects
-        developers = CustomUser.objects.filter(assigned_tasks__project__in=projects_managed).distinct()
-        
-        metrics = []
-
-        for developer in developers:
-            tasks = Task.objects.filter(developer=developer, project__in=projects_managed)
-            tasks_completed = tasks.filter(status='completed').count()
-
-            developer_metrics = DeveloperMetrics.objects.get(developer=developer)
-            tasks_reassigned = developer_metrics.tasks_reassigned
-            
-            if tasks_completed > 0:
-                total_delivery_time = tasks.aggregate(
-                    total_delivery_time=Sum(ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField()))
-                )['total_delivery_time']
-                total_allocated_time = tasks.aggregate(
-                    total_allocated_time=Sum(ExpressionWrapper(F('manager_end_time') - F('manager_start_time'), output_field=DurationField()))
-                )['total_allocated_time']
-
-                avg_delivery_time = total_delivery_time / tasks_completed if total_delivery_time else None
-                avg_allocated_time = total_allocated_time / tasks_completed if total_allocated_time else None
-                
-                if avg_delivery_time and avg_allocated_time:
-                    if avg_delivery_time < avg_allocated_time:
-                        delivery_status = 'early'
-                    elif avg_delivery_time == avg_allocated_time:
-                        delivery_status = 'on time'
-                    else:
-                        delivery_status = 'late'
-                else:
-                    delivery_status = 'N/A'
-                
-                avg_completion_time = tasks.aggregate(
-                    avg_completion_time=Avg(ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField()))
-                )['avg_completion_time']
-                if avg_completion_time:
-                    total_seconds = avg_completion_time.total_seconds()
-                    hours = int(total_seconds // 3600)
-                    minutes = int((total_seconds % 3600) // 60)
-                    average_completion_time_str = f"{hours} hours, {minutes} minutes"
+        completed = Q(status='completed')
+        delivery_time = ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField())
+        allocated_time = ExpressionWrapper(F('manager_end_time') - F('manager_start_time'), output_field=DurationField())
+
+        # One grouped query over the manager's tasks, joined to DeveloperMetrics,
+        # instead of a handful of queries per developer.
+        rows = (
+            Task.objects
+            .filter(project__manager=request.user, developer__isnull=False)
+            .values('developer', 'developer__username', 'developer__metrics__tasks_reassigned')
+            .annotate(
+                tasks_completed=Count('id', filter=completed),
+                total_delivery_time=Sum(delivery_time, filter=completed),
+                total_allocated_time=Sum(allocated_time, filter=completed),
+                avg_completion_time=Avg(delivery_time),
+            )
+            .order_by('developer')
+        )
+
+        metrics = [self.build_metrics(row) for row in rows]
+
+        return Response(metrics, status=status.HTTP_200_OK)
+
+    def build_metrics(self, row):
+        tasks_completed = row['tasks_completed']
+        tasks_reassigned = row['developer__metrics__tasks_reassigned'] or 0
+
+        if tasks_completed > 0:
+            total_delivery_time = row['total_delivery_time']
+            total_allocated_time = row['total_allocated_time']
+
+            avg_delivery_time = total_delivery_time / tasks_completed if total_delivery_time else None
+            avg_allocated_time = total_allocated_time / tasks_completed if total_allocated_time else None
+
+            if avg_delivery_time and avg_allocated_time:
+                if avg_delivery_time < avg_allocated_time:
+                    delivery_status = 'early'
+                elif avg_delivery_time == avg_allocated_time:
+                    delivery_status = 'on time'
                 else:
-                    average_completion_time_str = "N/A"
+                    delivery_status = 'late'
             else:
                 delivery_status = 'N/A'
-                average_completion_time_str = "N/A"
 
-            # Calculate the rating based on the metrics
-            rating = self.calculate_rating(tasks_completed, tasks_reassigned, delivery_status)
-            
-            metrics.append({
-                'developer': developer.username,
-                'tasks_completed': tasks_completed,
-                'average_completion_time': average_completion_time_str,
-                'tasks_reassigned': tasks_reassigned,
-                'average_delivery_status': delivery_status,
-                'rating': rating,
-            })
-
-        return Response(metrics, status=status.HTTP_200_OK)
+            avg_completion_time = row['avg_completion_time']
+            if avg_completion_time:
+                total_seconds = avg_completion_time.total_seconds()
+                hours = int(total_seconds // 3600)
+                minutes = int((total_seconds % 3600) // 60)
+                average_completion_time_str = f"{hours} hours, {minutes} minutes"
+            else:
+                average_completion_time_str = "N/A"
+        else:
+            delivery_status = 'N/A'
+            average_completion_time_str = "N/A"
+
+        # Calculate the rating based on the metrics
+        rating = self.calculate_rating(tasks_completed, tasks_reassigned, delivery_status)
+
+        return {
+            'developer': row['developer__username'],
+            'tasks_completed': tasks_completed,
+            'average_completion_time': average_completion_time_str,
+            'tasks_reassigned': tasks_reassigned,
+            'average_delivery_status': delivery_status,
+            'rating': rating,
+        }
 
     def calculate_rating(self, tasks_completed, tasks_reassigned, delivery_status):
         # Define the rating criteria
@@ -769,4 +903,72 @@ class DeveloperMetricsView(APIView):
         return rating
 
 
-        
+
+
+class UnreadNotificationCountView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        # Served from the partial index on unread notifications
+        unread_count = Notification.objects.filter(recipient=request.user, read_at__isnull=True).count()
+        latest_id = Notification.objects.filter(recipient=request.user).order_by('-id').values_list('id', flat=True).first()
+        return Response({'unread_count': unread_count, 'latest_id': latest_id}, status=status.HTTP_200_OK)
+
+
+class ResponseCacheStatsView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache_stats.snapshot(), status=status.HTTP_200_OK)
+
+
+class RiskCacheStatsView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response(get_risk_cache().snapshot(), status=status.HTTP_200_OK)
+
+
+class ModelRegistryStatsView(APIView):
+    """
+    Models loaded in the worker that served the request, with load time and
+    resident size.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response({"models": get_model_registry().stats()}, status=status.HTTP_200_OK)
+
+
+class SearchView(APIView):
+    """
+    Ranked full-text search over the caller's projects, their tasks and
+    requirements, and the caller's to-dos.
+    ?q=<text>[&type=project,task,todo][&limit=20]
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_limit = 100
+
+    def get(self, request):
+        if not search_available():
+            return Response({"error": "Search is not available on this database."}, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({"error": "'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        kinds = request.query_params.get('type')
+        kinds = kinds.split(',') if kinds else SEARCH_KINDS
+        unknown = sorted(set(kinds) - set(SEARCH_KINDS))
+        if unknown:
+            return Response({"error": f"Unknown type: {', '.join(unknown)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_limit)
+        except ValueError:
+            return Response({"error": "'limit' must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({"error": "'limit' must be positive."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"results": search(request.user, text, kinds, limit)}, status=status.HTTP_200_OK)
+